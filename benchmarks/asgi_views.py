@@ -0,0 +1,204 @@
+"""
+Compare the sync and async dashboard and list views under an ASGI server.
+
+Builds a throwaway SQLite database with one user's projects and tasks,
+serves the project with uvicorn, and runs a keep-alive HTTP load against
+each page twice: once through the sync views (dashboard, TaskListView,
+ProjectListView) and once through their async counterparts. It reports
+requests/sec and p50/p99 latency per page:
+
+    pip install uvicorn
+    python benchmarks/asgi_views.py --concurrency 32 --requests 500
+
+The dashboard panels are normally cached per user, which would hide the
+queries being compared, so the server runs with the dummy cache unless
+--dashboard-cache is given.
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARKS_DIR))
+
+# (label, sync path, async path)
+PAGES = [
+    ('dashboard', '/sync/', '/'),
+    ('task list', '/sync/tasks/', '/tasks/'),
+    ('project list', '/sync/projects/', '/projects/'),
+]
+
+urlpatterns = []
+
+
+# Point the project settings at the benchmark database and at this module's URLconf
+def configure(database, dashboard_cache):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'project_task_management.settings')
+    import django
+    from django.conf import settings
+
+    settings.DEBUG = False  # Keep query logging out of the measurements
+    settings.ALLOWED_HOSTS = ['127.0.0.1', 'testserver']
+    settings.DATABASES['default']['NAME'] = database
+    settings.ROOT_URLCONF = __name__
+    if not dashboard_cache:
+        settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+    django.setup()
+
+    from django.urls import path
+    from project_task_management.urls import urlpatterns as project_urlpatterns
+    from task_app import views
+
+    # The async views are routed by task_app.urls under ASYNC_VIEWS; the sync ones are mounted under /sync/
+    urlpatterns[:] = [
+        path('sync/', views.dashboard),
+        path('sync/tasks/', views.TaskListView.as_view()),
+        path('sync/projects/', views.ProjectListView.as_view()),
+        *project_urlpatterns,
+    ]
+
+
+# Entry point for uvicorn --factory, run in the server process
+def server_application():
+    os.environ.setdefault('DB_CONN_MAX_AGE', '0')  # As project_task_management/asgi.py does
+    os.environ.setdefault('ASYNC_VIEWS', '1')
+    configure(os.environ['BENCHMARK_DATABASE'], os.environ.get('BENCHMARK_DASHBOARD_CACHE') == '1')
+    from django.core.asgi import get_asgi_application
+    return get_asgi_application()
+
+
+# Create the schema and one user's data, and return a session cookie for that user
+def populate(projects, tasks_per_project):
+    from django.contrib.auth.models import User
+    from django.core.management import call_command
+    from django.test import Client
+    from task_app.models import Project, Task
+
+    call_command('migrate', verbosity=0)
+    user = User.objects.create_user(username='bench', password='bench')
+    today = date.today()
+    Project.objects.bulk_create([
+        Project(name=f"Project {number}", description="Benchmark project", start_date=today - timedelta(days=60),
+                end_date=today + timedelta(days=300), created_by=user)
+        for number in range(projects)
+    ])
+    statuses = ['pending', 'in_progress', 'completed']
+    Task.objects.bulk_create([
+        Task(title=f"Task {project.pk}-{number}", description="Benchmark task", assigned_to=user,
+             status=statuses[number % 3], priority='medium', start_date=today - timedelta(days=60),
+             due_date=today + timedelta(days=number % 60 - 10), project=project)
+        for project in Project.objects.all()
+        for number in range(tasks_per_project)
+    ], batch_size=2000)
+    client = Client()
+    client.force_login(user)
+    return client.cookies['sessionid'].value
+
+
+async def fetch(reader, writer, request):
+    started = time.perf_counter()
+    writer.write(request)
+    await writer.drain()
+    head = await reader.readuntil(b'\r\n\r\n')
+    status = int(head.split(b' ', 2)[1])
+    length = None
+    chunked = False
+    for line in head.split(b'\r\n')[1:]:
+        name, _, value = line.partition(b':')
+        if name.lower() == b'content-length':
+            length = int(value)
+        elif name.lower() == b'transfer-encoding' and b'chunked' in value.lower():
+            chunked = True
+    if chunked:
+        while True:
+            size = int((await reader.readuntil(b'\r\n')).strip(), 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    elif length:
+        await reader.readexactly(length)
+    if status != 200:
+        raise RuntimeError(f"Unexpected status {status}")
+    return (time.perf_counter() - started) * 1000
+
+
+# Send `requests` GETs over `concurrency` keep-alive connections, returning (requests/sec, latencies in ms)
+async def load(port, path, session, requests, concurrency):
+    request = (f'GET {path} HTTP/1.1\r\nHost: 127.0.0.1\r\nCookie: sessionid={session}\r\n\r\n').encode()
+    remaining = [requests]
+    latencies = []
+
+    async def connection():
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        while remaining[0] > 0:
+            remaining[0] -= 1
+            latencies.append(await fetch(reader, writer, request))
+        writer.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(connection() for _ in range(concurrency)))
+    return requests / (time.perf_counter() - started), latencies
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def wait_for_port(port, process, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit("uvicorn exited before serving requests")
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise SystemExit("uvicorn did not start listening")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--projects', type=int, default=50)
+    parser.add_argument('--tasks-per-project', type=int, default=200)
+    parser.add_argument('--requests', type=int, default=500, help="Requests per page and view flavour.")
+    parser.add_argument('--concurrency', type=int, default=32, help="Concurrent keep-alive connections.")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--dashboard-cache', action='store_true', help="Serve dashboard panels from the cache.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        database = os.path.join(directory, 'asgi.sqlite3')
+        configure(database, args.dashboard_cache)
+        session = populate(args.projects, args.tasks_per_project)
+
+        env = dict(os.environ, BENCHMARK_DATABASE=database,
+                   BENCHMARK_DASHBOARD_CACHE='1' if args.dashboard_cache else '0')
+        server = subprocess.Popen(
+            [sys.executable, '-m', 'uvicorn', '--factory', '--app-dir', BENCHMARKS_DIR,
+             'asgi_views:server_application', '--port', str(args.port), '--log-level', 'warning'],
+            env=env)
+        try:
+            wait_for_port(args.port, server)
+            for label, sync_path, async_path in PAGES:
+                for flavour, path in (('sync', sync_path), ('async', async_path)):
+                    asyncio.run(load(args.port, path, session, min(50, args.requests), args.concurrency))  # Warm up
+                    rate, latencies = asyncio.run(load(args.port, path, session, args.requests, args.concurrency))
+                    print(f"{label:>12} {flavour:>5}: {rate:7.1f} requests/sec, "
+                          f"p50 {statistics.median(latencies):6.1f} ms, p99 {percentile(latencies, 0.99):6.1f} ms")
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == '__main__':
+    main()
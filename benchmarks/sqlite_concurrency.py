@@ -0,0 +1,110 @@
+"""
+Concurrent write load test for the SQLite settings.
+
+Runs several worker processes that each perform short write transactions
+(insert a task row, then update another one), the way gunicorn workers
+handling task form posts do. It reports throughput and "database is
+locked" failures, first with SQLite's defaults and then with the pragmas
+and transaction mode from settings.DATABASES.
+
+    python benchmarks/sqlite_concurrency.py --workers 8 --transactions 500
+"""
+
+import argparse
+import multiprocessing
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from project_task_management import settings  # noqa: E402
+
+SCHEMA = """
+CREATE TABLE task (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    title VARCHAR(150) NOT NULL,
+    status VARCHAR(20) NOT NULL,
+    due_date DATE NOT NULL
+);
+CREATE INDEX task_status_due ON task (status, due_date);
+"""
+
+
+def connect(path, tuned):
+    if not tuned:
+        # Python's and Django's default: 5 second busy timeout, deferred transactions, rollback journal
+        return sqlite3.connect(path, timeout=5, isolation_level=None)
+    options = settings.DATABASES['default']['OPTIONS']
+    connection = sqlite3.connect(path, timeout=options['timeout'], isolation_level=None)
+    connection.executescript(options['init_command'])
+    return connection
+
+
+def worker(path, tuned, transactions, results):
+    connection = connect(path, tuned)
+    begin = 'BEGIN IMMEDIATE' if tuned else 'BEGIN'
+    committed = locked = 0
+    for number in range(transactions):
+        try:
+            connection.execute(begin)
+            # Read first, then write: with a deferred BEGIN this is where lock upgrades deadlock
+            connection.execute("SELECT COUNT(*) FROM task WHERE status = 'pending'").fetchone()
+            connection.execute(
+                "INSERT INTO task (title, status, due_date) VALUES (?, 'pending', '2024-02-01')",
+                (f'Task {os.getpid()}-{number}',))
+            connection.execute(
+                "UPDATE task SET status = 'completed' WHERE id = (SELECT MAX(id) FROM task)")
+            connection.execute('COMMIT')
+            committed += 1
+        except sqlite3.OperationalError as exc:
+            if 'locked' not in str(exc) and 'busy' not in str(exc):
+                raise
+            locked += 1
+            if connection.in_transaction:
+                connection.execute('ROLLBACK')
+    connection.close()
+    results.put((committed, locked))
+
+
+def run(tuned, workers, transactions):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'load.sqlite3')
+        setup = connect(path, tuned)
+        setup.executescript(SCHEMA)
+        setup.close()
+
+        results = multiprocessing.Queue()
+        processes = [
+            multiprocessing.Process(target=worker, args=(path, tuned, transactions, results))
+            for _ in range(workers)
+        ]
+        started = time.perf_counter()
+        for process in processes:
+            process.start()
+        outcomes = [results.get() for _ in processes]
+        for process in processes:
+            process.join()
+        elapsed = time.perf_counter() - started
+
+    committed = sum(outcome[0] for outcome in outcomes)
+    locked = sum(outcome[1] for outcome in outcomes)
+    return committed, locked, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--transactions', type=int, default=300, help="Write transactions per worker.")
+    args = parser.parse_args()
+
+    for label, tuned in (('default', False), ('tuned', True)):
+        committed, locked, elapsed = run(tuned, args.workers, args.transactions)
+        print(f"{label:>8}: {committed} committed, {locked} locked errors, "
+              f"{elapsed:.2f}s, {committed / elapsed:.0f} transactions/sec")
+
+
+if __name__ == '__main__':
+    main()
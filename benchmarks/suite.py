@@ -0,0 +1,221 @@
+"""
+Time the main pages and form posts against a synthetic dataset.
+
+Builds a throwaway SQLite database, fills it with `manage.py seed_load`
+data, and requests each scenario below through the Django test client:
+the dashboard, task and project lists, project detail, the admin
+changelists, the task form posts and board moves. For every scenario it records the
+queries per request and the p50/p95/p99 latency, and writes them with the
+commit and dataset size to a JSON file:
+
+    python benchmarks/suite.py --projects 500 --tasks-per-project 200
+    python benchmarks/suite.py --compare benchmark-<older commit>.json
+
+With --compare, each scenario's p50, p95 and query count are printed next
+to the earlier run's. The dashboard panels are normally cached per user,
+which would hide their queries, so the dummy cache is used unless
+--dashboard-cache is given.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCHMARKS_DIR)
+sys.path.insert(0, REPO_DIR)
+
+
+def configure(database, dashboard_cache):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'project_task_management.settings')
+    import django
+    from django.conf import settings
+
+    settings.DEBUG = False  # Keep query logging out of the measurements
+    settings.ALLOWED_HOSTS = ['testserver']
+    settings.DATABASES['default']['NAME'] = database
+    if not dashboard_cache:
+        settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+    django.setup()
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+# Seed the database and return logged-in clients for the busiest assignee and for a superuser, plus
+# the fixtures the scenarios need
+def populate(args):
+    from django.contrib.auth.models import User
+    from django.core.management import call_command
+    from django.db.models import Count
+    from django.test import Client
+    from task_app.models import Project, Task
+
+    call_command('migrate', verbosity=0)
+    call_command('seed_load', users=args.users, projects=args.projects, tasks_per_project=args.tasks_per_project,
+                 seed=args.seed, stdout=sys.stdout)
+    user = User.objects.get(username='loaduser0')  # Assigned the most tasks by seed_load
+    admin = User.objects.create_superuser(username='benchadmin', email='admin@example.com', password='bench')
+    clients = {}
+    for role, account in (('user', user), ('staff', admin)):
+        clients[role] = Client(raise_request_exception=True)
+        clients[role].force_login(account)
+
+    today = datetime.now().date()
+    project = (Project.objects.filter(created_by=user).annotate(tasks=Count('task')).order_by('-tasks').first()
+               or Project.objects.order_by('pk').first())
+    open_project = Project.objects.filter(end_date__gte=today + timedelta(days=7)).order_by('pk').first()
+    task = Task.objects.filter(assigned_to=user).order_by('pk').first()
+    return clients, {'user': user.pk, 'project': project.pk, 'open_project': open_project, 'task': task}
+
+
+# (name, client, method, path, POST data or None); form posts alternate their data so every post changes something
+def scenarios(fixtures):
+    project, task = fixtures['open_project'], fixtures['task']
+
+    def task_form(number, **overrides):
+        data = {
+            'title': f"Benchmark task {number}", 'description': "Posted by the benchmark suite",
+            'assigned_to': fixtures['user'], 'status': 'pending', 'priority': 'medium',
+            'start_date': project.start_date.isoformat(), 'due_date': project.end_date.isoformat(),
+            'project': project.pk,
+        }
+        data.update(overrides)
+        return data
+
+    return [
+        ('dashboard', 'user', 'get', '/', None),
+        ('task list', 'user', 'get', '/tasks/', None),
+        ('task list filtered', 'user', 'get', '/tasks/?status=pending&priority=high', None),
+        ('task list search', 'user', 'get', '/tasks/?q=review', None),
+        ('task list (staff)', 'staff', 'get', '/tasks/', None),
+        ('project list', 'user', 'get', '/projects/', None),
+        ('project list (staff)', 'staff', 'get', '/projects/', None),
+        ('project detail', 'user', 'get', f"/projects/{fixtures['project']}/", None),
+        ('project board', 'staff', 'get', f"/projects/{fixtures['project']}/board/", None),
+        ('admin task changelist', 'staff', 'get', '/admin/task_app/task/', None),
+        ('admin task changelist filtered', 'staff', 'get', '/admin/task_app/task/?status__exact=pending', None),
+        ('admin project changelist', 'staff', 'get', '/admin/task_app/project/', None),
+        ('task create form', 'user', 'get', '/tasks/new/', None),
+        ('task create post', 'user', 'post', '/tasks/new/', task_form),
+        ('task update post', 'user', 'post', f'/tasks/{task.pk}/edit/',
+         lambda number: task_form(number, status=['in_progress', 'completed', 'pending'][number % 3])),
+        ('board move post', 'user', 'post', f'/tasks/{task.pk}/move/',
+         lambda number: {'status': ['in_progress', 'completed', 'pending'][number % 3]}),
+    ]
+
+
+# Issue one scenario `requests` times after a short warm-up; returns its query count and timing summary
+def run_scenario(client, method, path, data, requests, warmup):
+    from task_app.profiling import profiled
+
+    timings, queries, sql_times, template_times = [], [], [], []
+    for number in range(warmup + requests):
+        started = time.perf_counter()
+        with profiled() as profile:
+            if method == 'post':
+                response = client.post(path, data(number))
+            else:
+                response = client.get(path)
+        elapsed = (time.perf_counter() - started) * 1000
+        if response.status_code not in (200, 302):
+            raise RuntimeError(f"{method.upper()} {path} returned {response.status_code}")
+        if number >= warmup:
+            timings.append(elapsed)
+            queries.append(len(profile.queries))
+            sql_times.append(profile.query_time * 1000)
+            template_times.append(profile.template_time * 1000)
+    return {
+        'requests': requests,
+        'queries': statistics.median(queries),
+        'max_queries': max(queries),
+        'p50_ms': round(percentile(timings, 0.50), 2),
+        'p95_ms': round(percentile(timings, 0.95), 2),
+        'p99_ms': round(percentile(timings, 0.99), 2),
+        'mean_ms': round(statistics.fmean(timings), 2),
+        'sql_ms': round(statistics.fmean(sql_times), 2),
+        'template_ms': round(statistics.fmean(template_times), 2),
+    }
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def compare(results, previous_path):
+    with open(previous_path, encoding='utf-8') as previous_file:
+        previous = json.load(previous_file)
+    print(f"\nCompared with {previous.get('commit', '?')} ({previous_path}):")
+    for name, current in results['scenarios'].items():
+        before = previous.get('scenarios', {}).get(name)
+        if before is None:
+            print(f"{name:>32}: new scenario")
+            continue
+        changes = []
+        for key in ('p50_ms', 'p95_ms'):
+            change = (current[key] - before[key]) / before[key] * 100 if before[key] else 0
+            changes.append(f"{key[:3]} {before[key]:.1f} -> {current[key]:.1f} ms ({change:+.0f}%)")
+        changes.append(f"queries {before['queries']:g} -> {current['queries']:g}")
+        print(f"{name:>32}: {', '.join(changes)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--projects', type=int, default=200)
+    parser.add_argument('--tasks-per-project', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--requests', type=int, default=50, help="Timed requests per scenario.")
+    parser.add_argument('--warmup', type=int, default=5, help="Untimed requests per scenario.")
+    parser.add_argument('--only', action='append', help="Run only this scenario; may be repeated.")
+    parser.add_argument('--dashboard-cache', action='store_true', help="Serve dashboard panels from the cache.")
+    parser.add_argument('--output', help="Results file; defaults to benchmark-<commit>.json.")
+    parser.add_argument('--compare', help="Earlier results file to compare against.")
+    args = parser.parse_args()
+
+    commit = git_commit()
+    results = {
+        'commit': commit,
+        'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'dataset': {'users': args.users, 'projects': args.projects, 'tasks_per_project': args.tasks_per_project,
+                    'seed': args.seed},
+        'dashboard_cache': args.dashboard_cache,
+        'scenarios': {},
+    }
+    with tempfile.TemporaryDirectory() as directory:
+        configure(os.path.join(directory, 'suite.sqlite3'), args.dashboard_cache)
+        import django
+        results['django'] = django.get_version()
+        clients, fixtures = populate(args)
+        for name, role, method, path, data in scenarios(fixtures):
+            if args.only and name not in args.only:
+                continue
+            result = run_scenario(clients[role], method, path, data, args.requests, args.warmup)
+            results['scenarios'][name] = result
+            print(f"{name:>32}: {result['queries']:5g} queries, p50 {result['p50_ms']:7.1f} ms, "
+                  f"p95 {result['p95_ms']:7.1f} ms, p99 {result['p99_ms']:7.1f} ms")
+
+    output = args.output or f'benchmark-{commit}.json'
+    with open(output, 'w', encoding='utf-8') as output_file:
+        json.dump(results, output_file, indent=2)
+    print(f"Wrote {output}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
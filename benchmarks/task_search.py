@@ -0,0 +1,138 @@
+"""
+Compare the FTS5 task search with the LIKE scan it replaces.
+
+Builds a throwaway SQLite database with the task and project columns the
+search touches, fills it with synthetic tasks, indexes them with the same
+FTS5 table and triggers as task_app.search, and times both query paths:
+
+    python benchmarks/task_search.py --tasks 1000000
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from task_app.search import CREATE_TABLE_SQL, FTS_TABLE, TRIGGER_SQL, build_match_query  # noqa: E402
+
+SCHEMA = """
+CREATE TABLE task_app_project (id INTEGER PRIMARY KEY, name VARCHAR(100) NOT NULL);
+CREATE TABLE task_app_task (
+    id INTEGER PRIMARY KEY,
+    title VARCHAR(150) NOT NULL,
+    description TEXT NOT NULL,
+    project_id INTEGER NOT NULL REFERENCES task_app_project (id)
+);
+CREATE INDEX task_app_task_project_id ON task_app_task (project_id);
+"""
+
+SYLLABLES = ['ba', 'ce', 'di', 'fo', 'gu', 'ka', 'le', 'mi', 'no', 'pu', 'ra', 'se', 'ti', 'vo', 'zu']
+# Common, mid-frequency and rare words of the Zipf-distributed vocabulary, plus a two-word query
+QUERY_RANKS = [(5,), (50,), (500,), (5000,), (50, 500)]
+
+
+# Pseudo-words with Zipf-like frequencies, like the vocabulary of real task descriptions
+def vocabulary(size, rng):
+    words = sorted({''.join(rng.choices(SYLLABLES, k=rng.randint(2, 4))) for _ in range(size * 2)})[:size]
+    rng.shuffle(words)
+    cumulative, total = [], 0.0
+    for rank in range(1, len(words) + 1):
+        total += 1 / rank
+        cumulative.append(total)
+    return words, cumulative
+
+
+def populate(connection, tasks, projects, words, cumulative):
+    rng = random.Random(42)
+
+    def text(count):
+        return ' '.join(rng.choices(words, cum_weights=cumulative, k=count))
+
+    connection.executemany(
+        'INSERT INTO task_app_project (id, name) VALUES (?, ?)',
+        ((pk, text(2).title()) for pk in range(1, projects + 1)))
+    connection.executemany(
+        'INSERT INTO task_app_task (id, title, description, project_id) VALUES (?, ?, ?, ?)',
+        ((pk, text(4).capitalize(), text(30), rng.randint(1, projects)) for pk in range(1, tasks + 1)))
+    connection.commit()
+
+
+def build_index(connection):
+    connection.execute(CREATE_TABLE_SQL)
+    connection.execute(
+        f'INSERT INTO {FTS_TABLE} (rowid, title, description, project_name) '
+        'SELECT t.id, t.title, t.description, p.name FROM task_app_task t '
+        'JOIN task_app_project p ON p.id = t.project_id')
+    for statement in TRIGGER_SQL:
+        connection.execute(statement)
+    connection.commit()
+
+
+# The admin's old search_fields lookup: every term must match one of the columns, via LIKE.
+# Like a changelist, fetch one page and count all matches.
+def like_search(connection, text, limit):
+    clauses, params = [], []
+    for term in text.split():
+        clauses.append('(t.title LIKE ? OR t.description LIKE ? OR p.name LIKE ?)')
+        params += [f'%{term}%'] * 3
+    where = (' FROM task_app_task t JOIN task_app_project p ON p.id = t.project_id '
+             f'WHERE {" AND ".join(clauses)}')
+    connection.execute(f'SELECT t.id {where} ORDER BY t.id DESC LIMIT ?', params + [limit]).fetchall()
+    return connection.execute(f'SELECT COUNT(*) {where}', params).fetchone()[0]
+
+
+# The query shape TaskQuerySet.search produces: FTS match ranked with bm25, plus the match count
+def fts_search(connection, text, limit):
+    match = build_match_query(text)
+    connection.execute(
+        f'SELECT t.id FROM task_app_task t JOIN {FTS_TABLE} f ON f.rowid = t.id '
+        f'WHERE {FTS_TABLE} MATCH ? ORDER BY bm25({FTS_TABLE}) LIMIT ?', (match, limit)).fetchall()
+    return connection.execute(f'SELECT COUNT(*) FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH ?', (match,)).fetchone()[0]
+
+
+def time_queries(search, connection, queries, repeat, limit):
+    timings = []
+    for text in queries:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            search(connection, text, limit)
+            timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), max(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tasks', type=int, default=1_000_000)
+    parser.add_argument('--projects', type=int, default=2_000)
+    parser.add_argument('--repeat', type=int, default=3, help="Runs of each query.")
+    parser.add_argument('--limit', type=int, default=50, help="Rows per result page.")
+    parser.add_argument('--vocabulary', type=int, default=20_000, help="Distinct words in the synthetic text.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        connection = sqlite3.connect(os.path.join(directory, 'search.sqlite3'))
+        connection.executescript(SCHEMA)
+
+        words, cumulative = vocabulary(args.vocabulary, random.Random(7))
+        queries = [' '.join(words[rank - 1] for rank in ranks) for ranks in QUERY_RANKS if max(ranks) <= len(words)]
+        started = time.perf_counter()
+        populate(connection, args.tasks, args.projects, words, cumulative)
+        print(f"Loaded {args.tasks} tasks in {time.perf_counter() - started:.1f}s")
+        started = time.perf_counter()
+        build_index(connection)
+        print(f"Built the FTS5 index in {time.perf_counter() - started:.1f}s")
+
+        for label, search in (('LIKE', like_search), ('FTS5', fts_search)):
+            median, worst = time_queries(search, connection, queries, args.repeat, args.limit)
+            print(f"{label:>5}: median {median:.1f} ms, max {worst:.1f} ms per query")
+        connection.close()
+
+
+if __name__ == '__main__':
+    main()
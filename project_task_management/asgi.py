@@ -12,5 +12,9 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'project_task_management.settings')
+# Connections opened in sync_to_async threads are not reused by later requests, so close them per request
+os.environ.setdefault('DB_CONN_MAX_AGE', '0')
+# Serve the dashboard and the project and task lists with their async views
+os.environ.setdefault('ASYNC_VIEWS', '1')
 
 application = get_asgi_application()
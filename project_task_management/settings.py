@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/3.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -45,6 +46,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'task_app.profiling.ProfilingMiddleware',  # Outermost, so it times everything below; off unless REQUEST_PROFILING
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -74,17 +76,89 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'project_task_management.wsgi.application'
 
+# Route the dashboard and the project and task lists to their async views. asgi.py sets ASYNC_VIEWS to 1; under
+# WSGI and runserver the async views would run through async_to_sync, which only adds overhead
+ASYNC_VIEWS = os.environ.get('ASYNC_VIEWS') == '1'
+
 
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
 
+# Pragmas run on every new SQLite connection: WAL lets readers proceed during writes, NORMAL sync
+# is durable in WAL mode, and mmap plus a 64 MB page cache keep hot pages out of read() calls.
+SQLITE_INIT_COMMAND = ';'.join([
+    'PRAGMA journal_mode=WAL',
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA mmap_size=268435456',
+    'PRAGMA cache_size=-65536',
+    'PRAGMA temp_store=MEMORY',
+])
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Reuse connections across requests instead of reopening per request. asgi.py sets DB_CONN_MAX_AGE to 0:
+        # under ASGI each request's ORM calls run on a fresh sync_to_async thread with a connection of its own,
+        # so a kept connection would never be reused, only left open
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 600)),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'timeout': 20,  # Busy timeout in seconds before raising "database is locked"
+            # Take the write lock when a transaction starts, so concurrent writers wait for the busy
+            # timeout instead of failing immediately when a read lock cannot be upgraded
+            'transaction_mode': 'IMMEDIATE',
+            'init_command': SQLITE_INIT_COMMAND,
+        },
+    }
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+
+# A file-based cache is shared by every worker process on the host, so the model-driven invalidation in
+# task_app.caching reaches all of them. Point CACHE_DIR at a fast local disk; behind several hosts use
+# a networked backend such as Redis instead.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('CACHE_DIR', BASE_DIR / 'django_cache'),
+        # Past MAX_ENTRIES files, every set() deletes a random third of them (the default of 300 is passed by a
+        # few hundred users' panels, project access and choices). Each set() also lists the directory, so keep
+        # this within what the disk lists quickly.
+        'OPTIONS': {'MAX_ENTRIES': 50000},
     }
 }
 
+# The tests run against a per-process cache, leaving the shared cache directory alone
+TEST_RUNNER = 'project_task_management.test_runner.TestRunner'
+
+# Seconds a rendered dashboard panel is kept; saves and deletes invalidate it sooner
+DASHBOARD_CACHE_TIMEOUT = 300
+
+# Seconds a user's owned and shared project ids are kept; membership and ownership changes invalidate them
+# sooner, in every worker since the cache is shared
+PROJECT_ACCESS_CACHE_TIMEOUT = 300
+
+# Seconds rendered form choices (the task form's project select, user autocomplete pages) are kept; project,
+# membership and user changes invalidate them sooner
+CHOICES_CACHE_TIMEOUT = 600
+
+# Live task updates (task_app.live, served at /tasks/events/ under ASGI): events kept for clients resuming
+# a stream or long poll, events queued per client before it is told to reload instead, and seconds between
+# keep-alive comments on an idle stream, which is also the longest a long poll waits
+LIVE_EVENTS_BUFFER_SIZE = 1000
+LIVE_EVENTS_QUEUE_SIZE = 100
+LIVE_EVENTS_KEEPALIVE = 25
+
+# Time every request, its SQL and its template rendering: Server-Timing headers, repeated query warnings
+# and the staff page at /profiling/. Adds overhead, so keep it off unless investigating.
+REQUEST_PROFILING = False
+
+# Whether admin changelists also run an unfiltered COUNT(*) to show "N of M"; slow on large tables
+ADMIN_SHOW_FULL_RESULT_COUNT = False
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
@@ -136,3 +210,10 @@ CRISPY_TEMPLATE_PACK = "bootstrap5"
 LOGIN_REDIRECT_URL = 'dashboard'
 LOGOUT_REDIRECT_URL = 'login'
 
+
+# Due-date notifications (manage.py notify_due_tasks). Mail lands in files under sent_emails/ until a real
+# backend is configured; tests use the locmem backend.
+EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
+DEFAULT_FROM_EMAIL = 'tasks@localhost'
+TASK_DUE_SOON_DAYS = 2  # A task is "due soon" this many days ahead of its due date
@@ -0,0 +1,198 @@
+import hashlib
+
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import HttpResponseNotModified, JsonResponse
+from django.utils.http import parse_etags, quote_etag
+from django.views import View
+
+from .models import Project, Task
+from .pagination import InvalidCursor, paginate_by_cursor
+
+
+# Base view for the read-only JSON API: session auth, sparse fieldsets and ETags
+class ApiView(LoginRequiredMixin, View):
+    fields = {}  # Public field name -> model attribute
+    field_columns = {}  # Public field name -> columns to load, when it is not a concrete field of the same name
+    default_fields = ()
+    version_fields = ('id', 'updated_at')  # Columns whose values change whenever a row's representation does
+
+    # Answer unauthenticated API calls with JSON instead of a login redirect
+    def handle_no_permission(self):
+        return JsonResponse({'error': "Authentication required."}, status=401)
+
+    def get_queryset(self):
+        raise NotImplementedError
+
+    # Parse ?fields=a,b,c into the list of requested public field names
+    def get_fields(self):
+        requested = self.request.GET.get('fields')
+        if not requested:
+            return list(self.default_fields)
+        fields = [name.strip() for name in requested.split(',') if name.strip()]
+        unknown = [name for name in fields if name not in self.fields]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}.")
+        return fields
+
+    # Load only the columns needed to serialize the requested fields and compute the ETag
+    def only_columns(self, fields, extra=()):
+        columns = set(self.version_fields) | set(extra)
+        for name in fields:
+            columns.update(self.field_columns.get(name, (self.fields[name],)))
+        return columns
+
+    def serialize(self, obj, fields):
+        data = {}
+        for name in fields:
+            value = getattr(obj, self.fields[name])
+            data[name] = value() if callable(value) else value
+        return data
+
+    def make_etag(self, objs, fields, extra=''):
+        digest = hashlib.sha1(','.join(fields).encode())
+        digest.update(extra.encode())
+        for obj in objs:
+            digest.update(repr([getattr(obj, name) for name in self.version_fields]).encode())
+        return quote_etag(digest.hexdigest())
+
+    # Return 304 when the client already holds this representation, otherwise serialize it
+    def respond(self, etag, build):
+        if etag in parse_etags(self.request.headers.get('If-None-Match', '')):
+            response = HttpResponseNotModified()
+        else:
+            response = JsonResponse(build())
+        response['ETag'] = etag
+        return response
+
+    def error(self, message, status=400):
+        return JsonResponse({'error': message}, status=status)
+
+
+class ApiListView(ApiView):
+    ordering = ('id',)
+    page_size = 50
+    max_page_size = 200
+
+    def filter_queryset(self, queryset):
+        return queryset
+
+    def get(self, request):
+        try:
+            fields = self.get_fields()
+            page_size = min(int(request.GET.get('limit', self.page_size)), self.max_page_size)
+            if page_size < 1:
+                raise ValueError("limit must be positive.")
+        except ValueError as exc:
+            return self.error(str(exc))
+        queryset = self.filter_queryset(self.get_queryset())
+        queryset = queryset.only(*self.only_columns(fields, (name.lstrip('-') for name in self.ordering)))
+        try:
+            rows, next_cursor = paginate_by_cursor(queryset, self.ordering, request.GET.get('cursor'), page_size)
+        except InvalidCursor as exc:
+            return self.error(str(exc))
+
+        next_url = None
+        if next_cursor:
+            params = request.GET.copy()
+            params['cursor'] = next_cursor
+            next_url = request.build_absolute_uri(f'{request.path}?{params.urlencode()}')
+
+        etag = self.make_etag(rows, fields, next_cursor or '')
+        return self.respond(etag, lambda: {
+            'results': [self.serialize(obj, fields) for obj in rows],
+            'next': next_url,
+        })
+
+
+class ApiDetailView(ApiView):
+    def get(self, request, pk):
+        try:
+            fields = self.get_fields()
+        except ValueError as exc:
+            return self.error(str(exc))
+        obj = self.get_queryset().only(*self.only_columns(fields)).filter(pk=pk).first()
+        if obj is None:
+            return self.error("Not found.", status=404)
+        return self.respond(self.make_etag([obj], fields), lambda: self.serialize(obj, fields))
+
+
+# Field configuration shared by the project endpoints
+class ProjectApiMixin:
+    fields = {
+        'id': 'id',
+        'name': 'name',
+        'description': 'description',
+        'start_date': 'start_date',
+        'end_date': 'end_date',
+        'created_by': 'created_by_id',
+        'created_at': 'created_at',
+        'updated_at': 'updated_at',
+        'task_count': 'task_count',
+        'pending_count': 'pending_count',
+        'in_progress_count': 'in_progress_count',
+        'completed_count': 'completed_count',
+        'completion_rate': 'get_completion_rate',
+    }
+    field_columns = {
+        'created_by': ('created_by',),
+        'completion_rate': ('task_count', 'completed_count'),
+    }
+    default_fields = ('id', 'name', 'description', 'start_date', 'end_date', 'created_by', 'completion_rate')
+    # Task counters change through F() updates that leave updated_at alone
+    version_fields = ('id', 'updated_at', *Project.COUNTER_FIELDS)
+
+    # Same visibility rule as ProjectListView
+    def get_queryset(self):
+        return Project.objects.visible_to(self.request.user)
+
+
+# Field configuration shared by the task endpoints
+class TaskApiMixin:
+    fields = {
+        'id': 'id',
+        'title': 'title',
+        'description': 'description',
+        'status': 'status',
+        'priority': 'priority',
+        'start_date': 'start_date',
+        'due_date': 'due_date',
+        'project': 'project_id',
+        'assigned_to': 'assigned_to_id',
+        'created_at': 'created_at',
+        'updated_at': 'updated_at',
+    }
+    field_columns = {
+        'project': ('project',),
+        'assigned_to': ('assigned_to',),
+    }
+    default_fields = ('id', 'title', 'status', 'priority', 'start_date', 'due_date', 'project', 'assigned_to')
+
+    # Same visibility rule as TaskListView and TaskDetailView
+    def get_queryset(self):
+        return Task.objects.visible_to(self.request.user)
+
+
+class ProjectApiListView(ProjectApiMixin, ApiListView):
+    ordering = ('-created_at', '-id')
+
+
+class ProjectApiDetailView(ProjectApiMixin, ApiDetailView):
+    pass
+
+
+class TaskApiListView(TaskApiMixin, ApiListView):
+    ordering = ('due_date', 'id')
+
+    # Same status/priority filters as TaskListView
+    def filter_queryset(self, queryset):
+        status = self.request.GET.get('status')
+        priority = self.request.GET.get('priority')
+        if status:
+            queryset = queryset.filter(status=status)
+        if priority:
+            queryset = queryset.filter(priority=priority)
+        return queryset
+
+
+class TaskApiDetailView(TaskApiMixin, ApiDetailView):
+    pass
@@ -0,0 +1,125 @@
+from datetime import timedelta
+from itertools import islice
+
+from django.db import connection, transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from .caching import invalidate_dashboards, invalidate_project_access
+from .live import publish_refresh
+from .models import (ArchivedProject, ArchivedTask, Notification, Project, ProjectMembership, Task, TaskDependency,
+                     TaskRecurrence)
+
+# Columns copied between the hot and the archive tables, under the same names on both sides
+PROJECT_FIELDS = ['id', 'name', 'description', 'start_date', 'end_date', 'created_by_id', 'created_at', 'updated_at']
+TASK_FIELDS = [
+    'id', 'title', 'description', 'assigned_to_id', 'status', 'priority', 'start_date', 'due_date',
+    'project_id', 'created_at', 'updated_at', 'board_position',
+]
+
+
+def _batches(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+# Projects that ended before `before` and have no task left to do
+def archivable_projects(before):
+    open_tasks = Task.objects.filter(project=OuterRef('pk')).exclude(status='completed')
+    return Project.objects.filter(end_date__lt=before).exclude(Exists(open_tasks))
+
+
+# Move every project that ended more than `days` days ago with all its tasks completed into the archive tables.
+# Whole projects move together, about `chunk_size` tasks' worth per transaction, so a project is always either
+# hot or archived and an interrupted run simply continues with the projects left. Returns the number archived.
+def archive_projects(today=None, days=30, chunk_size=1000, batch_size=1000):
+    before = (today or timezone.localdate()) - timedelta(days=days)
+    archived = 0
+    last_pk = 0
+    while True:
+        with transaction.atomic():
+            candidates = (archivable_projects(before).select_for_update().filter(pk__gt=last_pk)
+                          .order_by('pk').values_list('pk', 'task_count')[:chunk_size])
+            project_ids, tasks = [], 0
+            for pk, task_count in candidates:
+                if project_ids and tasks + task_count > chunk_size:
+                    break  # A project larger than a chunk gets a transaction of its own
+                project_ids.append(pk)
+                tasks += task_count
+            if not project_ids:
+                return archived
+            _archive(project_ids, batch_size)
+        archived += len(project_ids)
+        last_pk = project_ids[-1]
+
+
+def _archive(project_ids, batch_size):
+    tasks = Task.objects.filter(project_id__in=project_ids)
+    user_ids = tasks._audience()[0]  # Assignees and owners whose dashboards list these tasks
+    ArchivedProject.objects.bulk_create(
+        ArchivedProject(**row) for row in Project.objects.filter(pk__in=project_ids).values(*PROJECT_FIELDS))
+    ArchivedProject.members.through.objects.bulk_create(
+        ArchivedProject.members.through(archivedproject_id=project_id, user_id=user_id)
+        for project_id, user_id in ProjectMembership.objects.filter(project_id__in=project_ids)
+        .values_list('project_id', 'user_id'))
+    for batch in _batches(tasks.order_by('pk').values(*TASK_FIELDS).iterator(chunk_size=batch_size), batch_size):
+        ArchivedTask.objects.bulk_create(ArchivedTask(**row) for row in batch)
+    dependencies = TaskDependency.objects.filter(task__project_id__in=project_ids)
+    for batch in _batches(dependencies.values_list('task_id', 'depends_on_id').iterator(chunk_size=batch_size),
+                          batch_size):
+        ArchivedTask.depends_on.through.objects.bulk_create(
+            ArchivedTask.depends_on.through(from_archivedtask_id=task_id, to_archivedtask_id=depends_on_id)
+            for task_id, depends_on_id in batch)
+
+    # Rows pointing at the tasks go first. Finished recurrences have nothing left to generate and are dropped,
+    # as are the tasks' links from past notifications.
+    dependencies.delete()
+    TaskRecurrence.objects.filter(template__project_id__in=project_ids).delete()
+    Notification.tasks.through.objects.filter(task__project_id__in=project_ids).delete()
+    # Nothing else points at the tasks now, so they go in plain DELETEs instead of through the collector.
+    # Their projects go next, which makes counter updates moot; the search index follows through its trigger.
+    with connection.cursor() as cursor:
+        for batch in _batches(project_ids, 500):  # Well under SQLite's bound parameter limit
+            placeholders = ', '.join(['%s'] * len(batch))
+            cursor.execute(f'DELETE FROM {Task._meta.db_table} WHERE project_id IN ({placeholders})', batch)
+    # Signals still run for the projects and memberships: status log, snapshots, project access and choices.
+    # The tasks are gone by now, so their assignees' dashboards and live streams are refreshed here.
+    Project.objects.filter(pk__in=project_ids).delete()
+    invalidate_dashboards(user_ids)
+    publish_refresh(user_ids, project_ids)
+
+
+# Move archived projects back into the hot tables under their original ids, one transaction per project.
+# Counters and status events are rebuilt by Task.objects.bulk_create, so burndown history starts again at the
+# restore. Returns the ids of the projects restored.
+def restore_projects(project_ids, batch_size=1000):
+    restored = []
+    for archived in ArchivedProject.objects.filter(pk__in=project_ids).order_by('pk'):
+        restored.append(archived.pk)  # Before delete() clears it
+        with transaction.atomic():
+            _restore(archived, batch_size)
+    return restored
+
+
+def _restore(archived, batch_size):
+    values = {field: getattr(archived, field) for field in PROJECT_FIELDS}
+    project = Project.objects.create(**values)
+    member_ids = list(archived.members.values_list('pk', flat=True))
+    ProjectMembership.objects.bulk_create(ProjectMembership(project=project, user_id=user_id) for user_id in member_ids)
+    invalidate_project_access(member_ids)
+
+    for batch in _batches(archived.tasks.order_by('pk').values(*TASK_FIELDS).iterator(chunk_size=batch_size),
+                          batch_size):
+        tasks = Task.objects.bulk_create([Task(**row) for row in batch])
+        # auto_now_add and auto_now stamped the insert; put back the original times
+        for task, row in zip(tasks, batch):
+            task.created_at, task.updated_at = row['created_at'], row['updated_at']
+        Task.objects.bulk_update(tasks, ['created_at', 'updated_at'])
+    links = ArchivedTask.depends_on.through.objects.filter(from_archivedtask__project=archived)
+    for batch in _batches(links.values_list('from_archivedtask_id', 'to_archivedtask_id')
+                          .iterator(chunk_size=batch_size), batch_size):
+        TaskDependency.objects.bulk_create(
+            TaskDependency(task_id=task_id, depends_on_id=depends_on_id) for task_id, depends_on_id in batch)
+    Project.objects.filter(pk=project.pk).update(created_at=archived.created_at, updated_at=archived.updated_at)
+    archived.delete()
@@ -0,0 +1,70 @@
+from itertools import groupby
+
+from django.db import transaction
+from django.db.models import Max
+
+from .models import Task
+
+POSITION_GAP = 1024.0  # Space between cards after a renumber, and past the first or last card
+
+
+# The project's board as [(status, label, [tasks])] in STATUS_CHOICES order, loaded in one query
+def board_columns(project):
+    tasks = (Task.objects.filter(project=project).select_related('assigned_to')
+             .only('title', 'status', 'priority', 'due_date', 'board_position', 'project_id',
+                   'assigned_to__username')
+             .order_by('status', 'board_position', 'id'))
+    cards = {status: list(column) for status, column in groupby(tasks, key=lambda task: task.status)}
+    return [(status, label, cards.get(status, [])) for status, label in Task.STATUS_CHOICES]
+
+
+# Position strictly between the neighbours, or None when they leave no room or are out of order
+def _position_between(lower, upper):
+    if lower is None:
+        return upper - POSITION_GAP
+    if upper is None:
+        return lower + POSITION_GAP
+    position = (lower + upper) / 2
+    return position if lower < position < upper else None
+
+
+# Respace a column to POSITION_GAP steps in its current card order
+def _renumber_column(project_id, status):
+    column = list(Task.objects.filter(project_id=project_id, status=status)
+                  .order_by('board_position', 'id').only('board_position'))
+    for index, task in enumerate(column, start=1):
+        task.board_position = index * POSITION_GAP
+    Task.objects.bulk_update(column, ['board_position'], batch_size=500)
+
+
+# Move a card into `status` between the cards `previous_id` and `next_id` (either may be None for the ends
+# of the column), saving only its status and position. Neighbours that are not in that column are ignored.
+def move_task(task, status, previous_id=None, next_id=None):
+    with transaction.atomic():
+        neighbours = (Task.objects.filter(project_id=task.project_id, status=status)
+                      .filter(pk__in=[pk for pk in (previous_id, next_id) if pk]).exclude(pk=task.pk))
+        positions = dict(neighbours.values_list('pk', 'board_position'))
+        lower, upper = positions.get(previous_id), positions.get(next_id)
+        if lower is None and upper is None:
+            # Dropped into an empty column, or without known neighbours: append it
+            last = (Task.objects.filter(project_id=task.project_id, status=status).exclude(pk=task.pk)
+                    .aggregate(last=Max('board_position'))['last'])
+            position = 0.0 if last is None else last + POSITION_GAP
+        else:
+            position = _position_between(lower, upper)
+            if position is None:
+                # Neighbours share a position (e.g. cards never moved since they were created), so respace them
+                _renumber_column(task.project_id, status)
+                positions = dict(neighbours.values_list('pk', 'board_position'))
+                lower, upper = positions.get(previous_id), positions.get(next_id)
+                position = _position_between(lower, upper)
+                if position is None:
+                    # The client's neighbours were stale and out of order; go just after the previous card
+                    position = lower + POSITION_GAP / 2
+        update_fields = ['board_position', 'updated_at']
+        if status != task.status:
+            update_fields.append('status')
+        task.status = status
+        task.board_position = position
+        task.save(update_fields=update_fields)
+    return task
@@ -0,0 +1,122 @@
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Checkpoint, Project, ProjectStatusSnapshot, TaskStatusEvent
+
+ROLLUP_CHECKPOINT = 'project_status_snapshots'
+SNAPSHOT_COUNT_FIELDS = list(Project.STATUS_COUNTER_FIELDS.values())
+
+
+# Fold the TaskStatusEvents logged since the last run into the daily project snapshots, one batch per
+# transaction, and return how many events were consumed. Event ids follow commit order because SQLite
+# serializes writers (BEGIN IMMEDIATE), so the checkpoint never skips a late-committing event.
+def roll_up_status_events(batch_size=5000):
+    consumed = 0
+    while True:
+        with transaction.atomic():
+            checkpoint, _created = Checkpoint.objects.select_for_update().get_or_create(name=ROLLUP_CHECKPOINT)
+            events = list(TaskStatusEvent.objects.filter(pk__gt=checkpoint.position).order_by('pk')
+                          .values_list('pk', 'project_id', 'old_status', 'new_status', 'changed_at')[:batch_size])
+            if not events:
+                return consumed
+            changes = _day_changes(event[1:] for event in events)
+            existing = set(Project.objects.filter(pk__in={key[0] for key in changes}).values_list('pk', flat=True))
+            for (project_id, day), day_changes in sorted(changes.items()):
+                if project_id in existing:
+                    _apply_day_changes(project_id, day, day_changes)
+            checkpoint.position = events[-1][0]
+            checkpoint.save(update_fields=['position', 'updated_at'])
+            consumed += len(events)
+
+
+# Sum (project_id, old_status, new_status, changed_at) events into counter changes per (project_id, day)
+def _day_changes(events):
+    changes = defaultdict(Counter)
+    for project_id, old_status, new_status, changed_at in events:
+        day_changes = changes[(project_id, timezone.localdate(changed_at))]
+        if old_status:
+            day_changes[Project.STATUS_COUNTER_FIELDS[old_status]] -= 1
+        if new_status:
+            day_changes[Project.STATUS_COUNTER_FIELDS[new_status]] += 1
+            if new_status == 'completed':
+                day_changes['completed_events'] += 1
+    return changes
+
+
+# Add one day's changes to that day's snapshot, starting it from the previous day's counts if needed,
+# and shift the counts of any later snapshots by the same amount
+def _apply_day_changes(project_id, day, day_changes):
+    snapshots = ProjectStatusSnapshot.objects.filter(project_id=project_id)
+    latest = snapshots.filter(day__lte=day).order_by('-day').first()
+    if latest is None or latest.day != day:
+        carried = {field: getattr(latest, field, 0) for field in SNAPSHOT_COUNT_FIELDS}
+        ProjectStatusSnapshot.objects.create(project_id=project_id, day=day, **carried)
+    counts = {field: F(field) + change for field, change in day_changes.items()
+              if change and field in SNAPSHOT_COUNT_FIELDS}
+    snapshots.filter(day=day).update(**counts, completed_events=F('completed_events') + day_changes['completed_events'])
+    if counts:
+        snapshots.filter(day__gt=day).update(**counts)
+
+
+# A project's daily snapshots up to `until` as (day, counts) pairs, with the events logged since the last rollup
+# folded in the way the rollup would, so the charts are current without writing anything
+def project_snapshots(project, until=None):
+    rows = ProjectStatusSnapshot.objects.filter(project=project)
+    if until:
+        rows = rows.filter(day__lte=until)
+    snapshots = {row.day: {field: getattr(row, field) for field in [*SNAPSHOT_COUNT_FIELDS, 'completed_events']}
+                 for row in rows}
+    position = Checkpoint.objects.filter(name=ROLLUP_CHECKPOINT).values_list('position', flat=True).first() or 0
+    events = (TaskStatusEvent.objects.filter(project=project, pk__gt=position)
+              .values_list('project_id', 'old_status', 'new_status', 'changed_at'))
+    for (_project_id, day), day_changes in sorted(_day_changes(events).items()):
+        if until and day > until:
+            continue
+        if day not in snapshots:
+            latest = max((earlier for earlier in snapshots if earlier < day), default=None)
+            snapshots[day] = {field: snapshots[latest][field] if latest else 0 for field in SNAPSHOT_COUNT_FIELDS}
+            snapshots[day]['completed_events'] = 0
+        for later, counts in snapshots.items():
+            if later >= day:
+                for field in SNAPSHOT_COUNT_FIELDS:
+                    counts[field] += day_changes[field]
+        snapshots[day]['completed_events'] += day_changes['completed_events']
+    return sorted(snapshots.items())
+
+
+# Daily (day, remaining, completed) points from the first snapshot to today, carrying counts over days without changes
+def burndown_series(project, until=None):
+    until = until or timezone.localdate()
+    rows = project_snapshots(project, until)
+    series = []
+    if not rows:
+        return series
+    (day, current), index = rows[0], 0
+    while day <= until:
+        if index < len(rows) and rows[index][0] == day:
+            current = rows[index][1]
+            index += 1
+        series.append((day, current['pending_count'] + current['in_progress_count'], current['completed_count']))
+        day += timedelta(days=1)
+    return series
+
+
+# Tasks completed per week, oldest week first
+def velocity_series(project):
+    weeks = defaultdict(int)
+    for day, counts in project_snapshots(project):
+        weeks[day - timedelta(days=day.weekday())] += counts['completed_events']
+    return sorted(weeks.items())
+
+
+# SVG polyline points for values plotted left to right in a width x height box
+def chart_points(values, width, height):
+    if not values:
+        return ''
+    top = max(values) or 1
+    step = width / max(len(values) - 1, 1)
+    return ' '.join(f'{index * step:.1f},{height - value / top * height:.1f}' for index, value in enumerate(values))
@@ -0,0 +1,151 @@
+import os
+import threading
+from collections import Counter
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+# Dashboard cache hits and misses of this process. Counting them in the shared cache would write a file on
+# every hit, and FileBasedCache.incr() is a get and a set, which loses counts under concurrency.
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+
+# Run `apply` now and again once the transaction commits, so a request reading between the write and the
+# commit cannot cache the old data again under the new version (or key)
+def _now_and_on_commit(apply):
+    apply()
+    transaction.on_commit(apply)
+
+
+def _version_key(user_id):
+    return f'dashboard:version:{user_id}'
+
+
+# Current value of a version key; a fresh random token avoids reusing stale entries, so a version key culled
+# from the cache only costs a re-render, never stale data
+def _current_version(key):
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid4().hex, timeout=None)
+        version = cache.get(key)
+    return version
+
+
+# Current cache version of a user's dashboard
+def dashboard_version(user_id):
+    return _current_version(_version_key(user_id))
+
+
+async def adashboard_version(user_id):
+    key = _version_key(user_id)
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, uuid4().hex, timeout=None)
+        version = await cache.aget(key)
+    return version
+
+
+# Drop the cached dashboard panels of the given users by moving them to a new version
+def invalidate_dashboards(user_ids):
+    user_ids = {user_id for user_id in user_ids if user_id is not None}
+    if not user_ids:
+        return
+
+    _now_and_on_commit(lambda: cache.set_many({_version_key(user_id): uuid4().hex for user_id in user_ids},
+                                              timeout=None))
+
+
+def _record(outcome):
+    with _stats_lock:
+        _stats[outcome] += 1
+
+
+# Return a user's rendered dashboard panel from the cache, rendering and storing it on a miss
+def cached_dashboard_panel(user_id, panel, render):
+    key = f'dashboard:{user_id}:{dashboard_version(user_id)}:{panel}'
+    html = cache.get(key)
+    if html is not None:
+        _record('hits')
+        return html
+    _record('misses')
+    html = render()
+    cache.set(key, html, settings.DASHBOARD_CACHE_TIMEOUT)
+    return html
+
+
+# Async counterpart of cached_dashboard_panel; render is a coroutine function
+async def acached_dashboard_panel(user_id, panel, render):
+    key = f'dashboard:{user_id}:{await adashboard_version(user_id)}:{panel}'
+    html = await cache.aget(key)
+    if html is not None:
+        _record('hits')
+        return html
+    _record('misses')
+    html = await render()
+    await cache.aset(key, html, settings.DASHBOARD_CACHE_TIMEOUT)
+    return html
+
+
+# Hit and miss counts of the process answering, since it started
+def dashboard_cache_stats():
+    with _stats_lock:
+        stats = {'hits': _stats['hits'], 'misses': _stats['misses'], 'pid': os.getpid()}
+    lookups = stats['hits'] + stats['misses']
+    stats['hit_rate'] = stats['hits'] / lookups if lookups else None
+    return stats
+
+
+def _project_access_key(user_id):
+    return f'project-access:{user_id}'
+
+
+# Return a user's cached ProjectAccess, loading it with load() on a miss
+def cached_project_access(user_id, load):
+    key = _project_access_key(user_id)
+    access = cache.get(key)
+    if access is None:
+        access = load()
+        cache.set(key, access, settings.PROJECT_ACCESS_CACHE_TIMEOUT)
+    return access
+
+
+# Async counterpart of cached_project_access; load is a coroutine function
+async def acached_project_access(user_id, load):
+    key = _project_access_key(user_id)
+    access = await cache.aget(key)
+    if access is None:
+        access = await load()
+        await cache.aset(key, access, settings.PROJECT_ACCESS_CACHE_TIMEOUT)
+    return access
+
+
+# Forget the cached project ids of users whose memberships or owned projects changed
+def invalidate_project_access(user_ids):
+    keys = [_project_access_key(user_id) for user_id in set(user_ids) if user_id is not None]
+    if not keys:
+        return
+    _now_and_on_commit(lambda: cache.delete_many(keys))
+
+
+def _choices_version_key(group):
+    return f'choices:version:{group}'
+
+
+# Return a rendered choice list fragment (a form select, an autocomplete page) from the cache, rendering and
+# storing it on a miss. `group` names what the choices are drawn from ('projects', 'users'), and `key` must
+# hold everything else the fragment depends on.
+def cached_choices(group, key, render):
+    cache_key = f'choices:{group}:{_current_version(_choices_version_key(group))}:{key}'
+    fragment = cache.get(cache_key)
+    if fragment is None:
+        fragment = render()
+        cache.set(cache_key, fragment, settings.CHOICES_CACHE_TIMEOUT)
+    return fragment
+
+
+# Drop every cached fragment of a group by moving it to a new version
+def invalidate_choices(group):
+    _now_and_on_commit(lambda: cache.set(_choices_version_key(group), uuid4().hex, timeout=None))
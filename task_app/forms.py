@@ -1,9 +1,14 @@
+import hashlib
+
 from django import forms
 from django.core.exceptions import ValidationError
+from django.urls import reverse_lazy
 from crispy_forms.helper import FormHelper
 from crispy_forms.layout import Submit
-from .models import Project, Task
+from .caching import cached_choices
+from .models import Project, Task, TaskRecurrence, validate_recurrence_until, validate_task_dates
 from django.contrib.auth.forms import AuthenticationForm
+from django.contrib.auth.models import User
 
 class CustomLoginForm(AuthenticationForm):
     def __init__(self, *args, **kwargs):
@@ -32,25 +37,161 @@ class ProjectForm(forms.ModelForm):
         
         return cleaned_data
 
+# Select that renders only the selected option; the task form script loads the other choices from the
+# autocomplete endpoint at `url` as the user types, so the page never lists every user
+class AutocompleteSelect(forms.Select):
+    def __init__(self, url, attrs=None):
+        super().__init__(attrs)
+        self.url = url
+
+    def build_attrs(self, base_attrs, extra_attrs=None):
+        attrs = super().build_attrs(base_attrs, extra_attrs)
+        attrs['data-autocomplete-url'] = str(self.url)
+        return attrs
+
+    def optgroups(self, name, value, attrs=None):
+        field = self.choices.field
+        options = [self.create_option(name, '', field.empty_label, False, 0)]
+        selected = [pk for pk in value if str(pk).isdigit()]
+        for obj in field.queryset.filter(pk__in=selected):
+            options.append(self.create_option(name, obj.pk, field.label_from_instance(obj), True, len(options)))
+        return [(None, options, 0)]
+
+# Select whose rendered HTML is cached in a task_app.caching choices group. `scope` identifies whose choices
+# the field holds and is set by the form; without one the select renders normally.
+class CachedChoicesSelect(forms.Select):
+    def __init__(self, group, attrs=None, choices=()):
+        super().__init__(attrs, choices)
+        self.group = group
+        self.scope = None
+
+    def render(self, name, value, attrs=None, renderer=None):
+        if self.scope is None:
+            return super().render(name, value, attrs, renderer)
+        key = repr((self.scope, name, value, sorted(self.build_attrs(self.attrs, attrs).items())))
+        key = hashlib.md5(key.encode(), usedforsecurity=False).hexdigest()
+        return cached_choices(self.group, key,
+                              lambda: super(CachedChoicesSelect, self).render(name, value, attrs, renderer))
+
 class TaskForm(forms.ModelForm):
+    RECURRENCE_FIELDS = ['repeat', 'repeat_every', 'repeat_until']
+
+    # Optional recurrence, saved as the task's TaskRecurrence; see task_app.recurrence
+    repeat = forms.ChoiceField(choices=[('', 'Does not repeat')] + TaskRecurrence.FREQUENCY_CHOICES, required=False)
+    repeat_every = forms.IntegerField(min_value=1, initial=1, required=False,
+                                      help_text="Days, weeks or months between occurrences.")
+    repeat_until = forms.DateField(required=False, widget=forms.DateInput(attrs={'type': 'date'}),
+                                   help_text="Last start date; the project end date when empty.")
+
     class Meta:
         model = Task
         fields = ['title', 'description', 'assigned_to', 'status', 'priority', 'start_date', 'due_date', 'project']
         widgets = {
+            'assigned_to': AutocompleteSelect(reverse_lazy('user-autocomplete')),
             'start_date': forms.DateInput(attrs={'type': 'date'}),
             'due_date': forms.DateInput(attrs={'type': 'date'}),
+            'project': CachedChoicesSelect('projects'),
         }
 
+    # `user` limits the project choices to the projects they can see, plus the task's current one
+    def __init__(self, *args, user=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if user is not None:
+            projects = Project.objects.visible_to(user)
+            if self.instance.project_id:
+                projects = projects | Project.objects.filter(pk=self.instance.project_id)
+            self.fields['project'].queryset = projects
+            self.fields['project'].widget.scope = ('staff' if user.is_staff else user.pk, self.instance.project_id)
+        if self.instance.occurrence_of_id:
+            # Occurrences follow their template's recurrence rather than having their own
+            for name in self.RECURRENCE_FIELDS:
+                del self.fields[name]
+        elif self.instance.pk:
+            recurrence = TaskRecurrence.objects.filter(template=self.instance).first()
+            if recurrence:
+                self.initial.update(repeat=recurrence.frequency, repeat_every=recurrence.interval,
+                                    repeat_until=recurrence.until)
+
     def clean(self):
         cleaned_data = super().clean()
         start_date = cleaned_data.get('start_date')
         due_date = cleaned_data.get('due_date')
         project = cleaned_data.get('project')
 
-        if due_date and start_date and due_date < start_date:
-            raise ValidationError("Due date cannot be earlier than start date.")
-        
-        if project and due_date and due_date > project.end_date:
-            raise ValidationError("Task due date cannot exceed the project end date.")
-        
+        validate_task_dates(start_date, due_date, project.end_date if project else None)
+        if cleaned_data.get('repeat'):
+            try:
+                validate_recurrence_until(cleaned_data.get('repeat_until'), start_date,
+                                          project.end_date if project else None)
+            except ValidationError as error:
+                self.add_error('repeat_until', error)
+
         return cleaned_data
+
+    def save(self, commit=True):
+        task = super().save(commit=commit)
+        if commit and 'repeat' in self.fields:
+            self.save_recurrence(task)
+        return task
+
+    # Create, change or drop the task's recurrence. Occurrences already created are kept; a new recurrence
+    # starts generating after the task itself.
+    def save_recurrence(self, task):
+        frequency = self.cleaned_data.get('repeat')
+        if not frequency:
+            TaskRecurrence.objects.filter(template=task).delete()
+            return
+        rule = {'frequency': frequency, 'interval': self.cleaned_data.get('repeat_every') or 1,
+                'until': self.cleaned_data.get('repeat_until')}
+        TaskRecurrence.objects.update_or_create(template=task, defaults=rule)
+
+# Hidden list of task ids posted by the checkboxes on the task list
+class TaskIdsField(forms.Field):
+    widget = forms.MultipleHiddenInput
+
+    def to_python(self, value):
+        try:
+            return sorted({int(pk) for pk in value or []})
+        except (TypeError, ValueError):
+            raise ValidationError("Select valid tasks.")
+
+class TaskBulkUpdateForm(forms.Form):
+    task_ids = TaskIdsField(required=False)
+    select_all = forms.BooleanField(
+        required=False, label="All tasks matching the filters",
+        widget=forms.CheckboxInput(attrs={'class': 'form-check-input'}))
+    status = forms.ChoiceField(
+        choices=[('', 'No change')] + Task.STATUS_CHOICES, required=False,
+        widget=forms.Select(attrs={'class': 'form-select'}))
+    priority = forms.ChoiceField(
+        choices=[('', 'No change')] + Task.PRIORITY_CHOICES, required=False,
+        widget=forms.Select(attrs={'class': 'form-select'}))
+    assigned_to = forms.ModelChoiceField(
+        queryset=User.objects.all(), to_field_name='username', required=False,
+        widget=forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Username'}))
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if not cleaned_data.get('task_ids') and not cleaned_data.get('select_all'):
+            raise ValidationError("Select at least one task.")
+        if not self.get_changes():
+            raise ValidationError("Choose a status, priority or assignee to apply.")
+        return cleaned_data
+
+    # Field values to write; none of them take part in the date rules, so no per-task validation is needed
+    def get_changes(self):
+        return {field: self.cleaned_data[field] for field in ('status', 'priority', 'assigned_to')
+                if self.cleaned_data.get(field)}
+
+# A card dropped on the project board: its new column and the cards now above and below it
+class TaskMoveForm(forms.Form):
+    status = forms.ChoiceField(choices=Task.STATUS_CHOICES)
+    previous = forms.IntegerField(required=False)
+    next = forms.IntegerField(required=False)
+
+# Username of the user to share a project with
+class ProjectMemberForm(forms.Form):
+    user = forms.ModelChoiceField(
+        queryset=User.objects.filter(is_active=True), to_field_name='username',
+        error_messages={'invalid_choice': "No user with that username."},
+        widget=forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Username'}))
@@ -0,0 +1,175 @@
+import asyncio
+import json
+import threading
+import time
+from collections import defaultdict, deque, namedtuple
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections, transaction
+
+# Who can see a task: staff, its assignee, and everyone who can see its project (see TaskQuerySet.visible_to).
+# A change is published with the audience of the task before and after it.
+Audience = namedtuple('Audience', ['user_ids', 'project_ids'])
+
+# One published change. `data` is sent to whoever sees the task afterwards; someone who only saw it before
+# gets a 'removed' event with its id, so their view can drop it.
+Event = namedtuple('Event', ['id', 'name', 'data', 'audience', 'previous'])
+
+
+# One open event stream or long poll of a user, receiving on the event loop that serves it
+class Subscriber:
+    def __init__(self, user, project_ids, queue_size=None):
+        self.user_id = user.pk
+        self.is_staff = user.is_staff
+        self.project_ids = frozenset(project_ids)  # Visible projects when the stream opened
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=queue_size or settings.LIVE_EVENTS_QUEUE_SIZE)
+
+    def sees(self, audience):
+        return (audience is not None and (self.is_staff or self.user_id in audience.user_ids
+                                          or not self.project_ids.isdisjoint(audience.project_ids)))
+
+    # (id, name, data) of an event as this subscriber may see it, or None when it does not concern them
+    def message_for(self, event):
+        if self.sees(event.audience):
+            return event.id, event.name, event.data
+        if self.sees(event.previous) and 'id' in event.data:
+            return event.id, event.name, {'action': 'removed', 'id': event.data['id']}
+        return None
+
+    # Runs on the subscriber's loop. A client too far behind is told to reload instead of catching up.
+    def put(self, message):
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait((message[0], 'reset', {}))
+
+
+def _deliver(deliveries):
+    for subscriber, message in deliveries:
+        subscriber.put(message)
+
+
+# In-process fanout of task changes to the open streams. Subscribers are indexed by user and project, so a
+# change only touches the streams that can see it; idle streams cost nothing until then. Publishing is
+# thread-safe: it runs after commit in whichever thread saved the task, and hands each event loop its
+# messages in one call. Only streams served by the same process are reached.
+class TaskEventHub:
+    def __init__(self, buffer_size=None):
+        self._lock = threading.Lock()
+        self._staff = set()
+        self._by_user = defaultdict(set)
+        self._by_project = defaultdict(set)
+        # Recent events, so a reconnecting stream or the next long poll resumes where it left off
+        self._recent = deque(maxlen=buffer_size or settings.LIVE_EVENTS_BUFFER_SIZE)
+        # Ids start from the clock, so ids handed out before a restart are older than anything buffered now
+        self._last_id = int(time.time() * 1000)
+
+    @property
+    def last_id(self):
+        return self._last_id
+
+    def subscribe(self, subscriber):
+        with self._lock:
+            if subscriber.is_staff:
+                self._staff.add(subscriber)
+            self._by_user[subscriber.user_id].add(subscriber)
+            for project_id in subscriber.project_ids:
+                self._by_project[project_id].add(subscriber)
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._staff.discard(subscriber)
+            self._discard(self._by_user, subscriber.user_id, subscriber)
+            for project_id in subscriber.project_ids:
+                self._discard(self._by_project, project_id, subscriber)
+
+    @staticmethod
+    def _discard(index, key, subscriber):
+        subscribers = index.get(key)
+        if subscribers is not None:
+            subscribers.discard(subscriber)
+            if not subscribers:
+                del index[key]
+
+    def publish(self, name, data, audience, previous=None):
+        with self._lock:
+            self._last_id += 1
+            event = Event(self._last_id, name, data, audience, previous)
+            self._recent.append(event)
+            candidates = set(self._staff)
+            for scope in filter(None, (audience, previous)):
+                for user_id in scope.user_ids:
+                    candidates.update(self._by_user.get(user_id, ()))
+                for project_id in scope.project_ids:
+                    candidates.update(self._by_project.get(project_id, ()))
+        by_loop = defaultdict(list)
+        for subscriber in candidates:
+            message = subscriber.message_for(event)
+            if message is not None:
+                by_loop[subscriber.loop].append((subscriber, message))
+        for loop, deliveries in by_loop.items():
+            try:
+                loop.call_soon_threadsafe(_deliver, deliveries)
+            except RuntimeError:
+                pass  # The loop closed; its streams are gone
+        return event
+
+    # The buffered messages for `subscriber` after event `after_id`, or None when some of them are no longer
+    # buffered (or the id is from before a restart) and the client has to reload instead
+    def since(self, after_id, subscriber):
+        with self._lock:
+            if after_id > self._last_id or (self._recent and after_id < self._recent[0].id - 1):
+                return None
+            events = [event for event in self._recent if event.id > after_id]
+        return [message for message in map(subscriber.message_for, events) if message is not None]
+
+
+hub = TaskEventHub()
+
+
+def _task_data(action, task):
+    return {
+        'action': action,
+        'id': task.pk,
+        'title': task.title,
+        'status': task.status,
+        'status_display': task.get_status_display(),
+        'priority': task.priority,
+        'priority_display': task.get_priority_display(),
+        'due_date': task.due_date,
+        'project_id': task.project_id,
+        'assigned_to_id': task.assigned_to_id,
+    }
+
+
+# Publish a saved or deleted task once the change commits; `previous` is the (assignee id, project id) it had
+# before the change
+def publish_task(action, task, previous=None):
+    data = _task_data(action, task)
+    audience = Audience({task.assigned_to_id}, {task.project_id})
+    before = Audience({previous[0]}, {previous[1]}) if previous else None
+    transaction.on_commit(lambda: hub.publish('task', data, audience, before))
+
+
+# Publish a change to many tasks at once (bulk inserts and set-based updates) once it commits; clients reload
+# what they show
+def publish_refresh(user_ids, project_ids):
+    audience = Audience(frozenset(user_ids), frozenset(project_ids))
+    transaction.on_commit(lambda: hub.publish('refresh', {}, audience))
+
+
+# Close the current thread's database connections. Under ASGI each request has its own thread and connection
+# (with its SQLite page cache) until it ends, which for an open stream is whenever the client leaves.
+def release_connections():
+    for connection in connections.all(initialized_only=True):
+        if not connection.in_atomic_block:  # Left alone inside a transaction, as in tests
+            connection.close()
+
+
+def encode_message(message):
+    event_id, name, data = message
+    return f"id: {event_id}\nevent: {name}\ndata: {json.dumps(data, cls=DjangoJSONEncoder)}\n\n"
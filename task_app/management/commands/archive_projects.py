@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from task_app.archive import archive_projects
+
+
+class Command(BaseCommand):
+    help = ("Move finished projects (ended more than --days days ago, every task completed) and their tasks "
+            "into the archive tables. Safe to run repeatedly, e.g. nightly from cron.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=30,
+                            help="How long after its end date a finished project stays in the hot tables.")
+        parser.add_argument('--chunk-size', type=int, default=1000,
+                            help="Tasks moved per transaction; a project is never split.")
+        parser.add_argument('--batch-size', type=int, default=1000, help="Rows inserted per bulk_create.")
+
+    def handle(self, *args, **options):
+        if options['days'] < 0:
+            raise CommandError("--days cannot be negative.")
+        started = time.monotonic()
+        archived = archive_projects(days=options['days'], chunk_size=options['chunk_size'],
+                                    batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {archived} projects in {time.monotonic() - started:.2f}s."))
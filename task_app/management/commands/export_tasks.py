@@ -0,0 +1,43 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+
+from task_app.models import Task
+from task_app.transfer import FORMATS, detect_format, encode_rows, task_values
+
+
+class Command(BaseCommand):
+    help = "Stream every task to a CSV or JSONL file with flat memory use."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Output file, or - for standard output.")
+        parser.add_argument('--format', choices=FORMATS,
+                            help="Output format; defaults to the file extension, then CSV.")
+        parser.add_argument('--chunk-size', type=int, default=2000,
+                            help="Rows fetched from the database cursor at a time.")
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = detect_format(path, options['format'])
+        started = time.monotonic()
+        self.exported = 0
+
+        # iterator() streams rows from the cursor instead of caching the whole table on the queryset
+        rows = task_values(Task.objects.order_by('pk')).iterator(chunk_size=options['chunk_size'])
+        output = sys.stdout if path == '-' else open(path, 'w', newline='', encoding='utf-8')
+        try:
+            output.writelines(encode_rows(self.count(rows), fmt))
+        finally:
+            if output is not sys.stdout:
+                output.close()
+
+        elapsed = time.monotonic() - started
+        rate = self.exported / elapsed if elapsed else 0
+        self.stderr.write(self.style.SUCCESS(
+            f"Exported {self.exported} tasks in {elapsed:.2f}s ({rate:.0f} rows/sec)."))
+
+    def count(self, rows):
+        for row in rows:
+            self.exported += 1
+            yield row
@@ -0,0 +1,107 @@
+import sys
+import time
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from task_app.models import Project, Task, validate_task_dates
+from task_app.transfer import FORMATS, detect_format, read_rows
+
+
+class Command(BaseCommand):
+    help = ("Stream tasks from a CSV or JSONL file into the database, validating them like TaskForm "
+            "and inserting them with bulk_create in chunked transactions.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Input file, or - for standard input.")
+        parser.add_argument('--format', choices=FORMATS,
+                            help="Input format; defaults to the file extension, then CSV.")
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help="Rows inserted per bulk_create and per transaction.")
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = detect_format(path, options['format'])
+        batch_size = options['batch_size']
+        # Project end dates and user ids are looked up once per distinct value, not once per row
+        self.project_end_dates = {}
+        self.user_exists = {}
+        started = time.monotonic()
+        imported = rejected = 0
+        batch = []
+
+        try:
+            source = sys.stdin if path == '-' else open(path, newline='', encoding='utf-8')
+        except OSError as exc:
+            raise CommandError(f"Cannot read {path}: {exc}")
+        try:
+            for line_number, row in read_rows(source, fmt):
+                try:
+                    batch.append(self.build_task(row))
+                except ValidationError as exc:
+                    rejected += 1
+                    self.stderr.write(f"Line {line_number}: {self.describe(exc)}")
+                    continue
+                if len(batch) >= batch_size:
+                    imported += self.insert(batch)
+                    batch = []
+            imported += self.insert(batch)
+        finally:
+            if source is not sys.stdin:
+                source.close()
+
+        elapsed = time.monotonic() - started
+        rate = imported / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {imported} tasks, rejected {rejected}, in {elapsed:.2f}s ({rate:.0f} rows/sec)."))
+
+    def insert(self, batch):
+        if not batch:
+            return 0
+        with transaction.atomic():
+            Task.objects.bulk_create(batch)
+        return len(batch)
+
+    # Validate one input row with the same field and date rules as TaskForm and return an unsaved Task
+    def build_task(self, row):
+        if row is None:
+            raise ValidationError("Row is not a JSON object.")
+        project_id = self.parse_id(row, 'project')
+        assigned_to_id = self.parse_id(row, 'assigned_to')
+        task = Task(
+            title=row.get('title') or '',
+            description=row.get('description') or '',
+            status=row.get('status') or 'pending',
+            priority=row.get('priority') or 'medium',
+            start_date=row.get('start_date') or None,
+            due_date=row.get('due_date') or None,
+            project_id=project_id,
+            assigned_to_id=assigned_to_id,
+        )
+        task.clean_fields(exclude=['project', 'assigned_to'])
+
+        if project_id not in self.project_end_dates:
+            self.project_end_dates[project_id] = (
+                Project.objects.filter(pk=project_id).values_list('end_date', flat=True).first())
+        if self.project_end_dates[project_id] is None:
+            raise ValidationError(f"Project {project_id} does not exist.")
+        if assigned_to_id not in self.user_exists:
+            self.user_exists[assigned_to_id] = User.objects.filter(pk=assigned_to_id).exists()
+        if not self.user_exists[assigned_to_id]:
+            raise ValidationError(f"User {assigned_to_id} does not exist.")
+
+        validate_task_dates(task.start_date, task.due_date, self.project_end_dates[project_id])
+        return task
+
+    def parse_id(self, row, column):
+        try:
+            return int(row.get(column))
+        except (TypeError, ValueError):
+            raise ValidationError(f"{column} must be an id.")
+
+    def describe(self, exc):
+        if hasattr(exc, 'error_dict'):
+            return '; '.join(f"{field}: {' '.join(messages)}" for field, messages in exc.message_dict.items())
+        return ' '.join(exc.messages)
@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from task_app.notifications import notify_due_tasks
+
+
+class Command(BaseCommand):
+    help = ("Write overdue and due-soon digest notifications per assignee for tasks whose due date reached "
+            "its notification window since the last run, and email them. Run it from cron, or with --loop "
+            "as a long-running worker.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lead-days', type=int,
+                            help="Days ahead of the due date to send due-soon digests; defaults to TASK_DUE_SOON_DAYS.")
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help="Digests inserted and mailed per batch.")
+        parser.add_argument('--loop', action='store_true',
+                            help="Keep running, checking again every --interval seconds.")
+        parser.add_argument('--interval', type=int, default=300,
+                            help="Seconds between checks with --loop.")
+
+    def handle(self, *args, **options):
+        while True:
+            written = notify_due_tasks(lead_days=options['lead_days'], batch_size=options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(
+                f"Wrote {written['overdue']} overdue and {written['due_soon']} due-soon digests."))
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,21 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from task_app.search import fts_enabled, rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the SQLite FTS5 task search index from the task and project tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000,
+                            help="Tasks indexed per statement; the whole rebuild is one transaction.")
+
+    def handle(self, *args, **options):
+        if not fts_enabled():
+            raise CommandError("The full-text task index is only available on SQLite.")
+        started = time.monotonic()
+        indexed = rebuild_index(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {indexed} tasks in {time.monotonic() - started:.2f}s."))
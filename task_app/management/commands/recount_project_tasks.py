@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from task_app.models import Project
+
+
+class Command(BaseCommand):
+    help = "Recompute the denormalized task counters on Project and repair any that drifted."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help="Number of projects recounted per transaction.")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        last_pk = 0
+        checked = repaired = 0
+        # Walk the projects in primary key order so each batch is an indexed range scan
+        while True:
+            batch = list(Project.objects.filter(pk__gt=last_pk).order_by('pk')
+                         .values_list('pk', flat=True)[:batch_size])
+            if not batch:
+                break
+            with transaction.atomic():
+                repaired += Project.objects.filter(pk__in=batch).recount_tasks()
+            checked += len(batch)
+            last_pk = batch[-1]
+        self.stdout.write(self.style.SUCCESS(
+            f"Checked {checked} projects, repaired {repaired} drifted counters."))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from task_app.archive import restore_projects
+
+
+class Command(BaseCommand):
+    help = "Move archived projects and their tasks back into the hot tables, keeping their ids."
+
+    def add_arguments(self, parser):
+        parser.add_argument('project_ids', nargs='+', type=int, help="Ids of the archived projects.")
+        parser.add_argument('--batch-size', type=int, default=1000, help="Tasks inserted per bulk_create.")
+
+    def handle(self, *args, **options):
+        restored = restore_projects(options['project_ids'], batch_size=options['batch_size'])
+        missing = sorted(set(options['project_ids']) - set(restored))
+        if restored:
+            self.stdout.write(self.style.SUCCESS(
+                f"Restored projects {', '.join(map(str, restored))}."))
+        if missing:
+            raise CommandError(f"No archived project with id {', '.join(map(str, missing))}.")
@@ -0,0 +1,38 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from task_app.seeding import seed_load
+
+
+class Command(BaseCommand):
+    help = ("Generate a reproducible synthetic dataset of users, projects and tasks with bulk_create, "
+            "for load testing and benchmarks.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--projects', type=int, default=500)
+        parser.add_argument('--tasks-per-project', type=int, default=200)
+        parser.add_argument('--seed', type=int, default=0, help="Random seed; the same seed gives the same data.")
+        parser.add_argument('--prefix', default='loaduser',
+                            help="Username prefix; existing users with these names are reused.")
+        parser.add_argument('--password', default='password', help="Password of the generated users.")
+        parser.add_argument('--batch-size', type=int, default=2000,
+                            help="Tasks inserted per bulk_create and per transaction.")
+        parser.add_argument('--today', type=date.fromisoformat, default=None,
+                            help="Date (YYYY-MM-DD) the project and task dates are laid out around; defaults "
+                                 "to the current date. Give it with --seed to get the same data on any day.")
+
+    def handle(self, *args, **options):
+        if options['users'] < 1:
+            raise CommandError("--users must be at least 1.")
+        started = time.monotonic()
+        created = seed_load(options['users'], options['projects'], options['tasks_per_project'],
+                            seed=options['seed'], prefix=options['prefix'], password=options['password'],
+                            batch_size=options['batch_size'], today=options['today'])
+        elapsed = time.monotonic() - started
+        rate = created['tasks'] / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {created['users']} users, {created['projects']} projects and {created['tasks']} tasks "
+            f"in {elapsed:.2f}s ({rate:.0f} tasks/sec)."))
@@ -0,0 +1,48 @@
+# Generated by Django 5.1.3 on 2026-10-18 07:23
+
+from django.db import migrations, models
+
+
+def populate_task_counters(apps, schema_editor):
+    Project = apps.get_model('task_app', 'Project')
+    projects = Project.objects.annotate(
+        counted_task_count=models.Count('task'),
+        counted_pending_count=models.Count('task', filter=models.Q(task__status='pending')),
+        counted_in_progress_count=models.Count('task', filter=models.Q(task__status='in_progress')),
+        counted_completed_count=models.Count('task', filter=models.Q(task__status='completed')),
+    )
+    fields = ['task_count', 'pending_count', 'in_progress_count', 'completed_count']
+    for project in projects:
+        for field in fields:
+            setattr(project, field, getattr(project, f'counted_{field}'))
+    Project.objects.bulk_update(projects, fields, batch_size=500)
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task_app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='completed_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='in_progress_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='pending_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='task_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_task_counters, migrations.RunPython.noop),
+    ]
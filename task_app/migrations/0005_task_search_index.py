@@ -0,0 +1,71 @@
+from django.db import migrations
+
+# The index as this migration creates it, copied from task_app.search so later changes there leave it alone
+FTS_TABLE = 'task_app_task_fts'
+
+CREATE_TABLE_SQL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "title, description, project_name, tokenize = 'unicode61 remove_diacritics 2')"
+)
+
+TRIGGER_SQL = [
+    "CREATE TRIGGER IF NOT EXISTS task_app_task_fts_insert AFTER INSERT ON task_app_task BEGIN "
+    f"INSERT INTO {FTS_TABLE} (rowid, title, description, project_name) VALUES ("
+    "new.id, new.title, new.description, (SELECT name FROM task_app_project WHERE id = new.project_id)); END",
+    # Django saves every column, so only reindex when an indexed value actually changed
+    "CREATE TRIGGER IF NOT EXISTS task_app_task_fts_update "
+    "AFTER UPDATE OF title, description, project_id ON task_app_task "
+    "WHEN old.title IS NOT new.title OR old.description IS NOT new.description "
+    "OR old.project_id IS NOT new.project_id BEGIN "
+    f"UPDATE {FTS_TABLE} SET title = new.title, description = new.description, "
+    "project_name = (SELECT name FROM task_app_project WHERE id = new.project_id) WHERE rowid = new.id; END",
+    "CREATE TRIGGER IF NOT EXISTS task_app_task_fts_delete AFTER DELETE ON task_app_task BEGIN "
+    f"DELETE FROM {FTS_TABLE} WHERE rowid = old.id; END",
+    "CREATE TRIGGER IF NOT EXISTS task_app_project_fts_rename AFTER UPDATE OF name ON task_app_project "
+    "WHEN old.name IS NOT new.name BEGIN "
+    f"UPDATE {FTS_TABLE} SET project_name = new.name "
+    "WHERE rowid IN (SELECT id FROM task_app_task WHERE project_id = new.id); END",
+]
+
+DROP_TRIGGER_SQL = [
+    "DROP TRIGGER IF EXISTS task_app_project_fts_rename",
+    "DROP TRIGGER IF EXISTS task_app_task_fts_delete",
+    "DROP TRIGGER IF EXISTS task_app_task_fts_update",
+    "DROP TRIGGER IF EXISTS task_app_task_fts_insert",
+]
+
+DROP_SQL = [
+    *DROP_TRIGGER_SQL,
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+
+# FTS5 is SQLite-only; other backends use the icontains fallback in task_app.search
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(CREATE_TABLE_SQL)
+    schema_editor.execute(
+        f"INSERT INTO {FTS_TABLE} (rowid, title, description, project_name) "
+        "SELECT t.id, t.title, t.description, p.name "
+        "FROM task_app_task t JOIN task_app_project p ON p.id = t.project_id")
+    for statement in TRIGGER_SQL:
+        schema_editor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in DROP_SQL:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task_app', '0004_task_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 5.1.3 on 2026-10-18 07:58
+
+from itertools import islice
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+# Existing tasks have no history, so log each one as entering its project with its current status when it was created
+def log_existing_tasks(apps, schema_editor):
+    Task = apps.get_model('task_app', 'Task')
+    TaskStatusEvent = apps.get_model('task_app', 'TaskStatusEvent')
+    events = (
+        TaskStatusEvent(task_id=pk, project_id=project_id, new_status=status, changed_at=created_at)
+        for pk, project_id, status, created_at in
+        Task.objects.order_by('created_at', 'pk').values_list('pk', 'project_id', 'status', 'created_at').iterator()
+    )
+    while batch := list(islice(events, 1000)):
+        TaskStatusEvent.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task_app', '0005_task_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Checkpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('position', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ProjectStatusSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('pending_count', models.IntegerField(default=0)),
+                ('in_progress_count', models.IntegerField(default=0)),
+                ('completed_count', models.IntegerField(default=0)),
+                ('completed_events', models.IntegerField(default=0)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='status_snapshots', to='task_app.project')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('project', 'day'), name='status_snapshot_project_day_uniq')],
+            },
+        ),
+        migrations.CreateModel(
+            name='TaskStatusEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('old_status', models.CharField(blank=True, choices=[('pending', 'Pending'), ('in_progress', 'In Progress'), ('completed', 'Completed')], max_length=20, null=True)),
+                ('new_status', models.CharField(blank=True, choices=[('pending', 'Pending'), ('in_progress', 'In Progress'), ('completed', 'Completed')], max_length=20, null=True)),
+                ('changed_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('project', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='status_events', to='task_app.project')),
+                ('task', models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='status_events', to='task_app.task')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['project', 'changed_at'], name='status_event_project_idx')],
+            },
+        ),
+        migrations.RunPython(log_existing_tasks, migrations.RunPython.noop),
+    ]
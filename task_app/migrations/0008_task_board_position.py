@@ -0,0 +1,73 @@
+# Generated by Django 5.1.3 on 2026-10-18 08:11
+
+from django.conf import settings
+from django.db import migrations, models
+
+# The search triggers as they stood at this migration, copied from task_app.search so later changes there
+# leave it alone
+FTS_TABLE = 'task_app_task_fts'
+
+TRIGGER_SQL = [
+    "CREATE TRIGGER IF NOT EXISTS task_app_task_fts_insert AFTER INSERT ON task_app_task BEGIN "
+    f"INSERT INTO {FTS_TABLE} (rowid, title, description, project_name) VALUES ("
+    "new.id, new.title, new.description, (SELECT name FROM task_app_project WHERE id = new.project_id)); END",
+    # Django saves every column, so only reindex when an indexed value actually changed
+    "CREATE TRIGGER IF NOT EXISTS task_app_task_fts_update "
+    "AFTER UPDATE OF title, description, project_id ON task_app_task "
+    "WHEN old.title IS NOT new.title OR old.description IS NOT new.description "
+    "OR old.project_id IS NOT new.project_id BEGIN "
+    f"UPDATE {FTS_TABLE} SET title = new.title, description = new.description, "
+    "project_name = (SELECT name FROM task_app_project WHERE id = new.project_id) WHERE rowid = new.id; END",
+    "CREATE TRIGGER IF NOT EXISTS task_app_task_fts_delete AFTER DELETE ON task_app_task BEGIN "
+    f"DELETE FROM {FTS_TABLE} WHERE rowid = old.id; END",
+    "CREATE TRIGGER IF NOT EXISTS task_app_project_fts_rename AFTER UPDATE OF name ON task_app_project "
+    "WHEN old.name IS NOT new.name BEGIN "
+    f"UPDATE {FTS_TABLE} SET project_name = new.name "
+    "WHERE rowid IN (SELECT id FROM task_app_task WHERE project_id = new.id); END",
+]
+
+DROP_TRIGGER_SQL = [
+    "DROP TRIGGER IF EXISTS task_app_project_fts_rename",
+    "DROP TRIGGER IF EXISTS task_app_task_fts_delete",
+    "DROP TRIGGER IF EXISTS task_app_task_fts_update",
+    "DROP TRIGGER IF EXISTS task_app_task_fts_insert",
+]
+
+
+# Adding a column makes SQLite rebuild the task table, which the project rename trigger refers to,
+# so the search triggers are dropped for the rebuild and recreated afterwards
+def drop_search_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in DROP_TRIGGER_SQL:
+        schema_editor.execute(statement)
+
+
+def restore_search_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    if FTS_TABLE in schema_editor.connection.introspection.table_names():
+        for statement in TRIGGER_SQL:
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task_app', '0007_notifications'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_search_triggers, restore_search_triggers),
+        migrations.AddField(
+            model_name='task',
+            name='board_position',
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['project', 'status', 'board_position'], name='task_board_idx'),
+        ),
+        migrations.RunPython(restore_search_triggers, drop_search_triggers),
+    ]
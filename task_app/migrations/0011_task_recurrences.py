@@ -0,0 +1,91 @@
+# Generated by Django 5.1.3 on 2026-10-18 08:46
+
+import django.core.validators
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+# The search triggers as they stood at this migration, copied from task_app.search so later changes there
+# leave it alone
+FTS_TABLE = 'task_app_task_fts'
+
+TRIGGER_SQL = [
+    "CREATE TRIGGER IF NOT EXISTS task_app_task_fts_insert AFTER INSERT ON task_app_task BEGIN "
+    f"INSERT INTO {FTS_TABLE} (rowid, title, description, project_name) VALUES ("
+    "new.id, new.title, new.description, (SELECT name FROM task_app_project WHERE id = new.project_id)); END",
+    # Django saves every column, so only reindex when an indexed value actually changed
+    "CREATE TRIGGER IF NOT EXISTS task_app_task_fts_update "
+    "AFTER UPDATE OF title, description, project_id ON task_app_task "
+    "WHEN old.title IS NOT new.title OR old.description IS NOT new.description "
+    "OR old.project_id IS NOT new.project_id BEGIN "
+    f"UPDATE {FTS_TABLE} SET title = new.title, description = new.description, "
+    "project_name = (SELECT name FROM task_app_project WHERE id = new.project_id) WHERE rowid = new.id; END",
+    "CREATE TRIGGER IF NOT EXISTS task_app_task_fts_delete AFTER DELETE ON task_app_task BEGIN "
+    f"DELETE FROM {FTS_TABLE} WHERE rowid = old.id; END",
+    "CREATE TRIGGER IF NOT EXISTS task_app_project_fts_rename AFTER UPDATE OF name ON task_app_project "
+    "WHEN old.name IS NOT new.name BEGIN "
+    f"UPDATE {FTS_TABLE} SET project_name = new.name "
+    "WHERE rowid IN (SELECT id FROM task_app_task WHERE project_id = new.id); END",
+]
+
+DROP_TRIGGER_SQL = [
+    "DROP TRIGGER IF EXISTS task_app_project_fts_rename",
+    "DROP TRIGGER IF EXISTS task_app_task_fts_delete",
+    "DROP TRIGGER IF EXISTS task_app_task_fts_update",
+    "DROP TRIGGER IF EXISTS task_app_task_fts_insert",
+]
+
+
+# Adding a nullable column is a plain ALTER TABLE, but removing it again makes SQLite rebuild the task table,
+# which the project rename trigger refers to, so the search triggers are dropped around the change
+def drop_search_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in DROP_TRIGGER_SQL:
+        schema_editor.execute(statement)
+
+
+def restore_search_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    if FTS_TABLE in schema_editor.connection.introspection.table_names():
+        for statement in TRIGGER_SQL:
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task_app', '0010_task_dependencies'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskRecurrence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('frequency', models.CharField(choices=[('daily', 'Daily'), ('weekly', 'Weekly'), ('monthly', 'Monthly')], max_length=10)),
+                ('interval', models.PositiveSmallIntegerField(default=1, validators=[django.core.validators.MinValueValidator(1)])),
+                ('until', models.DateField(blank=True, null=True)),
+                ('generated_through', models.DateField(editable=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('template', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='recurrence', to='task_app.task')),
+            ],
+        ),
+        migrations.RunPython(drop_search_triggers, restore_search_triggers),
+        migrations.AddField(
+            model_name='task',
+            name='occurrence_of',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='occurrences', to='task_app.taskrecurrence'),
+        ),
+        migrations.AddConstraint(
+            model_name='task',
+            constraint=models.UniqueConstraint(condition=models.Q(('occurrence_of__isnull', False)), fields=('occurrence_of', 'start_date'), name='unique_task_occurrence'),
+        ),
+        migrations.RunPython(restore_search_triggers, drop_search_triggers),
+        migrations.AddIndex(
+            model_name='taskrecurrence',
+            index=models.Index(fields=['generated_through'], name='recurrence_generated_idx'),
+        ),
+    ]
@@ -0,0 +1,120 @@
+import django.db.models.deletion
+import task_app.search
+from django.conf import settings
+from django.db import migrations, models
+
+# The index before and after this migration, copied from task_app.search so later changes there leave it alone.
+# FTS5 tables cannot gain a column, so the index is dropped and rebuilt with the assignee username.
+FTS_TABLE = 'task_app_task_fts'
+
+CREATE_TABLE_SQL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "title, description, project_name, assignee, tokenize = 'unicode61 remove_diacritics 2')"
+)
+
+POPULATE_SQL = (
+    f"INSERT INTO {FTS_TABLE} (rowid, title, description, project_name, assignee) "
+    "SELECT t.id, t.title, t.description, p.name, u.username FROM task_app_task t "
+    "JOIN task_app_project p ON p.id = t.project_id JOIN auth_user u ON u.id = t.assigned_to_id"
+)
+
+TRIGGER_SQL = [
+    "CREATE TRIGGER IF NOT EXISTS task_app_task_fts_insert AFTER INSERT ON task_app_task BEGIN "
+    f"INSERT INTO {FTS_TABLE} (rowid, title, description, project_name, assignee) VALUES ("
+    "new.id, new.title, new.description, (SELECT name FROM task_app_project WHERE id = new.project_id), "
+    "(SELECT username FROM auth_user WHERE id = new.assigned_to_id)); END",
+    # Django saves every column, so only reindex when an indexed value actually changed
+    "CREATE TRIGGER IF NOT EXISTS task_app_task_fts_update "
+    "AFTER UPDATE OF title, description, project_id, assigned_to_id ON task_app_task "
+    "WHEN old.title IS NOT new.title OR old.description IS NOT new.description "
+    "OR old.project_id IS NOT new.project_id OR old.assigned_to_id IS NOT new.assigned_to_id BEGIN "
+    f"UPDATE {FTS_TABLE} SET title = new.title, description = new.description, "
+    "project_name = (SELECT name FROM task_app_project WHERE id = new.project_id), "
+    "assignee = (SELECT username FROM auth_user WHERE id = new.assigned_to_id) WHERE rowid = new.id; END",
+    "CREATE TRIGGER IF NOT EXISTS task_app_task_fts_delete AFTER DELETE ON task_app_task BEGIN "
+    f"DELETE FROM {FTS_TABLE} WHERE rowid = old.id; END",
+    "CREATE TRIGGER IF NOT EXISTS task_app_project_fts_rename AFTER UPDATE OF name ON task_app_project "
+    "WHEN old.name IS NOT new.name BEGIN "
+    f"UPDATE {FTS_TABLE} SET project_name = new.name "
+    "WHERE rowid IN (SELECT id FROM task_app_task WHERE project_id = new.id); END",
+    "CREATE TRIGGER IF NOT EXISTS task_app_user_fts_rename AFTER UPDATE OF username ON auth_user "
+    "WHEN old.username IS NOT new.username BEGIN "
+    f"UPDATE {FTS_TABLE} SET assignee = new.username "
+    "WHERE rowid IN (SELECT id FROM task_app_task WHERE assigned_to_id = new.id); END",
+]
+
+OLD_CREATE_TABLE_SQL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "title, description, project_name, tokenize = 'unicode61 remove_diacritics 2')"
+)
+
+OLD_POPULATE_SQL = (
+    f"INSERT INTO {FTS_TABLE} (rowid, title, description, project_name) "
+    "SELECT t.id, t.title, t.description, p.name "
+    "FROM task_app_task t JOIN task_app_project p ON p.id = t.project_id"
+)
+
+OLD_TRIGGER_SQL = [
+    "CREATE TRIGGER IF NOT EXISTS task_app_task_fts_insert AFTER INSERT ON task_app_task BEGIN "
+    f"INSERT INTO {FTS_TABLE} (rowid, title, description, project_name) VALUES ("
+    "new.id, new.title, new.description, (SELECT name FROM task_app_project WHERE id = new.project_id)); END",
+    "CREATE TRIGGER IF NOT EXISTS task_app_task_fts_update "
+    "AFTER UPDATE OF title, description, project_id ON task_app_task "
+    "WHEN old.title IS NOT new.title OR old.description IS NOT new.description "
+    "OR old.project_id IS NOT new.project_id BEGIN "
+    f"UPDATE {FTS_TABLE} SET title = new.title, description = new.description, "
+    "project_name = (SELECT name FROM task_app_project WHERE id = new.project_id) WHERE rowid = new.id; END",
+    "CREATE TRIGGER IF NOT EXISTS task_app_task_fts_delete AFTER DELETE ON task_app_task BEGIN "
+    f"DELETE FROM {FTS_TABLE} WHERE rowid = old.id; END",
+    "CREATE TRIGGER IF NOT EXISTS task_app_project_fts_rename AFTER UPDATE OF name ON task_app_project "
+    "WHEN old.name IS NOT new.name BEGIN "
+    f"UPDATE {FTS_TABLE} SET project_name = new.name "
+    "WHERE rowid IN (SELECT id FROM task_app_task WHERE project_id = new.id); END",
+]
+
+DROP_SQL = [
+    "DROP TRIGGER IF EXISTS task_app_user_fts_rename",
+    "DROP TRIGGER IF EXISTS task_app_project_fts_rename",
+    "DROP TRIGGER IF EXISTS task_app_task_fts_delete",
+    "DROP TRIGGER IF EXISTS task_app_task_fts_update",
+    "DROP TRIGGER IF EXISTS task_app_task_fts_insert",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+
+def _rebuild(schema_editor, create_sql, populate_sql, trigger_sql):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in [*DROP_SQL, create_sql, populate_sql, *trigger_sql]:
+        schema_editor.execute(statement)
+
+
+def add_assignee_to_index(apps, schema_editor):
+    _rebuild(schema_editor, CREATE_TABLE_SQL, POPULATE_SQL, TRIGGER_SQL)
+
+
+def remove_assignee_from_index(apps, schema_editor):
+    _rebuild(schema_editor, OLD_CREATE_TABLE_SQL, OLD_POPULATE_SQL, OLD_TRIGGER_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task_app', '0012_project_archive'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(add_assignee_to_index, remove_assignee_from_index),
+        migrations.CreateModel(
+            name='TaskSearchIndex',
+            fields=[
+                ('task', models.OneToOneField(db_column='rowid', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_index', serialize=False, to='task_app.task')),
+                ('rank', task_app.search.SearchRankField()),
+            ],
+            options={
+                'db_table': 'task_app_task_fts',
+                'managed': False,
+            },
+        ),
+    ]
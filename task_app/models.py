@@ -1,10 +1,130 @@
-from django.db import models
+from collections import Counter, defaultdict, namedtuple
+
+from django.db import models, transaction
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
+from django.core.validators import MinValueValidator
 from django.utils.translation import gettext_lazy as _
 from django.urls import reverse
+from django.utils import timezone
+
+from .caching import acached_project_access, cached_project_access, invalidate_dashboards
+from .live import publish_refresh, publish_task
+from .search import FTS_TABLE, SearchRankField, search_tasks
+
+# Date rules shared by Task.clean, TaskForm.clean and the bulk import
+def validate_task_dates(start_date, due_date, project_end_date):
+    if due_date and start_date and due_date < start_date:
+        raise ValidationError(_('Due date cannot be earlier than start date.'))
+    if due_date and project_end_date and due_date > project_end_date:
+        raise ValidationError(_('Task due date cannot exceed the project end date.'))
+
+# Ids of the projects a user owns and of the projects shared with them through a ProjectMembership
+class ProjectAccess(namedtuple('ProjectAccess', ['owned', 'shared'])):
+    __slots__ = ()
+
+    @property
+    def visible(self):
+        return self.owned | self.shared
+
+
+def _load_project_access(user_id):
+    return ProjectAccess(
+        frozenset(Project.objects.filter(created_by_id=user_id).values_list('pk', flat=True)),
+        frozenset(ProjectMembership.objects.filter(user_id=user_id).values_list('project_id', flat=True)),
+    )
+
+
+async def _aload_project_access(user_id):
+    return ProjectAccess(
+        frozenset([pk async for pk in Project.objects.filter(created_by_id=user_id).values_list('pk', flat=True)]),
+        frozenset([pk async for pk in ProjectMembership.objects.filter(user_id=user_id)
+                   .values_list('project_id', flat=True)]),
+    )
+
+
+# A user's ProjectAccess: cached between requests (see caching.invalidate_project_access) and kept on the
+# user object for the rest of the request
+def project_access(user):
+    access = getattr(user, '_project_access', None)
+    if access is None:
+        access = user._project_access = cached_project_access(user.pk, lambda: _load_project_access(user.pk))
+    return access
+
+
+# Load a user's ProjectAccess from async code, so later visible_to() calls in the request need no query
+async def aproject_access(user):
+    access = getattr(user, '_project_access', None)
+    if access is None:
+        access = user._project_access = await acached_project_access(user.pk, lambda: _aload_project_access(user.pk))
+    return access
+
+class ProjectQuerySet(models.QuerySet):
+    # Projects the user can see: every project for staff, otherwise the ones they own or are a member of.
+    # The shared ids come from the cached ProjectAccess instead of a join through the memberships.
+    def visible_to(self, user):
+        if user.is_staff:
+            return self.all()
+        return self.filter(models.Q(created_by=user) | models.Q(pk__in=project_access(user).shared))
+
+    # Projects the user can edit and share: every project for staff, otherwise the ones they own
+    def editable_by(self, user):
+        if user.is_staff:
+            return self.all()
+        return self.filter(created_by=user)
+
+    # Annotate each project with task counts taken from the task table in one grouped aggregate
+    def with_task_counts(self):
+        annotations = {'counted_task_count': models.Count('task')}
+        for status, field in Project.STATUS_COUNTER_FIELDS.items():
+            annotations[f'counted_{field}'] = models.Count('task', filter=models.Q(task__status=status))
+        return self.annotate(**annotations)
+
+    # Apply {(project_id, status): change} deltas to the task counters with atomic F() updates
+    def apply_task_deltas(self, deltas):
+        changes = defaultdict(Counter)
+        for (project_id, status), change in deltas.items():
+            if change and project_id is not None:
+                changes[project_id][Project.STATUS_COUNTER_FIELDS[status]] += change
+                changes[project_id]['task_count'] += change
+        for project_id, fields in changes.items():
+            self.filter(pk=project_id).update(
+                **{field: models.F(field) + change for field, change in fields.items() if change})
+
+    # Tasks go with their projects, deleted by Django in batches since Task has no delete signals. Their
+    # counters and status log go with the projects, so only the affected dashboards and live streams are told.
+    def delete(self):
+        with transaction.atomic(using=self.db):
+            user_ids, project_ids = Task.objects.using(self.db).filter(project__in=self.values('pk'))._audience()
+            deleted = super().delete()
+            invalidate_dashboards(user_ids)
+            if project_ids:
+                publish_refresh(user_ids, project_ids)
+        return deleted
+
+    # Recompute the task counters from the task table and repair drifted rows, returning how many changed
+    def recount_tasks(self):
+        drifted = []
+        for project in self.with_task_counts().only('pk', *Project.COUNTER_FIELDS):
+            changed = False
+            for field in Project.COUNTER_FIELDS:
+                counted = getattr(project, f'counted_{field}')
+                if getattr(project, field) != counted:
+                    setattr(project, field, counted)
+                    changed = True
+            if changed:
+                drifted.append(project)
+        Project.objects.bulk_update(drifted, Project.COUNTER_FIELDS)
+        return len(drifted)
 
 class Project(models.Model):
+    STATUS_COUNTER_FIELDS = {
+        'pending': 'pending_count',
+        'in_progress': 'in_progress_count',
+        'completed': 'completed_count',
+    }
+    COUNTER_FIELDS = ['task_count', *STATUS_COUNTER_FIELDS.values()]
+
     name = models.CharField(max_length=100)
     description = models.TextField()
     start_date = models.DateField()
@@ -13,16 +133,49 @@ class Project(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Denormalized task counters, maintained by Task.save, TaskQuerySet and the task signals
+    task_count = models.PositiveIntegerField(default=0, editable=False)
+    pending_count = models.PositiveIntegerField(default=0, editable=False)
+    in_progress_count = models.PositiveIntegerField(default=0, editable=False)
+    completed_count = models.PositiveIntegerField(default=0, editable=False)
+
+    objects = ProjectQuerySet.as_manager()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored owner so a change of owner also drops the previous owner's cached access
+        if 'created_by_id' in field_names:
+            instance._loaded_created_by_id = instance.created_by_id
+        return instance
+
     def clean(self):
         if self.end_date and self.start_date and self.end_date < self.start_date:
             raise ValidationError(_('End date cannot be earlier than start date.'))
 
+    def save(self, *args, **kwargs):
+        # Counters only change through F() updates, so never write back possibly stale in-memory values
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.COUNTER_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
+    # Same bulk path as ProjectQuerySet.delete
+    def delete(self, *args, **kwargs):
+        with transaction.atomic(using=kwargs.get('using')):
+            user_ids, project_ids = Task.objects.filter(project=self)._audience()
+            deleted = super().delete(*args, **kwargs)
+            invalidate_dashboards(user_ids)
+            if project_ids:
+                publish_refresh(user_ids, project_ids)
+        return deleted
+
     def get_completion_rate(self):
-        total_tasks = self.task_set.count()
-        if total_tasks == 0:
+        if self.task_count == 0:
             return 0
-        completed_tasks = self.task_set.filter(status='completed').count()
-        return (completed_tasks / total_tasks) * 100
+        return (self.completed_count / self.task_count) * 100
 
     def __str__(self):
         return self.name
@@ -30,6 +183,143 @@ class Project(models.Model):
     def get_absolute_url(self):
         return reverse('project-detail', kwargs={'pk': self.pk})
 
+    class Meta:
+        indexes = [
+            # Owner listing, and the newest-first ordering of the admin and the project list, which both break ties
+            # on -id (with a plain -created_at index, SQLite sorts the tie-break in a temporary b-tree)
+            models.Index(fields=['created_by', 'created_at'], name='project_owner_created_idx'),
+            models.Index(fields=['-created_at', '-id'], name='project_created_idx'),
+        ]
+
+# Shares a project, and every task in it, with a user besides its owner
+class ProjectMembership(models.Model):
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='memberships')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='project_memberships')
+    added_at = models.DateTimeField(auto_now_add=True)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored member so moving a membership to another user drops both users' cached access
+        if 'user_id' in field_names:
+            instance._loaded_user_id = instance.user_id
+        return instance
+
+    def __str__(self):
+        return f"{self.user} in {self.project}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['project', 'user'], name='unique_project_member'),
+        ]
+
+class TaskQuerySet(models.QuerySet):
+    # Tasks the user can list and open: every task for staff, otherwise the ones assigned to them plus every task
+    # of the projects they own or are a member of (ids from the cached ProjectAccess)
+    def visible_to(self, user):
+        if user.is_staff:
+            return self.all()
+        return self.filter(models.Q(assigned_to=user) | models.Q(project_id__in=project_access(user).visible))
+
+    # Tasks the user can edit and move on the boards: every task for staff, otherwise the ones assigned to them
+    # plus every task of the projects they own. Members of a project only see its other tasks.
+    def editable_by(self, user):
+        if user.is_staff:
+            return self.all()
+        return self.filter(models.Q(assigned_to=user) | models.Q(project_id__in=project_access(user).owned))
+
+    # Keep the project task counters and dashboards in step with rows inserted in bulk
+    def bulk_create(self, objs, *args, **kwargs):
+        with transaction.atomic(using=self.db):
+            objs = super().bulk_create(objs, *args, **kwargs)
+            record_task_state_changes((obj.pk, None, (obj.project_id, obj.status)) for obj in objs)
+            user_ids = {obj.assigned_to_id for obj in objs}
+            project_ids = {obj.project_id for obj in objs}
+            user_ids.update(Project.objects.filter(pk__in=project_ids).values_list('created_by_id', flat=True))
+            invalidate_dashboards(user_ids)
+            publish_refresh(user_ids, project_ids)
+        return objs
+
+    # Keep the project task counters and dashboards in step with set-based changes
+    def update(self, **kwargs):
+        # Like save(), a set-based change moves updated_at so API ETags notice it
+        kwargs.setdefault('updated_at', timezone.now())
+        from .scheduling import shift_dependents_of  # task_app.scheduling imports this module
+        with transaction.atomic(using=self.db):
+            # Tasks whose due date this sets, to push back the tasks waiting for them, as Task.save does
+            rescheduled = list(self.order_by().values_list('pk', flat=True)) if 'due_date' in kwargs else []
+            user_ids, project_ids = self._audience()
+            if {'status', 'project', 'project_id'} & kwargs.keys():
+                rows = self._update_with_counters(**kwargs)
+            else:
+                rows = super().update(**kwargs)
+            # Also refresh whoever the rows now belong to
+            now_user_ids, now_project_ids = self._audience()
+            user_ids.update(now_user_ids)
+            project_ids.update(now_project_ids)
+            assignee = kwargs.get('assigned_to', kwargs.get('assigned_to_id'))
+            if isinstance(assignee, (User, int)):
+                user_ids.add(getattr(assignee, 'pk', assignee))
+            project = kwargs.get('project', kwargs.get('project_id'))
+            if isinstance(project, (Project, int)):
+                project_ids.add(getattr(project, 'pk', project))
+                user_ids.update(Project.objects.filter(pk=getattr(project, 'pk', project))
+                                .values_list('created_by_id', flat=True))
+            invalidate_dashboards(user_ids)
+            if rows:
+                publish_refresh(user_ids, project_ids)
+            shift_dependents_of(rescheduled)
+        return rows
+
+    def _update_with_counters(self, **kwargs):
+        # Stored state of every row about to change, for the counter deltas and the status log
+        before = {pk: (project_id, status)
+                  for pk, project_id, status in self.order_by().values_list('pk', 'project_id', 'status')}
+        rows = super().update(**kwargs)
+        status = kwargs.get('status')
+        project = kwargs.get('project', kwargs.get('project_id'))
+        if isinstance(project, Project):
+            project = project.pk
+        if hasattr(status, 'resolve_expression') or hasattr(project, 'resolve_expression'):
+            # New values are only known to the database (e.g. bulk_update), so read them back
+            after = {}
+            pks = list(before)
+            for start in range(0, len(pks), 500):
+                after.update(
+                    (pk, (project_id, status)) for pk, project_id, status in self.model._default_manager.using(self.db)
+                    .filter(pk__in=pks[start:start + 500]).values_list('pk', 'project_id', 'status'))
+        else:
+            after = {pk: (project or project_id, status or old_status)
+                     for pk, (project_id, old_status) in before.items()}
+        record_task_state_changes((pk, state, after.get(pk)) for pk, state in before.items())
+        return rows
+
+    # Delete without per-task signals, so Django removes the rows in batches, then move the counters, log the
+    # removals and refresh dashboards and live streams once for the whole set
+    def delete(self):
+        with transaction.atomic(using=self.db):
+            states = list(self.order_by().values_list('pk', 'project_id', 'status'))
+            user_ids, project_ids = self._audience()
+            deleted = super().delete()
+            record_task_state_changes((pk, (project_id, status), None) for pk, project_id, status in states)
+            invalidate_dashboards(user_ids)
+            if states:
+                publish_refresh(user_ids, project_ids)
+        return deleted
+
+    # Ranked full-text search over title, description, project name and assignee; see task_app.search
+    def search(self, text):
+        return search_tasks(self, text)
+
+    # Assignees and project owners whose dashboards show rows of this queryset, and the projects of the rows
+    def _audience(self):
+        user_ids, project_ids = set(), set()
+        rows = self.order_by().values_list('assigned_to_id', 'project_id', 'project__created_by_id').distinct()
+        for assignee_id, project_id, owner_id in rows:
+            user_ids.update((assignee_id, owner_id))
+            project_ids.add(project_id)
+        return user_ids, project_ids
+
 class Task(models.Model):
     STATUS_CHOICES = [
         ('pending', 'Pending'),
@@ -53,15 +343,393 @@ class Task(models.Model):
     project = models.ForeignKey(Project, on_delete=models.CASCADE)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Order of the card within its board column; moves take the midpoint of the new neighbours, see task_app.board
+    board_position = models.FloatField(default=0, editable=False)
+    # The recurrence this task was created from by task_app.recurrence, if any
+    occurrence_of = models.ForeignKey('TaskRecurrence', on_delete=models.SET_NULL, null=True, blank=True,
+                                      editable=False, related_name='occurrences')
+
+    objects = TaskQuerySet.as_manager()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored project and status so save() can move the counters by the difference
+        if 'project_id' in field_names and 'status' in field_names:
+            instance._counted_state = (instance.project_id, instance.status)
+        # Remember the stored assignee so a reassignment also refreshes the previous assignee's dashboard
+        if 'assigned_to_id' in field_names:
+            instance._loaded_assigned_to_id = instance.assigned_to_id
+        # Remember the stored due date so save() only reschedules the dependent tasks when it moves
+        if 'due_date' in field_names:
+            instance._loaded_due_date = instance.due_date
+        return instance
 
     def clean(self):
-        if self.due_date and self.start_date and self.due_date < self.start_date:
-            raise ValidationError(_('Due date cannot be earlier than start date.'))
-        if self.due_date and self.project.end_date and self.due_date > self.project.end_date:
-            raise ValidationError(_('Task due date cannot exceed the project end date.'))
+        # No project yet when the form rejected the chosen one; that error is reported already
+        validate_task_dates(self.start_date, self.due_date, self.project.end_date if self.project_id else None)
+        # A moved due date must leave room for the dependent tasks it pushes back; the plan is kept for save()
+        if self.project_id and self._due_date_moved():
+            from .scheduling import plan_shift  # task_app.scheduling imports this module
+            try:
+                self._dependent_shift = (self.due_date, plan_shift([self.pk], self.project.end_date,
+                                                                   {self.pk: self.due_date}))
+            except ValidationError as error:
+                raise ValidationError({'due_date': error})
+
+    # Whether this save writes a due date other than the stored one; decided without touching a deferred due_date
+    def _due_date_moved(self, update_fields=None):
+        if self._state.adding or not self._due_date_saved(update_fields) or self.due_date is None:
+            return False
+        return self.due_date != getattr(self, '_loaded_due_date', None)
+
+    # A deferred field is not written by save(), whatever update_fields says
+    def _due_date_saved(self, update_fields=None):
+        if update_fields is not None and 'due_date' not in update_fields:
+            return False
+        return 'due_date' not in self.get_deferred_fields()
+
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        update_fields = kwargs.get('update_fields')
+        tracked = update_fields is None or bool({'status', 'project', 'project_id'} & set(update_fields))
+        with transaction.atomic():
+            if tracked and not adding and not hasattr(self, '_counted_state'):
+                # Saved over an existing row without knowing its stored state, so read it first
+                self._counted_state = (Task.objects.filter(pk=self.pk)
+                                       .values_list('project_id', 'status').first())
+            super().save(*args, **kwargs)
+            if tracked:
+                self._sync_project_counters(adding)
+            # A moved due date pushes back the tasks waiting for this one, whichever path saved it (form, admin,
+            # code); raises ValidationError, saving nothing, if they no longer fit. `shifted_dependents` lists
+            # the ids of the tasks moved.
+            self.shifted_dependents = []
+            if not adding and self._due_date_moved(update_fields):
+                from .scheduling import plan_shift, save_shift  # task_app.scheduling imports this module
+                planned_due_date, moved = getattr(self, '_dependent_shift', (None, None))
+                if planned_due_date != self.due_date:
+                    moved = plan_shift([self.pk], self.project.end_date)
+                self.shifted_dependents = save_shift(self.project_id, moved)
+            self.__dict__.pop('_dependent_shift', None)
+            if self._due_date_saved(update_fields):
+                self._loaded_due_date = self.due_date
+
+    # A single delete updates the counters, log and dashboards itself (Task has no delete signals, see
+    # TaskQuerySet.delete) and tells the live streams which task went
+    def delete(self, *args, **kwargs):
+        state = getattr(self, '_counted_state', (self.project_id, self.status))
+        user_ids = {self.assigned_to_id, getattr(self, '_loaded_assigned_to_id', None)}
+        user_ids.update(Project.objects.filter(pk=state[0]).values_list('created_by_id', flat=True))
+        with transaction.atomic(using=kwargs.get('using')):
+            pk = self.pk
+            publish_task('deleted', self)  # Sent on commit; built now, while the task still has its id
+            deleted = super().delete(*args, **kwargs)
+            record_task_state_changes([(pk, state, None)])
+            invalidate_dashboards(user_ids)
+        return deleted
+
+    def _sync_project_counters(self, adding):
+        current = (self.project_id, self.status)
+        previous = None if adding else getattr(self, '_counted_state', None)
+        record_task_state_changes([(self.pk, previous, current)])
+        self._counted_state = current
 
     def __str__(self):
         return self.title
 
     def get_absolute_url(self):
         return reverse('task-detail', kwargs={'pk': self.pk})
+
+    class Meta:
+        indexes = [
+            # Assignee task list filtered by status, and the dashboard overdue query
+            models.Index(fields=['assigned_to', 'status', 'due_date'], name='task_assignee_status_due_idx'),
+            # Assignee task list filtered by priority only
+            models.Index(fields=['assigned_to', 'priority'], name='task_assignee_priority_idx'),
+            # Cursor pagination of the task list on (due_date, id), for assignees and for staff
+            models.Index(fields=['assigned_to', 'due_date'], name='task_assignee_due_idx'),
+            models.Index(fields=['due_date'], name='task_due_idx'),
+            # Staff task list and admin filters on status and/or priority
+            models.Index(fields=['status', 'priority'], name='task_status_priority_idx'),
+            models.Index(fields=['priority', 'due_date'], name='task_priority_due_idx'),
+            # Admin ordering, to which the changelist appends -pk
+            models.Index(fields=['-created_at', '-id'], name='task_created_idx'),
+            # Project board, one column per status in card order
+            models.Index(fields=['project', 'status', 'board_position'], name='task_board_idx'),
+            # Overdue / due-soon scans only ever look at open tasks
+            models.Index(
+                fields=['due_date'],
+                condition=models.Q(status__in=['pending', 'in_progress']),
+                name='task_open_due_idx',
+            ),
+        ]
+        constraints = [
+            # One generated task per recurrence and start date, even if two generator runs overlap
+            models.UniqueConstraint(fields=['occurrence_of', 'start_date'],
+                                    condition=models.Q(occurrence_of__isnull=False), name='unique_task_occurrence'),
+        ]
+
+
+# Read-only view of the SQLite FTS5 index, which task_app.search and its triggers maintain, so that searches join
+# it like any other table; other databases have no such table and never query it
+class TaskSearchIndex(models.Model):
+    task = models.OneToOneField(Task, primary_key=True, db_column='rowid', db_constraint=False,
+                                on_delete=models.DO_NOTHING, related_name='search_index')
+    rank = SearchRankField()
+
+    class Meta:
+        managed = False
+        db_table = FTS_TABLE
+
+
+class TaskDependency(models.Model):
+    # Finish-to-start link: `task` cannot start before `depends_on` is due. Both tasks belong to the same project
+    # and the links of a project form a DAG, which task_app.scheduling walks for the critical path.
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='dependencies')
+    depends_on = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='dependents')
+
+    def clean(self):
+        if self.task_id and self.depends_on_id:
+            validate_task_dependency(self.task, self.depends_on)
+
+    # Cycles are rejected on every save, not only through forms, since one would stall the schedule
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            self.clean()
+            super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"{self.task} after {self.depends_on}"
+
+    class Meta:
+        verbose_name_plural = 'task dependencies'
+        constraints = [
+            models.UniqueConstraint(fields=['task', 'depends_on'], name='unique_task_dependency'),
+            models.CheckConstraint(condition=~models.Q(task=models.F('depends_on')), name='task_dependency_not_self'),
+        ]
+
+# Raise ValidationError unless `depends_on` can become a prerequisite of `task`: another task of the same
+# project that does not already wait, directly or through other tasks, for `task`
+def validate_task_dependency(task, depends_on):
+    if task.pk == depends_on.pk:
+        raise ValidationError(_('A task cannot depend on itself.'))
+    if task.project_id != depends_on.project_id:
+        raise ValidationError(_('A task can only depend on tasks of the same project.'))
+    prerequisites = defaultdict(list)
+    links = TaskDependency.objects.filter(task__project_id=task.project_id).values_list('task_id', 'depends_on_id')
+    for task_id, prerequisite_id in links:
+        prerequisites[task_id].append(prerequisite_id)
+    # Reaching `task` from the new prerequisite means the link would close a cycle
+    pending, seen = [depends_on.pk], set()
+    while pending:
+        current = pending.pop()
+        if current == task.pk:
+            raise ValidationError(_('%(task)s already has to finish before %(depends_on)s can start.'),
+                                  params={'task': task, 'depends_on': depends_on})
+        if current not in seen:
+            seen.add(current)
+            pending.extend(prerequisites[current])
+
+# Rules for the last start date of a recurring task, shared by TaskRecurrence.clean and TaskForm.clean
+def validate_recurrence_until(until, start_date, project_end_date):
+    if until and start_date and until < start_date:
+        raise ValidationError(_('A task cannot stop repeating before it starts.'))
+    if until and project_end_date and until > project_end_date:
+        raise ValidationError(_('A task cannot repeat past the project end date.'))
+
+class TaskRecurrence(models.Model):
+    # Repeats a template task every `interval` days, weeks or months from its start date, until `until` or the
+    # project end date. manage.py generate_recurring_tasks creates the occurrences a few weeks ahead.
+    FREQUENCY_CHOICES = [
+        ('daily', 'Daily'),
+        ('weekly', 'Weekly'),
+        ('monthly', 'Monthly'),
+    ]
+
+    template = models.OneToOneField(Task, on_delete=models.CASCADE, related_name='recurrence')
+    frequency = models.CharField(max_length=10, choices=FREQUENCY_CHOICES)
+    interval = models.PositiveSmallIntegerField(default=1, validators=[MinValueValidator(1)])
+    until = models.DateField(null=True, blank=True)  # Last start date; the project end date when empty
+    # Every occurrence starting up to this date exists; the generator continues after it
+    generated_through = models.DateField(editable=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def clean(self):
+        validate_recurrence_until(self.until, self.template.start_date, self.template.project.end_date)
+
+    def save(self, *args, **kwargs):
+        if self.generated_through is None:
+            self.generated_through = self.template.start_date  # The template is the first occurrence
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"{self.template} ({self.get_frequency_display().lower()})"
+
+    class Meta:
+        indexes = [
+            # The generator only looks at recurrences not yet generated through its window
+            models.Index(fields=['generated_through'], name='recurrence_generated_idx'),
+        ]
+
+class TaskStatusEvent(models.Model):
+    # Append-only log of task status changes per project, the source of the daily snapshots.
+    # Moving a task logs leaving one project and entering the other; creation and deletion have no old/new status.
+    # The task and project keys are unconstrained so the log can outlive deleted tasks; see task_app.signals.
+    task = models.ForeignKey(Task, on_delete=models.DO_NOTHING, db_constraint=False, null=True,
+                             related_name='status_events')
+    project = models.ForeignKey(Project, on_delete=models.DO_NOTHING, db_constraint=False,
+                                related_name='status_events')
+    old_status = models.CharField(max_length=20, choices=Task.STATUS_CHOICES, null=True, blank=True)
+    new_status = models.CharField(max_length=20, choices=Task.STATUS_CHOICES, null=True, blank=True)
+    changed_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['project', 'changed_at'], name='status_event_project_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.task_id}: {self.old_status} -> {self.new_status}'
+
+# Record (task_id, previous, current) state changes, where a state is (project_id, status) or None for a task
+# that is not stored: logs the TaskStatusEvents and moves the project task counters by the difference
+def record_task_state_changes(changes):
+    now = timezone.now()
+    events = []
+    for task_id, previous, current in changes:
+        if previous == current:
+            continue
+        if previous and current and previous[0] == current[0]:
+            events.append(TaskStatusEvent(task_id=task_id, project_id=current[0], old_status=previous[1],
+                                          new_status=current[1], changed_at=now))
+            continue
+        if previous:
+            events.append(TaskStatusEvent(task_id=task_id, project_id=previous[0], old_status=previous[1],
+                                          changed_at=now))
+        if current:
+            events.append(TaskStatusEvent(task_id=task_id, project_id=current[0], new_status=current[1],
+                                          changed_at=now))
+    deltas = Counter()
+    for event in events:
+        if event.old_status:
+            deltas[(event.project_id, event.old_status)] -= 1
+        if event.new_status:
+            deltas[(event.project_id, event.new_status)] += 1
+    Project.objects.apply_task_deltas(deltas)
+    TaskStatusEvent.objects.bulk_create(events, batch_size=1000)
+
+class ProjectStatusSnapshot(models.Model):
+    # Task counts by status at the end of each day with changes, rolled up from TaskStatusEvent.
+    # Days without changes have no row; they carry the counts of the previous row.
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='status_snapshots')
+    day = models.DateField()
+    pending_count = models.IntegerField(default=0)
+    in_progress_count = models.IntegerField(default=0)
+    completed_count = models.IntegerField(default=0)
+    completed_events = models.IntegerField(default=0)  # Tasks moved to completed that day, for velocity
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['project', 'day'], name='status_snapshot_project_day_uniq'),
+        ]
+
+    def __str__(self):
+        return f'{self.project_id} {self.day}'
+
+    @property
+    def remaining_count(self):
+        return self.pending_count + self.in_progress_count
+
+class Checkpoint(models.Model):
+    # High-water marks of jobs that consume a table incrementally, e.g. the last rolled-up TaskStatusEvent id
+    name = models.CharField(max_length=50, unique=True)
+    position = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'{self.name}: {self.position}'
+
+class Notification(models.Model):
+    KIND_CHOICES = [
+        ('overdue', 'Overdue'),
+        ('due_soon', 'Due soon'),
+    ]
+
+    # One digest per assignee, kind and due date, written by the notify_due_tasks worker
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notifications')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    due_date = models.DateField()
+    tasks = models.ManyToManyField(Task, related_name='notifications')
+    task_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    read_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='notification_user_created_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.user}: {self.task_count} {self.get_kind_display().lower()} on {self.due_date}'
+
+class ArchivedProjectQuerySet(models.QuerySet):
+    # Same visibility as ProjectQuerySet.visible_to: staff, the owner and the members the project had
+    def visible_to(self, user):
+        if user.is_staff:
+            return self.all()
+        shared = ArchivedProject.members.through.objects.filter(user=user).values('archivedproject_id')
+        return self.filter(models.Q(created_by=user) | models.Q(pk__in=shared))
+
+class ArchivedProject(models.Model):
+    # A finished project moved out of the hot tables by task_app.archive, with its original id and timestamps.
+    # Read-only until task_app.archive.restore_projects moves it back.
+    id = models.BigIntegerField(primary_key=True)
+    name = models.CharField(max_length=100)
+    description = models.TextField()
+    start_date = models.DateField()
+    end_date = models.DateField()
+    created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_projects')
+    members = models.ManyToManyField(User, related_name='archived_shared_projects', blank=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    objects = ArchivedProjectQuerySet.as_manager()
+
+    def __str__(self):
+        return self.name
+
+    def get_absolute_url(self):
+        return reverse('archived-project-detail', kwargs={'pk': self.pk})
+
+    class Meta:
+        indexes = [
+            # Archive listing, most recently archived first
+            models.Index(fields=['-archived_at'], name='archived_project_archived_idx'),
+        ]
+
+class ArchivedTask(models.Model):
+    # A task of an ArchivedProject, as it was when archived. `depends_on` keeps its TaskDependency links.
+    id = models.BigIntegerField(primary_key=True)
+    title = models.CharField(max_length=150)
+    description = models.TextField()
+    assigned_to = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_tasks')
+    status = models.CharField(max_length=20, choices=Task.STATUS_CHOICES)
+    priority = models.CharField(max_length=20, choices=Task.PRIORITY_CHOICES)
+    start_date = models.DateField()
+    due_date = models.DateField()
+    project = models.ForeignKey(ArchivedProject, on_delete=models.CASCADE, related_name='tasks')
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    board_position = models.FloatField(default=0)
+    depends_on = models.ManyToManyField('self', symmetrical=False, related_name='dependents', blank=True)
+
+    def __str__(self):
+        return self.title
+
+    class Meta:
+        indexes = [
+            # Task table of the archived project page
+            models.Index(fields=['project', 'due_date'], name='archived_task_project_due_idx'),
+        ]
@@ -0,0 +1,90 @@
+from datetime import date, timedelta
+from itertools import groupby
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.template.defaultfilters import pluralize
+from django.utils import timezone
+
+from .models import Checkpoint, Notification, Task
+
+OPEN_STATUSES = ['pending', 'in_progress']
+
+
+# Last due date each kind of digest has been written for, kept as a date ordinal in a Checkpoint.
+# A fresh install starts with tasks that became overdue yesterday rather than the whole backlog.
+def _checkpoint(kind, today):
+    checkpoint, _created = Checkpoint.objects.select_for_update().get_or_create(
+        name=f'notifications:{kind}', defaults={'position': (today - timedelta(days=2)).toordinal()})
+    return checkpoint
+
+
+# Write overdue and due-soon digests for every due date that reached its notification window since the
+# last run, one due date per transaction so an interrupted run resumes where it stopped.
+# Returns {kind: digests written}.
+def notify_due_tasks(today=None, lead_days=None, batch_size=500):
+    today = today or timezone.localdate()
+    lead_days = settings.TASK_DUE_SOON_DAYS if lead_days is None else lead_days
+    horizons = {
+        'overdue': today - timedelta(days=1),  # Due dates that have just passed
+        'due_soon': today + timedelta(days=lead_days),  # Due dates coming up within the lead time
+    }
+    written = dict.fromkeys(horizons, 0)
+    for kind, horizon in horizons.items():
+        while True:
+            with transaction.atomic():
+                checkpoint = _checkpoint(kind, today)
+                due_date = date.fromordinal(checkpoint.position + 1)
+                if due_date > horizon:
+                    break
+                # Days the worker missed are already past, so they only get an overdue digest
+                if kind == 'overdue' or due_date >= today:
+                    written[kind] += _write_digests(kind, due_date, batch_size)
+                checkpoint.position = due_date.toordinal()
+                checkpoint.save(update_fields=['position', 'updated_at'])
+    return written
+
+
+# Group the open tasks due on one date by assignee, store one digest per assignee in batches and queue their emails
+def _write_digests(kind, due_date, batch_size):
+    rows = (Task.objects.filter(due_date=due_date, status__in=OPEN_STATUSES)
+            .order_by('assigned_to_id', 'pk')
+            .values_list('pk', 'assigned_to_id', 'assigned_to__email', 'title', 'project__name')
+            .iterator(chunk_size=2000))
+    written = 0
+    batch = []
+    for assignee_id, tasks in groupby(rows, key=lambda row: row[1]):
+        batch.append((assignee_id, list(tasks)))
+        if len(batch) >= batch_size:
+            written += _store_batch(kind, due_date, batch)
+            batch = []
+    return written + _store_batch(kind, due_date, batch)
+
+
+def _store_batch(kind, due_date, batch):
+    if not batch:
+        return 0
+    notifications = Notification.objects.bulk_create([
+        Notification(user_id=assignee_id, kind=kind, due_date=due_date, task_count=len(tasks))
+        for assignee_id, tasks in batch
+    ])
+    Notification.tasks.through.objects.bulk_create([
+        Notification.tasks.through(notification_id=notification.pk, task_id=task[0])
+        for notification, (_assignee_id, tasks) in zip(notifications, batch)
+        for task in tasks
+    ], batch_size=1000)
+    messages = [_digest_email(kind, due_date, tasks) for _assignee_id, tasks in batch if tasks[0][2]]
+    # Only mail once the digests are stored, so a rolled-back batch sends nothing
+    transaction.on_commit(lambda: get_connection().send_messages(messages))
+    return len(notifications)
+
+
+def _digest_email(kind, due_date, tasks):
+    count = len(tasks)
+    if kind == 'overdue':
+        subject = f"{count} task{pluralize(count)} overdue since {due_date}"
+    else:
+        subject = f"{count} task{pluralize(count)} due on {due_date}"
+    body = '\n'.join(f"- {title} ({project_name})" for _pk, _user, _email, title, project_name in tasks)
+    return EmailMessage(subject, body, to=[tasks[0][2]])
@@ -0,0 +1,159 @@
+import base64
+import binascii
+import json
+from datetime import date
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.http import Http404
+from django.utils.functional import cached_property
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+# Encode the ordering key values of a row as an opaque, URL-safe cursor
+def encode_cursor(obj, ordering):
+    values = []
+    for field in ordering:
+        value = getattr(obj, field.lstrip('-'))
+        values.append(value.isoformat() if isinstance(value, date) else value)
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, ordering):
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (binascii.Error, ValueError):
+        raise InvalidCursor("Invalid cursor.")
+    if not isinstance(values, list) or len(values) != len(ordering):
+        raise InvalidCursor("Invalid cursor.")
+    return values
+
+
+# Build the "rows after this key" condition, e.g. (a > x) OR (a = x AND b > y) for ordering (a, b)
+def keyset_filter(ordering, values):
+    condition = Q()
+    equal = Q()
+    for field, value in zip(ordering, values):
+        name = field.lstrip('-')
+        lookup = 'lt' if field.startswith('-') else 'gt'
+        condition |= equal & Q(**{f'{name}__{lookup}': value})
+        equal &= Q(**{name: value})
+    return condition
+
+
+def _page_queryset(queryset, ordering, cursor, page_size):
+    queryset = queryset.order_by(*ordering)
+    if cursor:
+        try:
+            queryset = queryset.filter(keyset_filter(ordering, decode_cursor(cursor, ordering)))
+        except (TypeError, ValidationError):
+            raise InvalidCursor("Invalid cursor.")
+    return queryset[:page_size + 1]  # One extra row tells whether there is a next page
+
+
+def _split_page(rows, ordering, page_size):
+    if len(rows) <= page_size:
+        return rows, None
+    rows = rows[:page_size]
+    return rows, encode_cursor(rows[-1], ordering)
+
+
+# Slice an ordered queryset to the page after the cursor, returning (rows, next_cursor)
+def paginate_by_cursor(queryset, ordering, cursor, page_size):
+    rows = list(_page_queryset(queryset, ordering, cursor, page_size))
+    return _split_page(rows, ordering, page_size)
+
+
+# Async counterpart of paginate_by_cursor, reading the page with the async ORM
+async def apaginate_by_cursor(queryset, ordering, cursor, page_size):
+    rows = [row async for row in _page_queryset(queryset, ordering, cursor, page_size).aiterator()]
+    return _split_page(rows, ordering, page_size)
+
+
+# ListView mixin replacing OFFSET pagination with keyset pagination on a unique ordering
+class KeysetPaginationMixin:
+    paginate_by = 50
+    keyset_ordering = ('id',)  # Must end with a unique field so every row has a distinct key
+    cursor_param = 'cursor'
+
+    def get_keyset_ordering(self):
+        return self.keyset_ordering
+
+    def paginate_queryset(self, queryset, page_size):
+        cursor = self.request.GET.get(self.cursor_param)
+        try:
+            rows, self.next_cursor = paginate_by_cursor(queryset, self.get_keyset_ordering(), cursor, page_size)
+        except InvalidCursor:
+            raise Http404("Invalid cursor.")
+        return (None, None, rows, bool(self.next_cursor))
+
+    async def apaginate_queryset(self, queryset, page_size):
+        cursor = self.request.GET.get(self.cursor_param)
+        try:
+            rows, self.next_cursor = await apaginate_by_cursor(queryset, self.get_keyset_ordering(), cursor, page_size)
+        except InvalidCursor:
+            raise Http404("Invalid cursor.")
+        return (None, None, rows, bool(self.next_cursor))
+
+    # Expose query strings for the next and first pages that keep the other GET filters
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        params = self.request.GET.copy()
+        params.pop(self.cursor_param, None)
+        context['first_page_query'] = params.urlencode() if self.cursor_param in self.request.GET else None
+        context['next_page_query'] = None
+        if getattr(self, 'next_cursor', None):
+            params[self.cursor_param] = self.next_cursor
+            context['next_page_query'] = params.urlencode()
+        return context
+
+
+# Async list views: get() fetches the page with the async ORM, then renders from it without further queries
+class AsyncKeysetListMixin:
+    async def get(self, request, *args, **kwargs):
+        self.object_list = self.get_queryset()
+        self.page = await self.apaginate_queryset(self.object_list, self.get_paginate_by(self.object_list))
+        return self.render_to_response(self.get_context_data())
+
+    # Hand get_context_data the page fetched in get()
+    def paginate_queryset(self, queryset, page_size):
+        return self.page
+
+
+# Row count of a table from the database's planner statistics, or None when there are none.
+# SQLite keeps them in sqlite_stat1 once ANALYZE (or PRAGMA optimize) has run; each index row starts with the table size.
+def estimate_table_rows(model, using='default'):
+    connection = connections[using]
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'")
+            if cursor.fetchone() is None:
+                return None
+            cursor.execute('SELECT MAX(CAST(stat AS INTEGER)) FROM sqlite_stat1 WHERE tbl = %s', [table])
+        elif connection.vendor == 'postgresql':
+            cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [table])
+        else:
+            return None
+        row = cursor.fetchone()
+    return row[0] if row and row[0] and row[0] > 0 else None
+
+
+# Paginator for admin changelists over large tables: an unfiltered list takes its size from the
+# planner statistics instead of a COUNT(*) over every row. Filtered lists are still counted exactly.
+class EstimatedCountPaginator(Paginator):
+    exact_count_limit = 10000  # Tables estimated below this size are cheap to count exactly
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = estimate_table_rows(queryset.model, queryset.db)
+            if estimate is not None and estimate >= self.exact_count_limit:
+                return estimate
+        return queryset.count()
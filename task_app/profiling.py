@@ -0,0 +1,194 @@
+import logging
+import os
+import threading
+import traceback
+from collections import Counter, defaultdict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.template.base import Template
+
+logger = logging.getLogger(__name__)
+
+SAMPLES_PER_ROUTE = 1000  # Most recent requests kept per view for the percentiles
+_current = ContextVar('request_profile', default=None)
+_samples = defaultdict(lambda: deque(maxlen=SAMPLES_PER_ROUTE))
+_duplicates = defaultdict(dict)
+_lock = threading.Lock()
+
+
+class RequestProfile:
+    def __init__(self):
+        self.queries = []  # (sql, seconds, origin)
+        self.template_time = 0.0
+        self._template_depth = 0
+
+    @property
+    def query_time(self):
+        return sum(seconds for _sql, seconds, _origin in self.queries)
+
+    # Statements run more than once, e.g. one per row of a list: [(sql, count, [origins])], most repeated first
+    def duplicates(self):
+        counts = Counter(sql for sql, _seconds, _origin in self.queries)
+        origins = defaultdict(list)
+        for sql, _seconds, origin in self.queries:
+            if counts[sql] > 1 and origin not in origins[sql]:
+                origins[sql].append(origin)
+        return [(sql, count, origins[sql]) for sql, count in counts.most_common() if count > 1]
+
+
+# Record the queries and template time of everything run inside the block, including sync_to_async threads
+@contextmanager
+def profiled():
+    install_hooks()
+    profile = RequestProfile()
+    token = _current.set(profile)
+    try:
+        yield profile
+    finally:
+        _current.reset(token)
+
+
+# The innermost project frame that led to a query, skipping Django and this module
+def _origin():
+    for frame in reversed(traceback.extract_stack()):
+        filename = frame.filename
+        if (filename.startswith(str(settings.BASE_DIR)) and 'site-packages' not in filename
+                and filename != __file__):
+            return f'{os.path.relpath(filename, settings.BASE_DIR)}:{frame.lineno} in {frame.name}'
+    return 'unknown'
+
+
+def _record_query(execute, sql, params, many, context):
+    profile = _current.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    started = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        profile.queries.append((sql, perf_counter() - started, _origin()))
+
+
+def _add_query_recorder(connection, **kwargs):
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+_original_template_render = Template.render
+
+
+# Time the outermost template render; included templates are part of it
+def _profiled_template_render(self, context):
+    profile = _current.get()
+    if profile is None:
+        return _original_template_render(self, context)
+    profile._template_depth += 1
+    started = perf_counter()
+    try:
+        return _original_template_render(self, context)
+    finally:
+        profile._template_depth -= 1
+        if not profile._template_depth:
+            profile.template_time += perf_counter() - started
+
+
+# Query recorders go on every connection, present and future; they do nothing outside a profiled block
+def install_hooks():
+    if Template.render is _profiled_template_render:
+        return
+    Template.render = _profiled_template_render
+    connection_created.connect(_add_query_recorder, dispatch_uid='task_app.profiling')
+    for connection in connections.all(initialized_only=True):
+        _add_query_recorder(connection)
+
+
+def _record_sample(route, wall_time, profile):
+    with _lock:
+        _samples[route].append((wall_time, len(profile.queries), profile.query_time, profile.template_time))
+        for sql, count, origins in profile.duplicates():
+            _duplicates[route][sql] = (max(count, _duplicates[route].get(sql, (0,))[0]), origins)
+
+
+def _percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+# Per-view wall time percentiles, average query count, SQL time and template time, plus repeated queries
+def profiling_stats():
+    with _lock:
+        samples = {route: list(values) for route, values in _samples.items()}
+        duplicates = {route: dict(values) for route, values in _duplicates.items()}
+    stats = []
+    for route, values in sorted(samples.items()):
+        walls = [sample[0] * 1000 for sample in values]
+        stats.append({
+            'route': route,
+            'requests': len(values),
+            'p50': _percentile(walls, 0.50),
+            'p95': _percentile(walls, 0.95),
+            'p99': _percentile(walls, 0.99),
+            'queries': sum(sample[1] for sample in values) / len(values),
+            'sql_ms': sum(sample[2] for sample in values) * 1000 / len(values),
+            'template_ms': sum(sample[3] for sample in values) * 1000 / len(values),
+            'duplicates': sorted(
+                ((sql, count, origins) for sql, (count, origins) in duplicates.get(route, {}).items()),
+                key=lambda item: -item[1]),
+        })
+    return stats
+
+
+def reset_profiling_stats():
+    with _lock:
+        _samples.clear()
+        _duplicates.clear()
+
+
+# Opt-in (REQUEST_PROFILING) middleware timing each request, its SQL and its template rendering.
+# Adds a Server-Timing header, logs repeated queries with where they came from, and feeds profiling_stats().
+class ProfilingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_PROFILING:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        install_hooks()
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        started = perf_counter()
+        with profiled() as profile:
+            response = self.get_response(request)
+        return self.finish(request, response, profile, perf_counter() - started)
+
+    async def __acall__(self, request):
+        started = perf_counter()
+        with profiled() as profile:
+            response = await self.get_response(request)
+        return self.finish(request, response, profile, perf_counter() - started)
+
+    def finish(self, request, response, profile, wall_time):
+        match = request.resolver_match
+        route = match._func_path if match else 'unresolved'
+        response['Server-Timing'] = (
+            f'app;dur={wall_time * 1000:.1f}, '
+            f'db;dur={profile.query_time * 1000:.1f};desc="{len(profile.queries)} queries", '
+            f'tpl;dur={profile.template_time * 1000:.1f}'
+        )
+        for sql, count, origins in profile.duplicates():
+            logger.warning("%s ran %d times during %s %s, from %s",
+                           sql, count, request.method, request.path, ', '.join(origins))
+        _record_sample(route, wall_time, profile)
+        return response
@@ -0,0 +1,83 @@
+from calendar import monthrange
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Task, TaskRecurrence
+
+
+# Start date of occurrence `number` of a series starting on `anchor` (occurrence 0). Months are counted from
+# the anchor, so a series on the 31st falls on the last day of shorter months without drifting.
+def occurrence_date(anchor, frequency, interval, number):
+    if frequency == 'daily':
+        return anchor + timedelta(days=interval * number)
+    if frequency == 'weekly':
+        return anchor + timedelta(weeks=interval * number)
+    months = anchor.month - 1 + interval * number
+    year, month = anchor.year + months // 12, months % 12 + 1
+    return anchor.replace(year=year, month=month, day=min(anchor.day, monthrange(year, month)[1]))
+
+
+# Start dates of the occurrences after `after` up to `through`, computed one at a time
+def occurrence_dates(anchor, frequency, interval, after, through):
+    # Jump close to `after` instead of walking the series from its start
+    if frequency == 'monthly':
+        number = ((after.year - anchor.year) * 12 + after.month - anchor.month) // interval
+    else:
+        number = (after - anchor).days // (interval * (7 if frequency == 'weekly' else 1))
+    number = max(number, 0)
+    while True:
+        start = occurrence_date(anchor, frequency, interval, number)
+        if start > through:
+            return
+        if start > after:
+            yield start
+        number += 1
+
+
+# Create the occurrences of every recurrence that start within `days` from today, `chunk_size` recurrences
+# per transaction and at most `batch_size` tasks per bulk_create. Each recurrence moves its generated_through
+# cursor in the same transaction, so another run (or one after an interruption) only adds what is missing,
+# and a series that reached its end date is not looked at again. Returns the number of tasks created.
+def generate_occurrences(today=None, days=28, chunk_size=200, batch_size=1000):
+    today = today or timezone.localdate()
+    horizon = today + timedelta(days=days)
+    pending = (TaskRecurrence.objects
+               .filter(generated_through__lt=horizon)
+               .filter(generated_through__lt=F('template__project__end_date'))
+               .filter(Q(until__isnull=True) | Q(until__gt=F('generated_through')))
+               .select_related('template__project').order_by('pk'))
+    created = 0
+    last_pk = 0
+    while True:
+        with transaction.atomic():
+            chunk = list(pending.select_for_update().filter(pk__gt=last_pk)[:chunk_size])
+            if not chunk:
+                return created
+            tasks = []
+            for recurrence in chunk:
+                template = recurrence.template
+                project_end = template.project.end_date
+                end = min(recurrence.until or project_end, project_end)
+                duration = template.due_date - template.start_date
+                through = min(horizon, end)
+                for start in occurrence_dates(template.start_date, recurrence.frequency, recurrence.interval,
+                                              recurrence.generated_through, through):
+                    if start + duration > project_end:
+                        through = end  # This and every later occurrence would be due after the project ends
+                        break
+                    tasks.append(Task(
+                        title=template.title, description=template.description,
+                        assigned_to_id=template.assigned_to_id, priority=template.priority,
+                        start_date=start, due_date=start + duration, project_id=template.project_id,
+                        occurrence_of=recurrence))
+                    if len(tasks) >= batch_size:
+                        created += len(Task.objects.bulk_create(tasks))
+                        tasks = []
+                # Everything up to the window (or the end of the series, whichever is first) now exists
+                recurrence.generated_through = through
+            created += len(Task.objects.bulk_create(tasks))
+            TaskRecurrence.objects.bulk_update(chunk, ['generated_through'])
+            last_pk = chunk[-1].pk
@@ -0,0 +1,204 @@
+from collections import defaultdict, namedtuple
+from datetime import date
+
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+from django.db.models import Func, IntegerField
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from .caching import invalidate_dashboards
+from .live import publish_refresh
+from .models import Project, Task, TaskDependency
+
+# Propagating a due date touches only the tasks downstream of it and costs time in proportion to them; the full
+# schedule reads the whole project. Neither fits in 100 ms once tens of thousands of tasks are involved.
+# Dates are day ordinals (date.toordinal) throughout; `finish` and the slack are in days.
+# critical_path lists the ids of one chain of zero-slack tasks, from the first to start to the last to finish.
+Schedule = namedtuple('Schedule', ['order', 'earliest_start', 'earliest_finish', 'slack', 'critical_path', 'finish'])
+
+
+# Day ordinal (date.toordinal) of a date column, computed by SQLite so that loading a large project skips
+# parsing two dates per row
+class DayOrdinal(Func):
+    template = 'CAST(julianday(%(expressions)s) - 1721424.5 AS INTEGER)'
+    output_field = IntegerField()
+
+
+# The project's graph in one query joining every task to its TaskDependency rows: the tasks as
+# {id: (start, due)}, and their prerequisites and dependents as {id: [task ids]}
+def load_graph(project_id):
+    tasks = Task.objects.filter(project_id=project_id)
+    if connection.vendor == 'sqlite':
+        # Read the rows straight from the cursor; they are plain integers, and the per-row converters of the
+        # ORM would cost more than the scheduling itself on a large project
+        query = tasks.values_list('pk', 'dependencies__depends_on_id', DayOrdinal('start_date'),
+                                  DayOrdinal('due_date')).query
+        with connection.cursor() as cursor:
+            cursor.execute(*query.sql_with_params())
+            rows = cursor.fetchall()
+    else:
+        rows = [(pk, prerequisite_id, start_date.toordinal(), due_date.toordinal())
+                for pk, prerequisite_id, start_date, due_date
+                in tasks.values_list('pk', 'dependencies__depends_on_id', 'start_date', 'due_date')]
+    dates, prerequisites, successors = {}, defaultdict(list), defaultdict(list)
+    for pk, prerequisite_id, start, due in rows:
+        dates[pk] = (start, due)
+        if prerequisite_id is not None:
+            prerequisites[pk].append(prerequisite_id)
+            successors[prerequisite_id].append(pk)
+    return dates, prerequisites, successors
+
+
+# Task ids with every prerequisite before its dependents (Kahn's algorithm); raises ValidationError on a cycle,
+# which TaskDependency.save prevents but rows written around it could still form
+def topological_order(dates, prerequisites, successors):
+    waiting = {pk: len(prerequisites.get(pk, ())) for pk in dates}
+    order = [pk for pk, count in waiting.items() if not count]
+    for pk in order:  # The list grows while it is walked
+        for successor in successors.get(pk, ()):
+            waiting[successor] -= 1
+            if not waiting[successor]:
+                order.append(successor)
+    if len(order) < len(dates):
+        raise ValidationError(_('The task dependencies of this project form a cycle.'))
+    return order
+
+
+# Critical path method over the project's dependency graph. A task starts on its own start date or when its
+# last prerequisite is due, whichever is later, and keeps its duration; the slack is how many days it could
+# slip without delaying the end of the whole project.
+def compute_schedule(project):
+    dates, prerequisites, successors = load_graph(project.pk)
+    order = topological_order(dates, prerequisites, successors)
+
+    earliest_start, earliest_finish = {}, {}
+    for pk in order:
+        start, due = dates[pk]
+        for prerequisite_id in prerequisites.get(pk, ()):
+            start = max(start, earliest_finish[prerequisite_id])
+        earliest_start[pk] = start
+        earliest_finish[pk] = start + max(due - dates[pk][0], 0)
+    finish = max(earliest_finish.values(), default=None)
+
+    latest_start, slack = {}, {}
+    for pk in reversed(order):
+        latest_finish = min((latest_start[successor] for successor in successors.get(pk, ())), default=finish)
+        latest_start[pk] = latest_finish - (earliest_finish[pk] - earliest_start[pk])
+        slack[pk] = latest_start[pk] - earliest_start[pk]
+
+    # Walk back from a zero-slack task finishing last through the prerequisites that hold each step back
+    critical_path = []
+    current = next((pk for pk in reversed(order) if not slack[pk] and earliest_finish[pk] == finish), None)
+    while current is not None:
+        critical_path.append(current)
+        current = next((prerequisite_id for prerequisite_id in prerequisites.get(current, ())
+                        if not slack[prerequisite_id]
+                        and earliest_finish[prerequisite_id] == earliest_start[current]), None)
+    critical_path.reverse()
+    return Schedule(order, earliest_start, earliest_finish, slack, critical_path, finish)
+
+
+# The part of a project's graph below `source_ids`, read with one recursive query instead of loading the whole
+# project: the dates {id: (start, due)} of every task downstream of the sources, their prerequisites
+# {id: [task ids]}, and the due dates {id: due} of those prerequisites
+def load_downstream(source_ids):
+    links, tasks = TaskDependency._meta.db_table, Task._meta.db_table
+    if connection.vendor == 'sqlite':
+        def ordinal(column):
+            return DayOrdinal.template % {'expressions': column}
+    else:
+        def ordinal(column):
+            return column
+    placeholders = ', '.join(['%s'] * len(source_ids))
+    sql = (
+        f'WITH RECURSIVE downstream(id) AS ('
+        f'SELECT task_id FROM {links} WHERE depends_on_id IN ({placeholders}) '
+        f'UNION SELECT l.task_id FROM {links} l JOIN downstream d ON l.depends_on_id = d.id) '
+        f'SELECT t.id, {ordinal("t.start_date")}, {ordinal("t.due_date")}, l.depends_on_id, {ordinal("p.due_date")} '
+        f'FROM downstream d JOIN {tasks} t ON t.id = d.id JOIN {links} l ON l.task_id = t.id '
+        f'JOIN {tasks} p ON p.id = l.depends_on_id'
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, list(source_ids))
+        rows = cursor.fetchall()
+    dates, prerequisites, prerequisite_dues = {}, defaultdict(list), {}
+    for pk, start, due, prerequisite_id, prerequisite_due in rows:
+        if connection.vendor != 'sqlite':
+            start, due, prerequisite_due = start.toordinal(), due.toordinal(), prerequisite_due.toordinal()
+        dates[pk] = (start, due)
+        prerequisites[pk].append(prerequisite_id)
+        prerequisite_dues[prerequisite_id] = prerequisite_due
+    return dates, prerequisites, prerequisite_dues
+
+
+# The new (start, due) day ordinals {id: (start, due)} of the tasks downstream of `source_ids` that would start
+# before one of their prerequisites is due, keeping their durations. `due_dates` overrides the stored due dates
+# of sources not saved yet. Raises ValidationError when a moved task would end after `end_date`.
+def plan_shift(source_ids, end_date, due_dates=None):
+    dates, prerequisites, prerequisite_dues = load_downstream(source_ids)
+    if not dates:
+        return {}
+    for pk, due_date in (due_dates or {}).items():
+        if pk in prerequisite_dues:
+            prerequisite_dues[pk] = due_date.toordinal()
+    # Order the downstream tasks among themselves; prerequisites outside them keep their dates
+    inside, successors = {}, defaultdict(list)
+    for pk, prerequisite_ids in prerequisites.items():
+        inside[pk] = [prerequisite_id for prerequisite_id in prerequisite_ids if prerequisite_id in dates]
+        for prerequisite_id in inside[pk]:
+            successors[prerequisite_id].append(pk)
+
+    end = end_date.toordinal()
+    moved = {}
+    for pk in topological_order(dates, inside, successors):
+        start, due = dates[pk]
+        ready = max(dates[prerequisite_id][1] if prerequisite_id in dates else prerequisite_dues[prerequisite_id]
+                    for prerequisite_id in prerequisites[pk])
+        if ready <= start:
+            continue
+        start, due = ready, due + ready - start
+        if due > end:
+            raise ValidationError(
+                _('Moving this task would push a dependent task past the project end date (%(date)s).'),
+                params={'date': end_date})
+        dates[pk] = moved[pk] = (start, due)
+    return moved
+
+
+# Write a plan_shift result for the tasks of one project, saving only the rows that moved, and return their ids.
+# The rows go out in one executemany: bulk_update builds a CASE per field and row, whose compilation dominated
+# once thousands of tasks moved. Dates take no part in the counters, the status log or the search index, so only
+# the dashboards and live streams of the moved tasks' assignees and the project owner need refreshing.
+def save_shift(project_id, moved, batch_size=500):
+    if not moved:
+        return []
+    ops = connection.ops
+    now = ops.adapt_datetimefield_value(timezone.now())
+    rows = [(ops.adapt_datefield_value(date.fromordinal(start)), ops.adapt_datefield_value(date.fromordinal(due)),
+             now, pk) for pk, (start, due) in moved.items()]
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.executemany(
+            f'UPDATE {Task._meta.db_table} SET start_date = %s, due_date = %s, updated_at = %s WHERE id = %s', rows)
+        pks = list(moved)
+        user_ids = set(Project.objects.filter(pk=project_id).values_list('created_by_id', flat=True))
+        for start in range(0, len(pks), batch_size):
+            user_ids.update(Task.objects.filter(pk__in=pks[start:start + batch_size])
+                            .order_by().values_list('assigned_to_id', flat=True).distinct())
+        invalidate_dashboards(user_ids)
+        publish_refresh(user_ids, {project_id})
+    return pks
+
+
+# Push back the tasks downstream of the ones whose due dates a set-based update changed, one plan per project;
+# Task.save does the same for a single task. Returns the ids of the moved tasks.
+def shift_dependents_of(task_ids, batch_size=500):
+    shifted = []
+    for start in range(0, len(task_ids), batch_size):
+        by_project = defaultdict(list)
+        for pk, project_id, end_date in (Task.objects.filter(pk__in=task_ids[start:start + batch_size])
+                                         .values_list('pk', 'project_id', 'project__end_date')):
+            by_project[(project_id, end_date)].append(pk)
+        for (project_id, end_date), pks in by_project.items():
+            shifted.extend(save_shift(project_id, plan_shift(pks, end_date)))
+    return shifted
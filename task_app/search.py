@@ -0,0 +1,126 @@
+import re
+
+from django.db import connection, transaction
+from django.db.models import F, FloatField, Lookup, Q, Value
+
+# SQLite FTS5 index over task title/description, project name and assignee username, keyed by task id (rowid).
+# Triggers keep it in sync for every write path, including bulk ORM calls and raw SQL.
+FTS_TABLE = 'task_app_task_fts'
+
+CREATE_TABLE_SQL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "title, description, project_name, assignee, tokenize = 'unicode61 remove_diacritics 2')"
+)
+
+TRIGGER_SQL = [
+    "CREATE TRIGGER IF NOT EXISTS task_app_task_fts_insert AFTER INSERT ON task_app_task BEGIN "
+    f"INSERT INTO {FTS_TABLE} (rowid, title, description, project_name, assignee) VALUES ("
+    "new.id, new.title, new.description, (SELECT name FROM task_app_project WHERE id = new.project_id), "
+    "(SELECT username FROM auth_user WHERE id = new.assigned_to_id)); END",
+    # Django saves every column, so only reindex when an indexed value actually changed
+    "CREATE TRIGGER IF NOT EXISTS task_app_task_fts_update "
+    "AFTER UPDATE OF title, description, project_id, assigned_to_id ON task_app_task "
+    "WHEN old.title IS NOT new.title OR old.description IS NOT new.description "
+    "OR old.project_id IS NOT new.project_id OR old.assigned_to_id IS NOT new.assigned_to_id BEGIN "
+    f"UPDATE {FTS_TABLE} SET title = new.title, description = new.description, "
+    "project_name = (SELECT name FROM task_app_project WHERE id = new.project_id), "
+    "assignee = (SELECT username FROM auth_user WHERE id = new.assigned_to_id) WHERE rowid = new.id; END",
+    "CREATE TRIGGER IF NOT EXISTS task_app_task_fts_delete AFTER DELETE ON task_app_task BEGIN "
+    f"DELETE FROM {FTS_TABLE} WHERE rowid = old.id; END",
+    "CREATE TRIGGER IF NOT EXISTS task_app_project_fts_rename AFTER UPDATE OF name ON task_app_project "
+    "WHEN old.name IS NOT new.name BEGIN "
+    f"UPDATE {FTS_TABLE} SET project_name = new.name "
+    "WHERE rowid IN (SELECT id FROM task_app_task WHERE project_id = new.id); END",
+    "CREATE TRIGGER IF NOT EXISTS task_app_user_fts_rename AFTER UPDATE OF username ON auth_user "
+    "WHEN old.username IS NOT new.username BEGIN "
+    f"UPDATE {FTS_TABLE} SET assignee = new.username "
+    "WHERE rowid IN (SELECT id FROM task_app_task WHERE assigned_to_id = new.id); END",
+]
+
+DROP_TRIGGER_SQL = [
+    "DROP TRIGGER IF EXISTS task_app_user_fts_rename",
+    "DROP TRIGGER IF EXISTS task_app_project_fts_rename",
+    "DROP TRIGGER IF EXISTS task_app_task_fts_delete",
+    "DROP TRIGGER IF EXISTS task_app_task_fts_update",
+    "DROP TRIGGER IF EXISTS task_app_task_fts_insert",
+]
+
+DROP_SQL = [
+    *DROP_TRIGGER_SQL,
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+
+def fts_enabled():
+    return connection.vendor == 'sqlite'
+
+
+# The index's hidden rank column (the bm25 score, lower is more relevant), filtered with `__match`
+class SearchRankField(FloatField):
+    pass
+
+
+# FTS5 MATCH against the whole index row, written as the hidden column named after the table so that it works
+# under the alias Django gives the joined table (e.g. in the subquery of an UPDATE)
+@SearchRankField.register_lookup
+class Match(Lookup):
+    lookup_name = 'match'
+    prepare_rhs = False
+
+    def as_sql(self, compiler, connection):
+        rhs, params = self.process_rhs(compiler, connection)
+        column = f'{compiler.quote_name_unless_alias(self.lhs.alias)}.{connection.ops.quote_name(FTS_TABLE)}'
+        return f'{column} MATCH {rhs}', params
+
+
+# (Re)create the sync triggers; SQLite drops them whenever a migration rebuilds the task or project table
+def install_triggers(using_connection=connection):
+    with using_connection.cursor() as cursor:
+        if FTS_TABLE not in using_connection.introspection.table_names(cursor):
+            return
+        for statement in TRIGGER_SQL:
+            cursor.execute(statement)
+
+
+# Turn free text into an FTS5 query that ANDs every word as a prefix, with FTS5 syntax neutralised
+def build_match_query(text):
+    return ' '.join(f'"{term}"*' for term in re.findall(r'\w+', text or ''))
+
+
+# Filter a task queryset to rows matching the text and annotate search_rank (lower is more relevant)
+def search_tasks(queryset, text):
+    match = build_match_query(text)
+    if not match:
+        return queryset.none()
+    if not fts_enabled():
+        # Other backends fall back to the LIKE scan the admin used to run
+        return queryset.filter(
+            Q(title__icontains=text) | Q(description__icontains=text) | Q(project__name__icontains=text)
+            | Q(assigned_to__username__icontains=text)
+        ).annotate(search_rank=Value(0.0, output_field=FloatField()))
+    # Join the index once (TaskSearchIndex) rather than ranking each row with its own MATCH
+    return queryset.filter(search_index__rank__match=match).annotate(search_rank=F('search_index__rank'))
+
+
+# Repopulate the index from the task and project tables in one transaction, so searches keep reading the old
+# index until the new one commits, and task writes wait for the rebuild instead of racing it.
+# `batch_size` bounds each INSERT ... SELECT, not the transaction.
+def rebuild_index(batch_size=5000):
+    indexed = 0
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        cursor.execute('SELECT MIN(id), MAX(id) FROM task_app_task')
+        low, high = cursor.fetchone()
+        if low is None:
+            return 0
+        for start in range(low, high + 1, batch_size):
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, title, description, project_name, assignee) '
+                'SELECT t.id, t.title, t.description, p.name, u.username FROM task_app_task t '
+                'JOIN task_app_project p ON p.id = t.project_id JOIN auth_user u ON u.id = t.assigned_to_id '
+                'WHERE t.id >= %s AND t.id < %s',
+                (start, start + batch_size))
+            indexed += cursor.rowcount
+        # Merge the index b-trees written batch by batch into one
+        cursor.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('optimize')")
+    return indexed
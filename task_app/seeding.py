@@ -0,0 +1,72 @@
+import random
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Project, Task
+
+STATUS_WEIGHTS = {'pending': 45, 'in_progress': 20, 'completed': 35}
+PRIORITY_WEIGHTS = {'low': 30, 'medium': 50, 'high': 20}
+VERBS = ['Review', 'Draft', 'Fix', 'Plan', 'Test', 'Update', 'Migrate', 'Document', 'Design', 'Deploy']
+NOUNS = ['login flow', 'invoice export', 'release notes', 'search page', 'onboarding email', 'API client',
+         'backup job', 'status report', 'pricing table', 'audit log']
+
+
+# Usernames <prefix><n> for n < count, creating the ones that do not exist yet; returns their ids in order
+def _seed_users(count, prefix, password):
+    usernames = [f'{prefix}{number}' for number in range(count)]
+    existing = set(User.objects.filter(username__in=usernames).values_list('username', flat=True))
+    password = make_password(password)  # Hashed once; hashing per user would dominate the run
+    User.objects.bulk_create([
+        User(username=username, email=f'{username}@example.com', password=password)
+        for username in usernames if username not in existing
+    ], batch_size=1000)
+    ids = dict(User.objects.filter(username__in=usernames).values_list('username', 'id'))
+    return [ids[username] for username in usernames]
+
+
+# Fill the database with a reproducible synthetic workload: users, projects spread over the past and coming
+# year, and tasks with weighted statuses and priorities, due dates inside their project (so some open tasks
+# are overdue) and a few busy assignees owning most of the work. Dates are laid out around `today`, the local
+# date by default; pass a fixed one for the same data on any day. Returns {'users', 'projects', 'tasks'}.
+def seed_load(users, projects, tasks_per_project, seed=0, prefix='loaduser', password='password',
+              batch_size=2000, today=None):
+    rng = random.Random(seed)
+    today = today or timezone.localdate()
+    user_ids = _seed_users(users, prefix, password)
+    # Zipf-like weights: the first users are assigned far more tasks than the last
+    user_weights = [1 / rank for rank in range(1, len(user_ids) + 1)]
+    statuses, status_weights = zip(*STATUS_WEIGHTS.items())
+    priorities, priority_weights = zip(*PRIORITY_WEIGHTS.items())
+    projects_per_batch = max(batch_size // max(tasks_per_project, 1), 1)  # About batch_size tasks per transaction
+    created_tasks = 0
+
+    for start in range(0, projects, projects_per_batch):
+        with transaction.atomic():
+            batch = []
+            for number in range(start, min(projects, start + projects_per_batch)):
+                start_date = today - timedelta(days=rng.randint(0, 365))
+                batch.append(Project(
+                    name=f"Project {number}", description=f"Synthetic project {number}",
+                    start_date=start_date, end_date=start_date + timedelta(days=rng.randint(30, 365)),
+                    created_by_id=rng.choice(user_ids)))
+            batch = Project.objects.bulk_create(batch)
+            tasks = []
+            for project in batch:
+                length = (project.end_date - project.start_date).days
+                for number in range(tasks_per_project):
+                    task_start = project.start_date + timedelta(days=rng.randint(0, length))
+                    tasks.append(Task(
+                        title=f"{rng.choice(VERBS)} {rng.choice(NOUNS)} {number}",
+                        description=f"Synthetic task {number} of {project.name}",
+                        assigned_to_id=rng.choices(user_ids, weights=user_weights)[0],
+                        status=rng.choices(statuses, weights=status_weights)[0],
+                        priority=rng.choices(priorities, weights=priority_weights)[0],
+                        start_date=task_start,
+                        due_date=min(task_start + timedelta(days=rng.randint(1, 30)), project.end_date),
+                        project=project))
+            created_tasks += len(Task.objects.bulk_create(tasks, batch_size=batch_size))
+    return {'users': len(user_ids), 'projects': projects, 'tasks': created_tasks}
@@ -0,0 +1,104 @@
+from django.contrib.auth.models import User
+from django.contrib.auth.signals import user_logged_in
+from django.db import connections
+from django.db.models.signals import post_delete, post_migrate, post_save, pre_delete
+from django.dispatch import receiver
+
+from .caching import invalidate_choices, invalidate_dashboards, invalidate_project_access
+from .live import publish_task
+from .models import Project, ProjectMembership, Task, TaskStatusEvent, project_access
+from .search import install_triggers
+
+
+# Status events have no database constraint, so drop a deleted project's log here
+@receiver(post_delete, sender=Project)
+def delete_project_status_events(sender, instance, **kwargs):
+    TaskStatusEvent.objects.filter(project_id=instance.pk).delete()
+
+
+# A project change shows up on its owner's dashboard
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+def invalidate_project_dashboard(sender, instance, **kwargs):
+    invalidate_dashboards([instance.created_by_id])
+
+
+# New, deleted and re-owned projects change their owners' cached ProjectAccess
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+def invalidate_owner_project_access(sender, instance, **kwargs):
+    invalidate_project_access([instance.created_by_id, getattr(instance, '_loaded_created_by_id', None)])
+    instance._loaded_created_by_id = instance.created_by_id
+
+
+# Adding or removing a member changes that user's cached ProjectAccess; deleting a project removes its
+# memberships one by one through the cascade, so its members are covered here too
+@receiver(post_save, sender=ProjectMembership)
+@receiver(post_delete, sender=ProjectMembership)
+def invalidate_member_project_access(sender, instance, **kwargs):
+    invalidate_project_access([instance.user_id, getattr(instance, '_loaded_user_id', None)])
+    instance._loaded_user_id = instance.user_id
+
+
+# Project names and memberships make up the cached project choices of the task form
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+@receiver(post_save, sender=ProjectMembership)
+@receiver(post_delete, sender=ProjectMembership)
+def invalidate_project_choices(sender, **kwargs):
+    invalidate_choices('projects')
+
+
+# New, renamed, deactivated and deleted users change the cached user autocomplete pages. Logging in only
+# saves last_login, which they do not show.
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_choices(sender, update_fields=None, **kwargs):
+    if update_fields is None or set(update_fields) - {'last_login'}:
+        invalidate_choices('users')
+
+
+# Deleting a user cascades to their projects and tasks; send those through the bulk delete paths first, so
+# counters, dashboards and live streams follow without per-task signals
+@receiver(pre_delete, sender=User)
+def delete_user_work(sender, instance, **kwargs):
+    Project.objects.filter(created_by=instance).delete()
+    Task.objects.filter(assigned_to=instance).delete()
+
+
+# Load a user's ProjectAccess as they log in, so their first pages already find it in the cache
+@receiver(user_logged_in)
+def warm_project_access(sender, request, user, **kwargs):
+    if not user.is_staff:
+        project_access(user)
+
+
+# Push task changes to the open live streams (task_app.live). Registered before invalidate_task_dashboards,
+# which moves _loaded_assigned_to_id on to the new assignee.
+@receiver(post_save, sender=Task)
+def publish_task_save(sender, instance, created, **kwargs):
+    previous = None
+    if not created:
+        previous = (getattr(instance, '_loaded_assigned_to_id', instance.assigned_to_id),
+                    getattr(instance, '_counted_state', (instance.project_id,))[0])
+    publish_task('created' if created else 'updated', instance, previous)
+
+
+# A task change shows up on its assignee's overdue list and its project owner's completion bars.
+# Task.save() updates _counted_state only after post_save, so it still holds the previous project here.
+# Deletes are handled by Task.delete and TaskQuerySet.delete, so that Django can delete tasks in batches.
+@receiver(post_save, sender=Task)
+def invalidate_task_dashboards(sender, instance, **kwargs):
+    user_ids = {instance.assigned_to_id, getattr(instance, '_loaded_assigned_to_id', None)}
+    project_ids = {instance.project_id, getattr(instance, '_counted_state', (None,))[0]}
+    user_ids.update(Project.objects.filter(pk__in=project_ids - {None})
+                    .values_list('created_by_id', flat=True))
+    invalidate_dashboards(user_ids)
+    instance._loaded_assigned_to_id = instance.assigned_to_id
+
+
+# Restore the search index triggers after migrations that rebuilt the task or project table
+@receiver(post_migrate)
+def restore_search_triggers(sender, using, **kwargs):
+    if sender.name == 'task_app' and connections[using].vendor == 'sqlite':
+        install_triggers(connections[using])
@@ -1,10 +1,35 @@
-from django.test import TestCase
-from django.urls import reverse
+from django.test import TestCase, RequestFactory, override_settings
+from django.urls import include, path, reverse
 from django.contrib.auth.models import User
-from task_app.models import Project, Task
+from task_app.models import (ArchivedProject, ArchivedTask, Notification, Project, ProjectMembership,
+                             ProjectStatusSnapshot, Task, TaskDependency, TaskRecurrence, TaskStatusEvent,
+                             validate_task_dates)
+from task_app.views import AsyncProjectListView, AsyncTaskListView, ProjectListView, TaskListView, async_dashboard
 from django.core.exceptions import ValidationError
-from datetime import date
+from datetime import date, datetime, timedelta
 from django.utils import timezone
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.core.cache import cache
+from django.core import mail
+from task_app.caching import dashboard_cache_stats, dashboard_version
+from task_app.pagination import EstimatedCountPaginator
+from task_app.burndown import burndown_series, roll_up_status_events
+from task_app.notifications import notify_due_tasks
+from task_app.profiling import profiled, reset_profiling_stats
+from task_app.scheduling import compute_schedule
+from task_app.live import Subscriber, hub
+from task_app.recurrence import generate_occurrences
+from task_app.search import rebuild_index
+from task_app.archive import archive_projects
+from django.core.management.base import CommandError
+from asgiref.sync import async_to_sync
+from io import StringIO
+import os
+import csv
+import re
+import tempfile
 
 
 class ProjectTestCase(TestCase):
@@ -211,3 +236,1910 @@ class DashboardViewTestCase(TestCase):
         self.task1.save()
         response = self.client.get(reverse('dashboard'))
         self.assertContains(response, "Task 1")  # Overdue task should show up
+
+
+class ProjectCompletionRateTestCase(TestCase):
+    def setUp(self):
+        # Create a user with a few projects, each holding a mix of task statuses
+        self.user = User.objects.create_user(
+            username='testuser', password='password')
+        for index in range(3):
+            project = Project.objects.create(
+                name=f"Project {index}",
+                description="This is a test project",
+                start_date=date(2024, 1, 1),
+                end_date=date(2024, 12, 31),
+                created_by=self.user
+            )
+            for status in ['pending', 'completed', 'completed', 'in_progress']:
+                Task.objects.create(
+                    title=f"Task {status}",
+                    description="This is a test task",
+                    assigned_to=self.user,
+                    status=status,
+                    priority="medium",
+                    start_date=date(2024, 1, 1),
+                    due_date=date(2024, 3, 1),
+                    project=project
+                )
+
+    def test_completion_rate_reads_counters(self):
+        """Test that the completion rate is read from the stored counters."""
+        project = Project.objects.get(name="Project 0")
+        with self.assertNumQueries(0):
+            self.assertEqual(project.get_completion_rate(), 50)
+
+    def test_project_list_query_count_is_constant(self):
+        """Test that the project list does not run completion queries per project."""
+        self.client.login(username='testuser', password='password')
+        # Session, user and the project queryset
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('project-list'))
+        self.assertContains(response, "50% Complete", count=3)
+
+
+class ProjectTaskCounterTestCase(TestCase):
+    def setUp(self):
+        # Create a user and two projects to move tasks between
+        self.user = User.objects.create_user(
+            username='testuser', password='password')
+        self.project = Project.objects.create(
+            name="Test Project",
+            description="This is a test project",
+            start_date=date(2024, 1, 1),
+            end_date=date(2024, 12, 31),
+            created_by=self.user
+        )
+        self.other_project = Project.objects.create(
+            name="Other Project",
+            description="This is another test project",
+            start_date=date(2024, 1, 1),
+            end_date=date(2024, 12, 31),
+            created_by=self.user
+        )
+
+    def make_task(self, status="pending", project=None):
+        return Task(
+            title="Task",
+            description="This is a test task",
+            assigned_to=self.user,
+            status=status,
+            priority="medium",
+            start_date=date(2024, 1, 1),
+            due_date=date(2024, 3, 1),
+            project=project or self.project
+        )
+
+    def assertCounters(self, project, total, pending, in_progress, completed):
+        project.refresh_from_db()
+        self.assertEqual(
+            (project.task_count, project.pending_count, project.in_progress_count, project.completed_count),
+            (total, pending, in_progress, completed))
+
+    def test_counters_follow_save_and_delete(self):
+        """Test that creating, updating, moving and deleting a task adjusts the counters."""
+        task = self.make_task()
+        task.save()
+        self.assertCounters(self.project, 1, 1, 0, 0)
+        task = Task.objects.get(pk=task.pk)
+        task.status = "completed"
+        task.save()
+        self.assertCounters(self.project, 1, 0, 0, 1)
+        task.project = self.other_project
+        task.save()
+        self.assertCounters(self.project, 0, 0, 0, 0)
+        self.assertCounters(self.other_project, 1, 0, 0, 1)
+        task.delete()
+        self.assertCounters(self.other_project, 0, 0, 0, 0)
+
+    def test_counters_follow_bulk_paths(self):
+        """Test that bulk_create, queryset update, bulk_update and queryset delete adjust the counters."""
+        Task.objects.bulk_create([self.make_task("pending") for _ in range(4)] + [self.make_task("in_progress")])
+        self.assertCounters(self.project, 5, 4, 1, 0)
+        Task.objects.filter(status="pending").update(status="completed")
+        self.assertCounters(self.project, 5, 0, 1, 4)
+        tasks = list(Task.objects.filter(status="completed")[:2])
+        for task in tasks:
+            task.project = self.other_project
+        Task.objects.bulk_update(tasks, ['project'])
+        self.assertCounters(self.project, 3, 0, 1, 2)
+        self.assertCounters(self.other_project, 2, 0, 0, 2)
+        Task.objects.filter(project=self.project).delete()
+        self.assertCounters(self.project, 0, 0, 0, 0)
+
+    def test_deletes_do_not_scale_with_tasks(self):
+        """Test that queryset, project and user deletes take the same number of queries for 5 or 50 tasks."""
+        counts = []
+        for size in (5, 50):
+            owner = User.objects.create_user(username=f'owner{size}', password='password')
+            project = Project.objects.create(name="Doomed", description="d", start_date=date(2024, 1, 1),
+                                             end_date=date(2024, 12, 31), created_by=owner)
+            Task.objects.bulk_create([self.make_task(project=project) for _ in range(size)]
+                                     + [self.make_task("completed") for _ in range(size)])
+            with CaptureQueriesContext(connection) as task_queries:
+                Task.objects.filter(project=self.project).delete()
+            with CaptureQueriesContext(connection) as project_queries:
+                Project.objects.get(pk=project.pk).delete()
+            counts.append((len(task_queries), len(project_queries)))
+        self.assertEqual(counts[0], counts[1])
+        self.assertCounters(self.project, 0, 0, 0, 0)
+        self.assertFalse(TaskStatusEvent.objects.filter(project_id=project.pk).exists())
+
+        # Deleting a user takes their tasks in other people's projects along, counters included
+        assignee = User.objects.create_user(username='assignee', password='password')
+        task = self.make_task("completed", self.other_project)
+        task.assigned_to = assignee
+        task.save()
+        assignee.delete()
+        self.assertCounters(self.other_project, 0, 0, 0, 0)
+
+    def test_project_save_keeps_counters(self):
+        """Test that saving a stale project instance does not overwrite its counters."""
+        stale = Project.objects.get(pk=self.project.pk)
+        self.make_task().save()
+        stale.name = "Renamed Project"
+        stale.save()
+        self.assertCounters(self.project, 1, 1, 0, 0)
+
+    def test_recount_command_repairs_drift(self):
+        """Test that the recount command repairs drifted counters."""
+        self.make_task("completed").save()
+        Project.objects.filter(pk=self.project.pk).update(task_count=7, completed_count=0)
+        call_command('recount_project_tasks', batch_size=1, stdout=StringIO())
+        self.assertCounters(self.project, 1, 0, 0, 1)
+
+
+class QueryPlanTestCase(TestCase):
+    def setUp(self):
+        # Create a regular user, a staff user and a request factory to drive the views' querysets
+        self.user = User.objects.create_user(
+            username='testuser', password='password')
+        self.staff = User.objects.create_user(
+            username='staffuser', password='password', is_staff=True)
+        self.factory = RequestFactory()
+
+    def view_queryset(self, view_class, user, query=''):
+        request = self.factory.get('/' + query)
+        request.user = user
+        view = view_class()
+        view.setup(request)
+        return view.get_queryset()
+
+    def assertUsesIndex(self, queryset):
+        plan = queryset.explain()
+        self.assertIn('USING', plan, plan)
+        self.assertNotRegex(plan, r'SCAN task_app_\w+$', plan)
+
+    def test_task_list_queries_use_indexes(self):
+        """Test that every filter combination of the task list is served from an index."""
+        for user, query in [
+            (self.user, ''),
+            (self.user, '?status=pending'),
+            (self.user, '?priority=high'),
+            (self.user, '?status=pending&priority=high'),
+            (self.staff, '?status=pending'),
+            (self.staff, '?priority=high'),
+            (self.staff, '?status=pending&priority=high'),
+        ]:
+            with self.subTest(user=user.username, query=query):
+                self.assertUsesIndex(self.view_queryset(TaskListView, user, query))
+
+    def test_project_list_query_uses_index(self):
+        """Test that the owner's project list is served from an index."""
+        self.assertUsesIndex(self.view_queryset(ProjectListView, self.user))
+
+    def test_overdue_query_uses_index(self):
+        """Test that the dashboard overdue query is served from an index."""
+        self.assertUsesIndex(Task.objects.filter(
+            assigned_to=self.user,
+            status__in=['pending', 'in_progress'],
+            due_date__lt=timezone.now().date()
+        ))
+        self.assertUsesIndex(Task.objects.filter(
+            status__in=['pending', 'in_progress'],
+            due_date__lt=timezone.now().date()
+        ))
+
+
+class QueryCountScalingMixin:
+    # Fail a view test when the number of queries grows with the number of rendered rows
+    def assertQueryCountConstant(self, url, add_rows, rounds=3):
+        counts = []
+        for _ in range(rounds):
+            add_rows()
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            counts.append(len(queries))
+        self.assertEqual(
+            len(set(counts)), 1,
+            f"Query count for {url} grew with the number of rows: {counts}")
+
+
+class ViewQueryScalingTestCase(QueryCountScalingMixin, TestCase):
+    def setUp(self):
+        # Create a user and a project; each round adds tasks owned by a fresh assignee
+        self.user = User.objects.create_user(
+            username='testuser', password='password', is_staff=True)
+        self.project = Project.objects.create(
+            name="Test Project",
+            description="This is a test project",
+            start_date=date(2024, 1, 1),
+            end_date=date(2024, 12, 31),
+            created_by=self.user
+        )
+        self.client.login(username='testuser', password='password')
+
+    def add_tasks(self, count=3):
+        assignee = User.objects.create_user(username=f'assignee{User.objects.count()}')
+        for assigned_to in (self.user, assignee):
+            project = Project.objects.create(
+                name="Extra Project",
+                description="This is another test project",
+                start_date=date(2024, 1, 1),
+                end_date=date(2024, 12, 31),
+                created_by=self.user
+            )
+            Task.objects.bulk_create([
+                Task(
+                    title=f"Task {index}",
+                    description="This is a test task",
+                    assigned_to=assigned_to,
+                    status="pending",
+                    priority="medium",
+                    start_date=date(2024, 1, 1),
+                    due_date=date(2024, 2, 1),
+                    project=target
+                )
+                for index in range(count)
+                for target in (self.project, project)
+            ])
+
+    def test_task_list_query_count(self):
+        """Test that the task list does not query per task row."""
+        self.assertQueryCountConstant(reverse('task-list'), self.add_tasks)
+
+    def test_project_list_query_count(self):
+        """Test that the project list does not query per project."""
+        self.assertQueryCountConstant(reverse('project-list'), self.add_tasks)
+
+    def test_project_detail_query_count(self):
+        """Test that the project detail page does not query per task row."""
+        self.assertQueryCountConstant(
+            reverse('project-detail', kwargs={'pk': self.project.pk}), self.add_tasks)
+
+    def test_dashboard_query_count(self):
+        """Test that the dashboard does not query per project or overdue task."""
+        self.assertQueryCountConstant(reverse('dashboard'), self.add_tasks)
+
+
+class KeysetPaginationTestCase(TestCase):
+    def setUp(self):
+        # Create a user with more tasks than fit on one page, several sharing each due date
+        self.user = User.objects.create_user(
+            username='testuser', password='password')
+        self.project = Project.objects.create(
+            name="Test Project",
+            description="This is a test project",
+            start_date=date(2024, 1, 1),
+            end_date=date(2024, 12, 31),
+            created_by=self.user
+        )
+        Task.objects.bulk_create([
+            Task(
+                title=f"Task {index}",
+                description="This is a test task",
+                assigned_to=self.user,
+                status="pending" if index % 3 else "completed",
+                priority="medium",
+                start_date=date(2024, 1, 1),
+                due_date=date(2024, 2, 1 + index % 7),
+                project=self.project
+            )
+            for index in range(120)
+        ])
+        self.client.login(username='testuser', password='password')
+
+    def collect_pages(self, url):
+        pages = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            pages.append([task.pk for task in response.context['tasks']])
+            next_query = response.context['next_page_query']
+            url = reverse('task-list') + '?' + next_query if next_query else None
+        return pages
+
+    def test_cursor_walks_every_task_once(self):
+        """Test that following the next-page cursor visits every task exactly once, in order."""
+        pages = self.collect_pages(reverse('task-list'))
+        self.assertEqual([len(page) for page in pages], [50, 50, 20])
+        seen = [pk for page in pages for pk in page]
+        expected = list(Task.objects.order_by('due_date', 'id').values_list('pk', flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_cursor_keeps_filters(self):
+        """Test that the status filter still applies on pages after the first."""
+        pages = self.collect_pages(reverse('task-list') + '?status=pending')
+        seen = [pk for page in pages for pk in page]
+        self.assertEqual(len(seen), 80)
+        self.assertEqual(Task.objects.filter(pk__in=seen, status='pending').count(), 80)
+
+    def test_invalid_cursor_returns_404(self):
+        """Test that a malformed cursor is rejected."""
+        response = self.client.get(reverse('task-list') + '?cursor=not-a-cursor')
+        self.assertEqual(response.status_code, 404)
+
+
+class DashboardCacheTestCase(TestCase):
+    def setUp(self):
+        # Create two users with a project and an overdue task each, starting from an empty cache
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='testuser', password='password')
+        self.other = User.objects.create_user(
+            username='otheruser', password='password')
+        self.project = Project.objects.create(
+            name="Test Project",
+            description="This is a test project",
+            start_date=date(2024, 1, 1),
+            end_date=date(2024, 12, 31),
+            created_by=self.user
+        )
+        self.other_project = Project.objects.create(
+            name="Other Project",
+            description="This is another test project",
+            start_date=date(2024, 1, 1),
+            end_date=date(2024, 12, 31),
+            created_by=self.other
+        )
+        self.task = Task.objects.create(
+            title="Late Task",
+            description="This is a test task",
+            assigned_to=self.user,
+            status="pending",
+            priority="medium",
+            start_date=date(2024, 1, 1),
+            due_date=date(2024, 2, 1),
+            project=self.project
+        )
+        self.other_task = Task.objects.create(
+            title="Other Task",
+            description="This is another test task",
+            assigned_to=self.other,
+            status="pending",
+            priority="medium",
+            start_date=date(2024, 1, 1),
+            due_date=date(2024, 2, 1),
+            project=self.other_project
+        )
+        self.client.login(username='testuser', password='password')
+
+    def test_second_request_is_served_from_cache(self):
+        """Test that a repeated dashboard request runs no panel queries and counts a hit."""
+        self.client.get(reverse('dashboard'))
+        before = dashboard_cache_stats()
+        # Only the session and user lookups remain
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('dashboard'))
+        self.assertContains(response, "Late Task")
+        after = dashboard_cache_stats()
+        self.assertEqual(after['hits'] - before['hits'], 2)
+        self.assertEqual(after['misses'], before['misses'])
+
+    def test_task_save_invalidates_assignee_dashboard(self):
+        """Test that completing a task removes it from the cached overdue panel."""
+        self.client.get(reverse('dashboard'))
+        task = Task.objects.get(pk=self.task.pk)
+        task.status = "completed"
+        task.save()
+        response = self.client.get(reverse('dashboard'))
+        self.assertNotContains(response, "Late Task")
+        self.assertContains(response, "100% Complete")
+
+    def test_bulk_update_invalidates_dashboard(self):
+        """Test that a queryset update refreshes the affected dashboards."""
+        self.client.get(reverse('dashboard'))
+        Task.objects.filter(pk=self.task.pk).update(title="Renamed Task")
+        self.assertContains(self.client.get(reverse('dashboard')), "Renamed Task")
+
+    def test_reassignment_invalidates_previous_assignee(self):
+        """Test that reassigning a task drops it from the previous assignee's cached dashboard."""
+        self.client.get(reverse('dashboard'))
+        task = Task.objects.get(pk=self.task.pk)
+        task.assigned_to = self.other
+        task.save()
+        self.assertNotContains(self.client.get(reverse('dashboard')), "Late Task")
+
+    def test_other_users_changes_keep_cache(self):
+        """Test that changes to another user's projects and tasks do not invalidate this dashboard."""
+        self.client.get(reverse('dashboard'))
+        version = dashboard_version(self.user.pk)
+        self.other_task.status = "completed"
+        self.other_task.save()
+        self.other_project.name = "Renamed Other Project"
+        self.other_project.save()
+        self.assertEqual(dashboard_version(self.user.pk), version)
+
+    def test_cache_stats_are_staff_only(self):
+        """Test that the cache stats endpoint is limited to staff users."""
+        response = self.client.get(reverse('dashboard-cache-stats'))
+        self.assertEqual(response.status_code, 302)
+        self.user.is_staff = True
+        self.user.save()
+        response = self.client.get(reverse('dashboard-cache-stats'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('hit_rate', response.json())
+
+
+class ApiTestCase(TestCase):
+    def setUp(self):
+        # Create two users with a project and tasks each
+        self.user = User.objects.create_user(
+            username='testuser', password='password')
+        self.other = User.objects.create_user(
+            username='otheruser', password='password')
+        self.project = Project.objects.create(
+            name="Test Project",
+            description="This is a test project",
+            start_date=date(2024, 1, 1),
+            end_date=date(2024, 12, 31),
+            created_by=self.user
+        )
+        other_project = Project.objects.create(
+            name="Other Project",
+            description="This is another test project",
+            start_date=date(2024, 1, 1),
+            end_date=date(2024, 12, 31),
+            created_by=self.other
+        )
+        for index, (assigned_to, status) in enumerate([
+            (self.user, "pending"), (self.user, "completed"), (self.user, "pending"), (self.other, "pending"),
+        ]):
+            Task.objects.create(
+                title=f"Task {index}",
+                description="This is a test task",
+                assigned_to=assigned_to,
+                status=status,
+                priority="medium",
+                start_date=date(2024, 1, 1),
+                due_date=date(2024, 2, 1 + index),
+                project=self.project
+            )
+        # Neither assigned to testuser nor in one of their projects
+        Task.objects.create(
+            title="Other Task",
+            description="This is a test task",
+            assigned_to=self.other,
+            status="pending",
+            priority="medium",
+            start_date=date(2024, 1, 1),
+            due_date=date(2024, 2, 1),
+            project=other_project
+        )
+        self.client.login(username='testuser', password='password')
+
+    def test_requires_authentication(self):
+        """Test that anonymous API calls get a JSON 401 instead of a redirect."""
+        self.client.logout()
+        response = self.client.get(reverse('api-task-list'))
+        self.assertEqual(response.status_code, 401)
+
+    def test_task_list_visibility_and_filters(self):
+        """Test that the task API applies the task list visibility rule and filters."""
+        response = self.client.get(reverse('api-task-list') + '?status=pending')
+        self.assertEqual([task['title'] for task in response.json()['results']], ["Task 0", "Task 2", "Task 3"])
+
+    def test_sparse_fieldsets(self):
+        """Test that ?fields= limits the serialized fields and rejects unknown ones."""
+        response = self.client.get(reverse('api-task-list') + '?fields=id,title')
+        self.assertEqual(set(response.json()['results'][0]), {'id', 'title'})
+        response = self.client.get(reverse('api-task-list') + '?fields=id,secret')
+        self.assertEqual(response.status_code, 400)
+
+    def test_project_completion_rate(self):
+        """Test that projects expose their completion rate and only to their owner."""
+        response = self.client.get(reverse('api-project-list') + '?fields=name,completion_rate')
+        self.assertEqual(response.json()['results'], [{'name': "Test Project", 'completion_rate': 25.0}])
+
+    def test_cursor_pagination(self):
+        """Test that the next link walks the remaining tasks."""
+        response = self.client.get(reverse('api-task-list') + '?limit=2&fields=title')
+        body = response.json()
+        self.assertEqual([task['title'] for task in body['results']], ["Task 0", "Task 1"])
+        body = self.client.get(body['next']).json()
+        self.assertEqual([task['title'] for task in body['results']], ["Task 2", "Task 3"])
+        self.assertIsNone(body['next'])
+
+    def test_etag_not_modified(self):
+        """Test that an unchanged listing answers If-None-Match with 304 and a change with 200."""
+        url = reverse('api-task-list')
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        Task.objects.filter(title="Task 0").update(status="in_progress")
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_detail_visibility(self):
+        """Test that the detail endpoints hide other users' rows."""
+        task = Task.objects.get(title="Other Task")
+        response = self.client.get(reverse('api-task-detail', kwargs={'pk': task.pk}))
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get(reverse('api-project-detail', kwargs={'pk': self.project.pk}))
+        self.assertEqual(response.json()['name'], "Test Project")
+
+
+class TaskTransferCommandTestCase(TestCase):
+    def setUp(self):
+        # Create a user and a project to import tasks into
+        self.user = User.objects.create_user(
+            username='testuser', password='password')
+        self.project = Project.objects.create(
+            name="Test Project",
+            description="This is a test project",
+            start_date=date(2024, 1, 1),
+            end_date=date(2024, 12, 31),
+            created_by=self.user
+        )
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write(self, name, content):
+        path = os.path.join(self.directory.name, name)
+        with open(path, 'w', newline='') as handle:
+            handle.write(content)
+        return path
+
+    def test_import_csv_validates_rows(self):
+        """Test that the CSV import inserts valid rows and rejects rows TaskForm would reject."""
+        path = self.write('tasks.csv', (
+            "title,description,status,priority,start_date,due_date,project,assigned_to\n"
+            f"Good,Fine,pending,high,2024-01-01,2024-02-01,{self.project.pk},{self.user.pk}\n"
+            f"Late,Too late,pending,high,2024-01-01,2025-02-01,{self.project.pk},{self.user.pk}\n"
+            f"Backwards,Ends first,pending,high,2024-03-01,2024-02-01,{self.project.pk},{self.user.pk}\n"
+            f"Unknown,Bad status,someday,high,2024-01-01,2024-02-01,{self.project.pk},{self.user.pk}\n"
+            f"Orphan,No project,pending,high,2024-01-01,2024-02-01,999,{self.user.pk}\n"
+        ))
+        stdout, stderr = StringIO(), StringIO()
+        call_command('import_tasks', path, batch_size=1, stdout=stdout, stderr=stderr)
+        self.assertEqual(list(Task.objects.values_list('title', flat=True)), ["Good"])
+        self.assertIn("Imported 1 tasks, rejected 4", stdout.getvalue())
+        self.assertIn("Line 3: Task due date cannot exceed the project end date.", stderr.getvalue())
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.task_count, 1)
+
+    def test_export_import_round_trip(self):
+        """Test that an exported JSONL file imports back into the same tasks."""
+        for index in range(5):
+            Task.objects.create(
+                title=f"Task {index}",
+                description="This is a test task",
+                assigned_to=self.user,
+                status="completed" if index % 2 else "pending",
+                priority="low",
+                start_date=date(2024, 1, 1),
+                due_date=date(2024, 2, 1),
+                project=self.project
+            )
+        path = os.path.join(self.directory.name, 'tasks.jsonl')
+        call_command('export_tasks', path, chunk_size=2, stderr=StringIO())
+        with open(path) as handle:
+            self.assertEqual(len(handle.readlines()), 5)
+        Task.objects.all().delete()
+        call_command('import_tasks', path, stdout=StringIO(), stderr=StringIO())
+        self.assertEqual(
+            list(Task.objects.order_by('title').values_list('title', 'status')),
+            [(f"Task {index}", "completed" if index % 2 else "pending") for index in range(5)])
+
+
+class TaskExportViewTestCase(TestCase):
+    def setUp(self):
+        # Create two users with tasks of mixed status
+        self.user = User.objects.create_user(
+            username='testuser', password='password')
+        self.other = User.objects.create_user(
+            username='otheruser', password='password')
+        self.project = Project.objects.create(
+            name="Test Project",
+            description="This is a test project",
+            start_date=date(2024, 1, 1),
+            end_date=date(2024, 12, 31),
+            created_by=self.user
+        )
+        other_project = Project.objects.create(
+            name="Other Project",
+            description="This is another test project",
+            start_date=date(2024, 1, 1),
+            end_date=date(2024, 12, 31),
+            created_by=self.other
+        )
+        for title, assigned_to, status, project in [
+            ("Mine pending", self.user, "pending", self.project),
+            ("Mine completed", self.user, "completed", self.project),
+            ("Theirs pending", self.other, "pending", self.project),  # Visible through testuser's project
+            ("Elsewhere pending", self.other, "pending", other_project),
+        ]:
+            Task.objects.create(
+                title=title,
+                description="This is a test task",
+                assigned_to=assigned_to,
+                status=status,
+                priority="medium",
+                start_date=date(2024, 1, 1),
+                due_date=date(2024, 2, 1),
+                project=project
+            )
+        self.client.login(username='testuser', password='password')
+
+    def test_export_streams_filtered_visible_tasks(self):
+        """Test that the CSV download streams only visible tasks matching the list filters."""
+        response = self.client.get(reverse('task-export') + '?status=pending')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        rows = list(csv.DictReader(StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual([row['title'] for row in rows], ["Mine pending", "Theirs pending"])
+
+    async def test_export_streams_asynchronously_under_asgi(self):
+        """Test that under ASGI the CSV download is an async stream of the same rows."""
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(reverse('task-export'), {'status': 'pending'})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.is_async)
+        content = b''.join([chunk async for chunk in response.streaming_content])
+        rows = list(csv.DictReader(StringIO(content.decode())))
+        self.assertEqual([row['title'] for row in rows], ["Mine pending", "Theirs pending"])
+
+
+class TaskSearchTestCase(TestCase):
+    def setUp(self):
+        # Create a staff user and tasks with distinct words in their titles, descriptions and projects
+        self.user = User.objects.create_user(
+            username='testuser', password='password', is_staff=True, is_superuser=True)
+        self.project = Project.objects.create(
+            name="Apollo Launch",
+            description="This is a test project",
+            start_date=date(2024, 1, 1),
+            end_date=date(2024, 12, 31),
+            created_by=self.user
+        )
+        self.tasks = {}
+        for title, description in [
+            ("Fuel rocket", "Load the rocket with fuel, then check the rocket again"),
+            ("Write report", "Summarise the fuel checks"),
+            ("Book venue", "Find a room for the party"),
+        ]:
+            self.tasks[title] = Task.objects.create(
+                title=title,
+                description=description,
+                assigned_to=self.user,
+                status="pending",
+                priority="medium",
+                start_date=date(2024, 1, 1),
+                due_date=date(2024, 2, 1),
+                project=self.project
+            )
+        self.client.login(username='testuser', password='password')
+
+    def titles(self, text):
+        return list(Task.objects.search(text).order_by('search_rank', 'id').values_list('title', flat=True))
+
+    def test_search_ranks_matches(self):
+        """Test that search matches word prefixes and ranks the strongest match first."""
+        self.assertEqual(self.titles("rock"), ["Fuel rocket"])
+        self.assertEqual(self.titles("fuel"), ["Fuel rocket", "Write report"])
+        self.assertEqual(self.titles("apollo party"), ["Book venue"])
+        self.assertEqual(self.titles('" OR *'), [])
+
+    def test_index_follows_writes(self):
+        """Test that the index follows task edits, bulk inserts, project renames and deletes."""
+        task = self.tasks["Book venue"]
+        task.title = "Book hangar"
+        task.save()
+        self.assertEqual(self.titles("hangar"), ["Book hangar"])
+        Task.objects.bulk_create([Task(
+            title="Paint hangar",
+            description="Grey",
+            assigned_to=self.user,
+            start_date=date(2024, 1, 1),
+            due_date=date(2024, 2, 1),
+            project=self.project
+        )])
+        self.assertEqual(len(self.titles("hangar")), 2)
+        self.project.name = "Gemini Launch"
+        self.project.save()
+        self.assertEqual(len(self.titles("gemini")), 4)
+        self.assertEqual(self.titles("apollo"), [])
+        Task.objects.filter(title="Paint hangar").delete()
+        self.assertEqual(self.titles("hangar"), ["Book hangar"])
+        self.assertEqual(len(self.titles("testuser")), 3)
+        self.user.username = "pilot"
+        self.user.save()
+        self.assertEqual(len(self.titles("pilot")), 3)
+        Task.objects.filter(pk=task.pk).update(assigned_to=User.objects.create_user(username='navigator'))
+        self.assertEqual(self.titles("navigator"), ["Book hangar"])
+
+    def test_rebuild_command(self):
+        """Test that the rebuild command repopulates the index."""
+        stdout = StringIO()
+        call_command('rebuild_task_search', batch_size=2, stdout=stdout)
+        self.assertIn("Indexed 3 tasks", stdout.getvalue())
+        self.assertEqual(self.titles("venue"), ["Book venue"])
+
+    def test_failed_rebuild_keeps_old_index(self):
+        """Test that a rebuild failing after clearing the index rolls back to the old index."""
+        # A zero batch size fails once the index has been cleared, when the id ranges are laid out
+        with self.assertRaises(ValueError):
+            rebuild_index(batch_size=0)
+        self.assertEqual(self.titles("venue"), ["Book venue"])
+
+    def test_task_list_and_admin_search(self):
+        """Test that ?q= searches the task list and the admin changelist."""
+        response = self.client.get(reverse('task-list') + '?q=report')
+        self.assertEqual([task.title for task in response.context['tasks']], ["Write report"])
+        response = self.client.get(reverse('admin:task_app_task_changelist') + '?q=venue')
+        self.assertEqual([task.title for task in response.context['cl'].result_list], ["Book venue"])
+        response = self.client.get(reverse('admin:task_app_task_changelist') + '?q=testuser venue')
+        self.assertEqual([task.title for task in response.context['cl'].result_list], ["Book venue"])
+
+
+class TaskBulkUpdateTestCase(TestCase):
+    def setUp(self):
+        # Create two users with pending tasks in one project
+        self.user = User.objects.create_user(
+            username='testuser', password='password')
+        self.other = User.objects.create_user(
+            username='otheruser', password='password')
+        self.project = Project.objects.create(
+            name="Test Project",
+            description="This is a test project",
+            start_date=date(2024, 1, 1),
+            end_date=date(2024, 12, 31),
+            created_by=self.user
+        )
+        self.tasks = {}
+        for title, assigned_to in [
+            ("Mine one", self.user),
+            ("Mine two", self.user),
+            ("Theirs", self.other),
+        ]:
+            self.tasks[title] = Task.objects.create(
+                title=title,
+                description="This is a test task",
+                assigned_to=assigned_to,
+                status="pending",
+                priority="medium",
+                start_date=date(2024, 1, 1),
+                due_date=date(2024, 2, 1),
+                project=self.project
+            )
+        self.client.login(username='testuser', password='password')
+
+    def test_bulk_update_selected_tasks(self):
+        """Test that selected tasks are updated together, skipping tasks the user cannot edit."""
+        # The project owner may edit every task of the project, so move the other user's task to their own project
+        self.tasks["Theirs"].project = Project.objects.create(
+            name="Other Project", start_date=date(2024, 1, 1), end_date=date(2024, 12, 31), created_by=self.other)
+        self.tasks["Theirs"].save()
+        response = self.client.post(reverse('task-bulk-update'), {
+            'task_ids': [task.pk for task in self.tasks.values()],
+            'status': 'completed',
+            'priority': 'high',
+        })
+        self.assertRedirects(response, reverse('task-list'))
+        self.assertEqual(
+            dict(Task.objects.values_list('title', 'status')),
+            {"Mine one": "completed", "Mine two": "completed", "Theirs": "pending"})
+        self.assertEqual(Task.objects.filter(priority='high').count(), 2)
+        self.project.refresh_from_db()
+        self.assertEqual((self.project.completed_count, self.project.pending_count), (2, 0))
+
+    def test_bulk_update_all_matching_filters(self):
+        """Test that select_all applies the change to every visible task matching the list filters."""
+        self.tasks["Mine two"].priority = 'low'
+        self.tasks["Mine two"].save()
+        response = self.client.post(reverse('task-bulk-update'), {
+            'select_all': 'on',
+            'filter_query': 'priority=medium&q=mine',
+            'assigned_to': 'otheruser',
+        })
+        self.assertRedirects(response, reverse('task-list') + '?priority=medium&q=mine', fetch_redirect_response=False)
+        self.assertEqual(
+            dict(Task.objects.values_list('title', 'assigned_to__username')),
+            {"Mine one": "otheruser", "Mine two": "testuser", "Theirs": "otheruser"})
+
+    def test_bulk_update_requires_a_change(self):
+        """Test that a bulk update without a new value leaves the tasks alone."""
+        self.client.post(reverse('task-bulk-update'), {'task_ids': [self.tasks["Mine one"].pk]})
+        self.assertFalse(Task.objects.exclude(status='pending').exists())
+
+    def test_admin_actions(self):
+        """Test that the admin actions set status and reassign the selected tasks."""
+        User.objects.create_superuser(username='admin', password='password')
+        self.client.login(username='admin', password='password')
+        url = reverse('admin:task_app_task_changelist')
+        selected = [self.tasks["Mine one"].pk, self.tasks["Theirs"].pk]
+        self.client.post(url, {'action': 'set_status_in_progress', '_selected_action': selected})
+        self.assertEqual(Task.objects.filter(status='in_progress').count(), 2)
+        self.client.post(url, {'action': 'reassign', 'assignee': 'testuser', '_selected_action': selected})
+        self.assertFalse(Task.objects.filter(assigned_to=self.other).exists())
+
+
+class AdminChangeListTestCase(QueryCountScalingMixin, TestCase):
+    def setUp(self):
+        # Create a superuser with one project and task
+        self.user = User.objects.create_superuser(username='admin', password='password')
+        self.project = Project.objects.create(
+            name="Test Project",
+            description="This is a test project",
+            start_date=date(2024, 1, 1),
+            end_date=date(2024, 12, 31),
+            created_by=self.user
+        )
+        self.task = Task.objects.create(
+            title="Test Task",
+            description="This is a test task",
+            assigned_to=self.user,
+            status="pending",
+            priority="medium",
+            start_date=date(2024, 1, 1),
+            due_date=date(2024, 2, 1),
+            project=self.project
+        )
+        self.client.login(username='admin', password='password')
+
+    def add_rows(self):
+        # Each round adds users and projects the old sidebar filters would list, and tasks on the page
+        for _ in range(3):
+            user = User.objects.create_user(username=f'user{User.objects.count()}')
+            project = Project.objects.create(
+                name=f"Project {user.pk}",
+                description="This is another test project",
+                start_date=date(2024, 1, 1),
+                end_date=date(2024, 12, 31),
+                created_by=user
+            )
+            Task.objects.create(
+                title=f"Task {user.pk}",
+                description="This is a test task",
+                assigned_to=user,
+                start_date=date(2024, 1, 1),
+                due_date=date(2024, 2, 1),
+                project=project
+            )
+
+    def test_changelist_query_count(self):
+        """Test that the changelists do not load every user and project for their filters."""
+        self.assertQueryCountConstant(reverse('admin:task_app_task_changelist'), self.add_rows)
+        self.assertQueryCountConstant(reverse('admin:task_app_project_changelist'), self.add_rows)
+
+    def test_autocomplete_filter(self):
+        """Test that the autocomplete filter narrows the changelist and shows the selected assignee."""
+        self.add_rows()
+        other = User.objects.get(username='user2')
+        response = self.client.get(
+            reverse('admin:task_app_task_changelist') + f'?assigned_to__id__exact={other.pk}')
+        self.assertEqual([task.assigned_to for task in response.context['cl'].result_list], [other])
+        self.assertContains(response, f'<option value="{other.pk}" selected>user2</option>', html=True)
+
+    def test_estimated_count_paginator(self):
+        """Test that unfiltered changelists take their size from table statistics once gathered."""
+        paginator_class = type('Paginator', (EstimatedCountPaginator,), {'exact_count_limit': 1})
+        self.assertEqual(paginator_class(Task.objects.order_by('pk'), 100).count, 1)
+        self.add_rows()
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        self.add_rows()
+        self.assertEqual(paginator_class(Task.objects.order_by('pk'), 100).count, 4)  # Statistics predate the last rows
+        self.assertEqual(paginator_class(Task.objects.filter(status='pending').order_by('pk'), 100).count, 7)
+
+    def test_changelist_ordering_uses_index(self):
+        """Test that with table statistics the changelists read their page in index order instead of sorting."""
+        self.add_rows()
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        for model in ('task', 'project'):
+            with CaptureQueriesContext(connection) as queries:
+                self.client.get(reverse(f'admin:task_app_{model}_changelist'))
+            page = next(query['sql'] for query in queries
+                        if f'FROM "task_app_{model}"' in query['sql'] and 'ORDER BY' in query['sql'])
+            with connection.cursor() as cursor:
+                cursor.execute('EXPLAIN QUERY PLAN ' + page)
+                plan = ' / '.join(row[3] for row in cursor.fetchall())
+            self.assertIn(f'USING INDEX {model}_created_idx', plan)
+            self.assertNotIn('TEMP B-TREE', plan)
+
+
+# The project's URLs as routed under ASGI (ASYNC_VIEWS), for the tests of the async views
+urlpatterns = [
+    path('', async_dashboard, name='dashboard'),
+    path('projects/', AsyncProjectListView.as_view(), name='project-list'),
+    path('tasks/', AsyncTaskListView.as_view(), name='task-list'),
+    path('', include('project_task_management.urls')),
+]
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class AsyncViewTestCase(TestCase):
+    def setUp(self):
+        # Create a user with a project and an overdue task
+        self.user = User.objects.create_user(
+            username='testuser', password='password')
+        self.project = Project.objects.create(
+            name="Test Project",
+            description="This is a test project",
+            start_date=date(2024, 1, 1),
+            end_date=date(2024, 12, 31),
+            created_by=self.user
+        )
+        Task.objects.create(
+            title="Late Task",
+            description="This is a test task",
+            assigned_to=self.user,
+            status="pending",
+            priority="medium",
+            start_date=date(2024, 1, 1),
+            due_date=date(2024, 2, 1),
+            project=self.project
+        )
+        cache.clear()
+
+    async def test_async_views_render(self):
+        """Test that the async dashboard and list views render the user's projects and tasks."""
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(reverse('dashboard'))
+        self.assertContains(response, "Late Task")
+        self.assertContains(response, "Test Project")
+        response = await self.async_client.get(reverse('task-list') + '?status=pending')
+        self.assertIs(response.resolver_match.func.view_class, AsyncTaskListView)
+        self.assertEqual([task.title for task in response.context['tasks']], ["Late Task"])
+        response = await self.async_client.get(reverse('project-list'))
+        self.assertEqual([project.name for project in response.context['projects']], ["Test Project"])
+        response = await self.async_client.get(reverse('task-list') + '?cursor=bogus')
+        self.assertEqual(response.status_code, 404)
+
+    async def test_async_views_require_login(self):
+        """Test that the async views redirect anonymous users to the login page."""
+        for name in ('dashboard', 'task-list', 'project-list'):
+            response = await self.async_client.get(reverse(name))
+            self.assertEqual(response.status_code, 302)
+
+
+class BurndownTestCase(TestCase):
+    def setUp(self):
+        # Create a user and a project
+        self.user = User.objects.create_user(
+            username='testuser', password='password')
+        self.project = Project.objects.create(
+            name="Test Project",
+            description="This is a test project",
+            start_date=date(2024, 1, 1),
+            end_date=date(2024, 12, 31),
+            created_by=self.user
+        )
+        self.client.login(username='testuser', password='password')
+
+    def make_task(self, status="pending"):
+        return Task(
+            title="Test Task",
+            description="This is a test task",
+            assigned_to=self.user,
+            status=status,
+            priority="medium",
+            start_date=date(2024, 1, 1),
+            due_date=date(2024, 2, 1),
+            project=self.project
+        )
+
+    def backdate_events(self, day):
+        TaskStatusEvent.objects.filter(changed_at__date=timezone.localdate()).update(
+            changed_at=timezone.make_aware(datetime(day.year, day.month, day.day, 12)))
+
+    def events(self):
+        return list(TaskStatusEvent.objects.order_by('pk').values_list('old_status', 'new_status'))
+
+    def test_status_changes_are_logged(self):
+        """Test that saves, bulk paths and deletes log one event per status change."""
+        task = self.make_task()
+        task.save()
+        task.status = "in_progress"
+        task.save()
+        task.title = "Renamed"
+        task.save()
+        Task.objects.bulk_create([self.make_task() for _ in range(2)])
+        Task.objects.filter(status="pending").update(status="completed")
+        task.delete()
+        self.assertEqual(self.events(), [
+            (None, "pending"), ("pending", "in_progress"),
+            (None, "pending"), (None, "pending"),
+            ("pending", "completed"), ("pending", "completed"),
+            ("in_progress", None),
+        ])
+
+    def test_rollup_builds_daily_snapshots(self):
+        """Test that the rollup folds events into per-day counts, including late events for earlier days."""
+        tasks = Task.objects.bulk_create([self.make_task() for _ in range(3)])
+        self.backdate_events(date(2024, 1, 1))
+        Task.objects.filter(pk__in=[tasks[0].pk, tasks[1].pk]).update(status="completed")
+        self.backdate_events(date(2024, 1, 3))
+        stdout = StringIO()
+        call_command('rollup_status_events', stdout=stdout)
+        self.assertIn("Rolled up 5 status events", stdout.getvalue())
+
+        # A change logged later but dated on a day in between also shifts the later snapshot
+        Task.objects.filter(pk=tasks[2].pk).update(status="in_progress")
+        self.backdate_events(date(2024, 1, 2))
+        self.assertEqual(roll_up_status_events(), 1)
+        self.assertEqual(roll_up_status_events(), 0)
+        self.assertEqual(
+            list(ProjectStatusSnapshot.objects.order_by('day').values_list(
+                'day', 'pending_count', 'in_progress_count', 'completed_count', 'completed_events')),
+            [(date(2024, 1, 1), 3, 0, 0, 0), (date(2024, 1, 2), 2, 1, 0, 0), (date(2024, 1, 3), 0, 1, 2, 2)])
+        series = burndown_series(self.project, until=date(2024, 1, 5))
+        self.assertEqual([remaining for _day, remaining, _completed in series], [3, 3, 1, 1, 1])
+
+    def test_burndown_view(self):
+        """Test that the burndown page charts events not yet rolled up, without rolling them up, for the owner."""
+        Task.objects.bulk_create([self.make_task("pending"), self.make_task("completed")])
+        response = self.client.get(reverse('project-burndown', kwargs={'pk': self.project.pk}))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['burndown'], [(timezone.localdate(), 1, 1)])
+        self.assertEqual([bar['completed'] for bar in response.context['velocity_bars']], [1])
+        self.assertFalse(ProjectStatusSnapshot.objects.exists())
+
+        # Events after the last rollup are added on top of the stored snapshots
+        roll_up_status_events()
+        Task.objects.filter(status="pending").update(status="completed")
+        response = self.client.get(reverse('project-burndown', kwargs={'pk': self.project.pk}))
+        self.assertEqual(response.context['burndown'], [(timezone.localdate(), 0, 2)])
+        self.assertEqual([bar['completed'] for bar in response.context['velocity_bars']], [2])
+        User.objects.create_user(username='otheruser', password='password')
+        self.client.login(username='otheruser', password='password')
+        response = self.client.get(reverse('project-burndown', kwargs={'pk': self.project.pk}))
+        self.assertEqual(response.status_code, 404)
+
+    def test_project_delete_drops_its_log(self):
+        """Test that deleting a project with tasks also removes its status events."""
+        Task.objects.bulk_create([self.make_task()])
+        self.project.delete()
+        self.assertFalse(TaskStatusEvent.objects.exists())
+
+
+class DueTaskNotificationTestCase(TestCase):
+    def setUp(self):
+        # Create two users with email addresses and a project to hold their tasks
+        self.user = User.objects.create_user(
+            username='testuser', password='password', email='testuser@example.com')
+        self.other = User.objects.create_user(
+            username='otheruser', password='password', email='otheruser@example.com')
+        self.project = Project.objects.create(
+            name="Test Project",
+            description="This is a test project",
+            start_date=date(2024, 1, 1),
+            end_date=date(2024, 12, 31),
+            created_by=self.user
+        )
+
+    def make_task(self, title, due_date, assigned_to=None, status="pending"):
+        return Task.objects.create(
+            title=title,
+            description="This is a test task",
+            assigned_to=assigned_to or self.user,
+            status=status,
+            priority="medium",
+            start_date=date(2024, 1, 1),
+            due_date=due_date,
+            project=self.project
+        )
+
+    def test_digests_per_assignee_and_window(self):
+        """Test that each run writes one digest per assignee for newly overdue and due-soon tasks only."""
+        self.make_task("Long overdue", date(2024, 3, 1))
+        self.make_task("Just overdue", date(2024, 3, 9))
+        self.make_task("Done", date(2024, 3, 9), status="completed")
+        self.make_task("Mine soon", date(2024, 3, 11))
+        self.make_task("Also mine soon", date(2024, 3, 12))
+        self.make_task("Theirs soon", date(2024, 3, 11), assigned_to=self.other, status="in_progress")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            written = notify_due_tasks(today=date(2024, 3, 10), lead_days=2)
+        self.assertEqual(written, {'overdue': 1, 'due_soon': 3})
+        self.assertEqual(
+            sorted((n.user.username, n.kind, n.task_count) for n in Notification.objects.all()),
+            [('otheruser', 'due_soon', 1), ('testuser', 'due_soon', 1), ('testuser', 'due_soon', 1),
+             ('testuser', 'overdue', 1)])
+        overdue = Notification.objects.get(kind='overdue')
+        self.assertEqual([task.title for task in overdue.tasks.all()], ["Just overdue"])
+        self.assertEqual(len(mail.outbox), 4)
+        self.assertIn("Just overdue", next(m.body for m in mail.outbox if 'overdue' in m.subject))
+
+        # Running again the same day finds nothing new; the next day only picks up the newly due date
+        self.assertEqual(notify_due_tasks(today=date(2024, 3, 10), lead_days=2), {'overdue': 0, 'due_soon': 0})
+        self.make_task("Later", date(2024, 3, 13))
+        self.assertEqual(notify_due_tasks(today=date(2024, 3, 11), lead_days=2), {'overdue': 0, 'due_soon': 1})
+
+    def test_command(self):
+        """Test that the worker command reports the digests it wrote."""
+        self.make_task("Overdue", timezone.localdate() - timedelta(days=1))
+        stdout = StringIO()
+        call_command('notify_due_tasks', stdout=stdout)
+        self.assertIn("Wrote 1 overdue and 0 due-soon digests", stdout.getvalue())
+
+
+@override_settings(REQUEST_PROFILING=True)
+class ProfilingTestCase(TestCase):
+    def setUp(self):
+        # Create a staff user with a project and two tasks
+        self.user = User.objects.create_user(
+            username='testuser', password='password', is_staff=True)
+        self.project = Project.objects.create(
+            name="Test Project",
+            description="This is a test project",
+            start_date=date(2024, 1, 1),
+            end_date=date(2024, 12, 31),
+            created_by=self.user
+        )
+        for title in ("Task 1", "Task 2"):
+            Task.objects.create(
+                title=title,
+                description="This is a test task",
+                assigned_to=self.user,
+                status="pending",
+                priority="medium",
+                start_date=date(2024, 1, 1),
+                due_date=date(2024, 2, 1),
+                project=self.project
+            )
+        reset_profiling_stats()
+        self.client.login(username='testuser', password='password')
+
+    def test_server_timing_and_stats_page(self):
+        """Test that profiled requests carry Server-Timing and show up per view on the stats page."""
+        response = self.client.get(reverse('task-list'))
+        self.assertRegex(response['Server-Timing'], r'app;dur=[\d.]+, db;dur=[\d.]+;desc="\d+ queries", tpl;dur=[\d.]+')
+        self.client.get(reverse('project-detail', kwargs={'pk': self.project.pk}))
+        response = self.client.get(reverse('profiling-stats'))
+        stats = {row['route']: row for row in response.context['stats']}
+        self.assertEqual(stats['task_app.views.TaskListView']['requests'], 1)
+        self.assertGreater(stats['task_app.views.TaskListView']['queries'], 0)
+        self.assertGreater(stats['task_app.views.ProjectDetailView']['queries'], 0)
+        self.assertGreater(stats['task_app.views.ProjectDetailView']['template_ms'], 0)
+
+    def test_repeated_queries_report_their_origin(self):
+        """Test that a query repeated per row is reported with the line that triggered it."""
+        with profiled() as profile:
+            [task.project.name for task in Task.objects.all()]
+        (sql, count, origins), = profile.duplicates()
+        self.assertIn('task_app_project', sql)
+        self.assertEqual(count, 2)
+        self.assertTrue(origins[0].startswith(os.path.join('task_app', 'tasks', 'test.py')))
+
+    @override_settings(REQUEST_PROFILING=False)
+    def test_off_by_default(self):
+        """Test that without REQUEST_PROFILING responses carry no Server-Timing header."""
+        response = self.client.get(reverse('task-list'))
+        self.assertFalse(response.has_header('Server-Timing'))
+
+
+class SeedLoadTestCase(TestCase):
+    def test_seed_load_creates_consistent_data(self):
+        """Test that seed_load creates the requested rows with dates inside their projects and matching counters."""
+        call_command('seed_load', users=3, projects=4, tasks_per_project=5, batch_size=7, stdout=StringIO())
+        self.assertEqual(User.objects.filter(username__startswith='loaduser').count(), 3)
+        self.assertEqual(Task.objects.count(), 20)
+        for project in Project.objects.with_task_counts():
+            self.assertEqual(project.task_count, project.counted_task_count)
+            self.assertEqual(project.completed_count, project.counted_completed_count)
+        for task in Task.objects.select_related('project'):
+            validate_task_dates(task.start_date, task.due_date, task.project.end_date)
+
+    def test_seed_load_is_reproducible(self):
+        """Test that the same seed and anchor date generate the same tasks and existing users are reused."""
+        call_command('seed_load', '--today', '2024-06-01', users=3, projects=2, tasks_per_project=5, seed=7,
+                     stdout=StringIO())
+        first = list(Task.objects.order_by('pk').values_list('title', 'status', 'priority', 'due_date',
+                                                             'assigned_to__username'))
+        Project.objects.all().delete()
+        call_command('seed_load', users=3, projects=2, tasks_per_project=5, seed=7, today=date(2024, 6, 1),
+                     stdout=StringIO())
+        second = list(Task.objects.order_by('pk').values_list('title', 'status', 'priority', 'due_date',
+                                                              'assigned_to__username'))
+        self.assertEqual(first, second)
+        self.assertEqual(User.objects.count(), 3)
+        self.assertTrue(all(date(2023, 6, 1) <= due_date <= date(2025, 6, 1) for *_rest, due_date, _user in first))
+
+
+class ProjectBoardTestCase(TestCase):
+    def setUp(self):
+        # Create a test user with a project of three pending tasks and one completed task
+        self.user = User.objects.create_user(
+            username='testuser', password='password')
+        self.project = Project.objects.create(
+            name="Test Project",
+            description="This is a test project",
+            start_date=date(2024, 1, 1),
+            end_date=date(2024, 12, 31),
+            created_by=self.user
+        )
+        self.tasks = [
+            Task.objects.create(
+                title=f"Task {number}",
+                description="This is a test task",
+                assigned_to=self.user,
+                status="completed" if number == 4 else "pending",
+                priority="medium",
+                start_date=date(2024, 1, 1),
+                due_date=date(2024, 2, 1),
+                project=self.project
+            )
+            for number in range(1, 5)
+        ]
+        self.client.login(username='testuser', password='password')
+
+    def column(self, status):
+        return list(Task.objects.filter(project=self.project, status=status)
+                    .order_by('board_position', 'id').values_list('title', flat=True))
+
+    def move(self, task, **data):
+        return self.client.post(reverse('task-move', kwargs={'pk': task.pk}), data)
+
+    def test_board_groups_tasks_by_status(self):
+        """Test that the board loads every card in one query and groups them by status."""
+        self.client.get(reverse('project-board', kwargs={'pk': self.project.pk}))  # Warm the session
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('project-board', kwargs={'pk': self.project.pk}))
+        self.assertEqual(len([query for query in queries if 'task_app_task' in query['sql']]), 1)
+        columns = {status: [task.title for task in tasks] for status, _label, tasks in response.context['columns']}
+        self.assertEqual(columns, {'pending': ["Task 1", "Task 2", "Task 3"], 'in_progress': [], 'completed': ["Task 4"]})
+        self.assertContains(response, f'href="{self.tasks[0].get_absolute_url()}"')
+
+    def test_move_between_columns_updates_counters(self):
+        """Test that moving a card to another column saves its status and returns the new column counts."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.move(self.tasks[0], status='in_progress')
+        # The task is loaded once with every field the move reads, never field by field
+        deferred = [query['sql'] for query in queries
+                    if re.match(r'SELECT "task_app_task"\."id", "task_app_task"\."\w+" FROM', query['sql'])]
+        self.assertEqual(deferred, [])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['counts'], {'pending': 2, 'in_progress': 1, 'completed': 1})
+        self.move(self.tasks[1], status='completed', previous=self.tasks[3].pk)
+        self.assertEqual(self.column('completed'), ["Task 4", "Task 2"])
+        self.assertEqual(TaskStatusEvent.objects.filter(new_status='completed', old_status='pending').count(), 1)
+
+    def test_reorder_within_column(self):
+        """Test that a card dropped between two cards lands between them, respacing the column when needed."""
+        self.move(self.tasks[2], status='pending', previous=self.tasks[0].pk, next=self.tasks[1].pk)
+        self.assertEqual(self.column('pending'), ["Task 1", "Task 3", "Task 2"])
+        with CaptureQueriesContext(connection) as queries:
+            self.move(self.tasks[1], status='pending', next=self.tasks[0].pk)
+        self.assertEqual(self.column('pending'), ["Task 2", "Task 1", "Task 3"])
+        self.assertFalse([query for query in queries if 'task_app_taskstatusevent' in query['sql']])
+
+    def test_move_permissions_and_validation(self):
+        """Test that other users cannot move a card and an unknown status is rejected."""
+        self.assertEqual(self.move(self.tasks[0], status='unknown').status_code, 400)
+        User.objects.create_user(username='otheruser', password='password')
+        self.client.login(username='otheruser', password='password')
+        self.assertEqual(self.move(self.tasks[0], status='completed').status_code, 404)
+        self.assertEqual(self.client.get(reverse('project-board', kwargs={'pk': self.project.pk})).status_code, 404)
+
+
+class ProjectSharingTestCase(TestCase):
+    def setUp(self):
+        # Cached project access is keyed by user id, which the next test reuses
+        cache.clear()
+        self.addCleanup(cache.clear)
+        # Create an owner with a project and task, and a second user to share it with
+        self.user = User.objects.create_user(
+            username='testuser', password='password')
+        self.member = User.objects.create_user(
+            username='memberuser', password='password')
+        self.project = Project.objects.create(
+            name="Shared Project",
+            description="This is a test project",
+            start_date=date(2024, 1, 1),
+            end_date=date(2024, 12, 31),
+            created_by=self.user
+        )
+        self.task = Task.objects.create(
+            title="Owner Task",
+            description="This is a test task",
+            assigned_to=self.user,
+            status="pending",
+            priority="medium",
+            start_date=date(2024, 1, 1),
+            due_date=date(2024, 2, 1),
+            project=self.project
+        )
+
+    def share(self, username):
+        self.client.login(username='testuser', password='password')
+        return self.client.post(reverse('project-members', kwargs={'pk': self.project.pk}), {'user': username})
+
+    def test_members_see_shared_projects(self):
+        """Test that sharing a project shows it to the member everywhere projects are listed or opened."""
+        self.client.login(username='memberuser', password='password')
+        self.assertNotContains(self.client.get(reverse('project-list')), "Shared Project")
+        self.share('memberuser')
+        self.client.login(username='memberuser', password='password')
+        self.assertContains(self.client.get(reverse('project-list')), "Shared Project")
+        self.assertContains(self.client.get(reverse('project-detail', kwargs={'pk': self.project.pk})), "memberuser")
+        board = self.client.get(reverse('project-board', kwargs={'pk': self.project.pk}))
+        self.assertContains(board, "Owner Task")
+        api = self.client.get(reverse('api-project-list') + '?fields=name').json()
+        self.assertEqual(api['results'], [{'name': "Shared Project"}])
+        # Members can neither move the shared board's cards nor edit or reshare the project
+        self.assertContains(board, 'draggable="false"')
+        response = self.client.post(reverse('task-move', kwargs={'pk': self.task.pk}), {'status': 'in_progress'})
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(self.client.get(reverse('project-update', kwargs={'pk': self.project.pk})).status_code, 404)
+        response = self.client.post(reverse('project-members', kwargs={'pk': self.project.pk}), {'user': 'testuser'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_members_see_but_do_not_edit_shared_tasks(self):
+        """Test that the task list, detail and API show shared tasks to members, who cannot edit them."""
+        ProjectMembership.objects.create(project=self.project, user=self.member)
+        self.client.login(username='memberuser', password='password')
+        response = self.client.get(reverse('task-list'))
+        self.assertEqual([task.title for task in response.context['tasks']], ["Owner Task"])
+        self.assertNotContains(response, reverse('task-update', kwargs={'pk': self.task.pk}))
+        response = self.client.get(reverse('task-detail', kwargs={'pk': self.task.pk}))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(response, "Edit Task")
+        api = self.client.get(reverse('api-task-list') + '?fields=title').json()
+        self.assertEqual(api['results'], [{'title': "Owner Task"}])
+        self.assertEqual(self.client.get(reverse('task-update', kwargs={'pk': self.task.pk})).status_code, 404)
+        self.client.post(reverse('task-bulk-update'), {'select_all': 'on', 'status': 'completed'})
+        self.assertEqual(Task.objects.get(pk=self.task.pk).status, "pending")
+
+    def test_owner_edits_and_moves_members_tasks(self):
+        """Test that the project owner can edit and move a task assigned to a member."""
+        ProjectMembership.objects.create(project=self.project, user=self.member)
+        Task.objects.filter(pk=self.task.pk).update(assigned_to=self.member)
+        self.client.login(username='testuser', password='password')
+        response = self.client.get(reverse('task-detail', kwargs={'pk': self.task.pk}))
+        self.assertContains(response, "Edit Task")
+        self.assertEqual(self.client.get(reverse('task-update', kwargs={'pk': self.task.pk})).status_code, 200)
+        response = self.client.post(reverse('task-move', kwargs={'pk': self.task.pk}), {'status': 'in_progress'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Task.objects.get(pk=self.task.pk).status, "in_progress")
+
+    def test_access_is_cached_and_invalidated(self):
+        """Test that project lists reuse the cached project ids until a membership changes."""
+        self.client.login(username='memberuser', password='password')
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('project-list'))
+        self.assertFalse([query for query in queries if 'task_app_projectmembership' in query['sql']])
+        ProjectMembership.objects.create(project=self.project, user=self.member)
+        self.assertContains(self.client.get(reverse('project-list')), "Shared Project")
+        ProjectMembership.objects.filter(user=self.member).delete()
+        self.assertNotContains(self.client.get(reverse('project-list')), "Shared Project")
+
+    def test_removing_members_and_changing_owner(self):
+        """Test that removed members and previous owners lose access straight away."""
+        self.share('memberuser')
+        self.client.post(reverse('project-members', kwargs={'pk': self.project.pk}), {'remove': self.member.pk})
+        self.assertFalse(ProjectMembership.objects.exists())
+        self.assertEqual(self.share('nobody').status_code, 302)
+        self.assertFalse(ProjectMembership.objects.exists())
+        project = Project.objects.get(pk=self.project.pk)
+        project.created_by = self.member
+        project.save()
+        response = self.client.get(reverse('project-detail', kwargs={'pk': self.project.pk}))
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(ROOT_URLCONF=__name__)
+    def test_async_project_list_includes_shared_projects(self):
+        """Test that the async project list applies the same sharing rule."""
+        ProjectMembership.objects.create(project=self.project, user=self.member)
+        self.client.login(username='memberuser', password='password')
+        cache.clear()  # Start from an empty cache so the access is loaded by the async view
+        response = self.client.get(reverse('project-list'))
+        self.assertEqual([project.name for project in response.context['projects']], ["Shared Project"])
+
+
+class TaskScheduleTestCase(TestCase):
+    def setUp(self):
+        # Create a test user with a project where "Build" waits for "Design" and "Docs" waits for nothing
+        self.user = User.objects.create_user(
+            username='testuser', password='password')
+        self.project = Project.objects.create(
+            name="Test Project",
+            description="This is a test project",
+            start_date=date(2024, 1, 1),
+            end_date=date(2024, 12, 31),
+            created_by=self.user
+        )
+        self.design, self.build, self.docs = [
+            Task.objects.create(
+                title=title,
+                description="This is a test task",
+                assigned_to=self.user,
+                status="pending",
+                priority="medium",
+                start_date=date(2024, 1, 1),
+                due_date=due_date,
+                project=self.project
+            )
+            for title, due_date in (("Design", date(2024, 1, 10)), ("Build", date(2024, 1, 5)),
+                                    ("Docs", date(2024, 1, 3)))
+        ]
+        TaskDependency.objects.create(task=self.build, depends_on=self.design)
+        self.client.login(username='testuser', password='password')
+
+    def test_critical_path_and_slack(self):
+        """Test that the critical path follows the dependencies and other tasks get the remaining slack"""
+        with self.assertNumQueries(1):
+            schedule = compute_schedule(self.project)
+        self.assertEqual(schedule.critical_path, [self.design.pk, self.build.pk])
+        self.assertEqual(date.fromordinal(schedule.earliest_start[self.build.pk]), date(2024, 1, 10))
+        self.assertEqual(date.fromordinal(schedule.finish), date(2024, 1, 14))
+        self.assertEqual(schedule.slack[self.design.pk], 0)
+        self.assertEqual(schedule.slack[self.docs.pk], 11)
+
+        response = self.client.get(reverse('project-schedule', args=[self.project.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['task'] for row in response.context['critical_path']], [self.design, self.build])
+
+    def test_dependency_cycles_are_rejected(self):
+        """Test that a dependency closing a cycle, on the task itself or across projects cannot be saved"""
+        with self.assertRaises(ValidationError):
+            TaskDependency.objects.create(task=self.design, depends_on=self.build)
+        with self.assertRaises(ValidationError):
+            TaskDependency.objects.create(task=self.docs, depends_on=self.docs)
+        other_project = Project.objects.create(
+            name="Other Project", description="Another project", start_date=date(2024, 1, 1),
+            end_date=date(2024, 12, 31), created_by=self.user)
+        self.docs.project = other_project
+        self.docs.save()
+        with self.assertRaises(ValidationError):
+            TaskDependency.objects.create(task=self.docs, depends_on=self.design)
+        self.assertEqual(TaskDependency.objects.count(), 1)
+
+    def test_later_due_date_shifts_dependents(self):
+        """Test that moving a due date pushes back only the dependent tasks, keeping their durations"""
+        docs_updated_at = self.docs.updated_at
+        response = self.client.post(reverse('task-update', args=[self.design.pk]), {
+            'title': "Design",
+            'description': "This is a test task",
+            'assigned_to': self.user.pk,
+            'status': 'pending',
+            'priority': 'medium',
+            'start_date': '2024-01-01',
+            'due_date': '2024-01-20',
+            'project': self.project.pk,
+        })
+        self.assertEqual(response.status_code, 302)
+        self.build.refresh_from_db()
+        self.assertEqual((self.build.start_date, self.build.due_date), (date(2024, 1, 20), date(2024, 1, 24)))
+        self.docs.refresh_from_db()
+        self.assertEqual(self.docs.updated_at, docs_updated_at)
+
+    def test_save_and_update_shift_dependents(self):
+        """Test that saves and set-based updates outside the edit view also push back the dependent tasks"""
+        self.design.due_date = date(2024, 1, 20)
+        self.design.save()
+        self.assertEqual(self.design.shifted_dependents, [self.build.pk])
+        self.build.refresh_from_db()
+        self.assertEqual((self.build.start_date, self.build.due_date), (date(2024, 1, 20), date(2024, 1, 24)))
+        Task.objects.filter(pk=self.design.pk).update(due_date=date(2024, 2, 1))
+        self.build.refresh_from_db()
+        self.assertEqual((self.build.start_date, self.build.due_date), (date(2024, 2, 1), date(2024, 2, 5)))
+        with self.assertRaises(ValidationError):
+            Task.objects.filter(pk=self.design.pk).update(due_date=date(2024, 12, 30))
+        self.design.refresh_from_db()
+        self.assertEqual(self.design.due_date, date(2024, 2, 1))
+
+    def test_saves_without_the_due_date_do_not_load_it(self):
+        """Test that a save leaving out the due date decides not to shift without loading it or marking it loaded"""
+        task = Task.objects.only('status').get(pk=self.design.pk)
+        with self.assertNumQueries(0):
+            self.assertFalse(task._due_date_moved(['status']))
+            self.assertFalse(task._due_date_moved())
+        task.status = 'in_progress'
+        task.save(update_fields=['status'])
+        self.assertEqual(task.shifted_dependents, [])
+        self.assertNotIn('_loaded_due_date', task.__dict__)
+
+    def test_shift_past_project_end_is_rejected(self):
+        """Test that a due date pushing a dependent task past the project end date saves nothing"""
+        response = self.client.post(reverse('task-update', args=[self.design.pk]), {
+            'title': "Design",
+            'description': "This is a test task",
+            'assigned_to': self.user.pk,
+            'status': 'pending',
+            'priority': 'medium',
+            'start_date': '2024-01-01',
+            'due_date': '2024-12-30',
+            'project': self.project.pk,
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['form'].errors['due_date'])
+        self.design.refresh_from_db()
+        self.build.refresh_from_db()
+        self.assertEqual(self.design.due_date, date(2024, 1, 10))
+        self.assertEqual(self.build.due_date, date(2024, 1, 5))
+
+
+class TaskEventsTestCase(TestCase):
+    def setUp(self):
+        # Cached project access is keyed by user id, which the next test reuses
+        cache.clear()
+        self.addCleanup(cache.clear)
+        # Create an assignee with a project and task, a project member, an unrelated user and a staff user
+        self.user = User.objects.create_user(
+            username='testuser', password='password')
+        self.member = User.objects.create_user(
+            username='memberuser', password='password')
+        self.other = User.objects.create_user(
+            username='otheruser', password='password')
+        self.staff = User.objects.create_user(
+            username='staffuser', password='password', is_staff=True)
+        self.project = Project.objects.create(
+            name="Test Project",
+            description="This is a test project",
+            start_date=date(2024, 1, 1),
+            end_date=date(2024, 12, 31),
+            created_by=self.user
+        )
+        ProjectMembership.objects.create(project=self.project, user=self.member)
+        self.task = Task.objects.create(
+            title="Test Task",
+            description="This is a test task",
+            assigned_to=self.user,
+            status="pending",
+            priority="medium",
+            start_date=date(2024, 1, 1),
+            due_date=date(2024, 2, 1),
+            project=self.project
+        )
+        self.start = hub.last_id
+
+    def subscriber(self, user, project_ids=()):
+        async def create():
+            return Subscriber(user, project_ids)
+        return async_to_sync(create)()
+
+    def test_events_are_scoped_to_visible_tasks(self):
+        """Test that task changes only reach users who can see the task, and its previous assignee as a removal"""
+        with self.captureOnCommitCallbacks(execute=True):
+            self.task.status = 'in_progress'
+            self.task.save()
+        assignee = self.subscriber(self.user, {self.project.pk})
+        member = self.subscriber(self.member, {self.project.pk})
+        staff = self.subscriber(self.staff)
+        other = self.subscriber(self.other)
+        for subscriber in (assignee, member, staff):
+            [(_, name, data)] = hub.since(self.start, subscriber)
+            self.assertEqual((name, data['action'], data['status']), ('task', 'updated', 'in_progress'))
+        self.assertEqual(hub.since(self.start, other), [])
+
+        start = hub.last_id
+        with self.captureOnCommitCallbacks(execute=True):
+            Task.objects.get(pk=self.task.pk).delete()
+        [(_, _, data)] = hub.since(start, member)
+        self.assertEqual(data['action'], 'deleted')
+
+    def test_reassignment_removes_task_from_previous_assignee(self):
+        """Test that the previous assignee of a task in another user's project is told to drop it"""
+        other_project = Project.objects.create(
+            name="Other Project", description="Another project", start_date=date(2024, 1, 1),
+            end_date=date(2024, 12, 31), created_by=self.other)
+        task = Task.objects.create(
+            title="Moved Task", description="This is a test task", assigned_to=self.member, status="pending",
+            priority="medium", start_date=date(2024, 1, 1), due_date=date(2024, 2, 1), project=other_project)
+        start = hub.last_id
+        with self.captureOnCommitCallbacks(execute=True):
+            task = Task.objects.get(pk=task.pk)
+            task.assigned_to = self.other
+            task.save()
+        [(_, _, data)] = hub.since(start, self.subscriber(self.member, {self.project.pk}))
+        self.assertEqual(data, {'action': 'removed', 'id': task.pk})
+        [(_, _, data)] = hub.since(start, self.subscriber(self.other, {other_project.pk}))
+        self.assertEqual(data['action'], 'updated')
+
+    def test_bulk_update_publishes_refresh(self):
+        """Test that a set-based update tells the affected users to reload"""
+        with self.captureOnCommitCallbacks(execute=True):
+            Task.objects.filter(project=self.project).update(priority='high')
+        [(_, name, _)] = hub.since(self.start, self.subscriber(self.member, {self.project.pk}))
+        self.assertEqual(name, 'refresh')
+        self.assertEqual(hub.since(self.start, self.subscriber(self.other)), [])
+
+    def test_long_poll_and_stream_resume(self):
+        """Test that a long poll and a resumed event stream both return the events after the given id"""
+        # Streams and polls need ASGI; WSGI clients are told to stop
+        self.client.login(username='testuser', password='password')
+        self.assertEqual(self.client.get(reverse('task-events')).status_code, 204)
+        self.assertEqual(self.client.get(reverse('task-events'), {'poll': 1}).status_code, 204)
+
+        async def poll(params):
+            await self.async_client.aforce_login(self.user)
+            return (await self.async_client.get(reverse('task-events'), {'poll': 1, **params})).json()
+
+        self.assertEqual(async_to_sync(poll)({}), {'events': [], 'last_event_id': self.start})
+        with self.captureOnCommitCallbacks(execute=True):
+            self.task.title = "Renamed Task"
+            self.task.save()
+        result = async_to_sync(poll)({'after': self.start})
+        [event] = result['events']
+        self.assertEqual((event['event'], event['data']['title']), ('task', "Renamed Task"))
+        self.assertEqual(result['last_event_id'], event['id'])
+        # Ids from before the buffer (or a restart) make the client reload
+        result = async_to_sync(poll)({'after': self.start + 10})
+        self.assertEqual(result['events'][0]['event'], 'reset')
+
+        async def read_stream():
+            await self.async_client.aforce_login(self.member)
+            response = await self.async_client.get(reverse('task-events'), headers={'Last-Event-ID': str(self.start)})
+            self.assertEqual(response['Content-Type'], 'text/event-stream')
+            chunks = aiter(response.streaming_content)
+            retry, replayed = await anext(chunks), await anext(chunks)
+            await response.streaming_content.aclose()
+            return retry, replayed
+
+        retry, replayed = async_to_sync(read_stream)()
+        self.assertTrue(retry.startswith(b'retry:'))
+        self.assertIn(b'event: task', replayed)
+        self.assertIn(b'Renamed Task', replayed)
+
+
+class RecurringTaskTestCase(TestCase):
+    def setUp(self):
+        # Create a test user with a project and a one-day task starting on a Monday
+        self.user = User.objects.create_user(
+            username='testuser', password='password')
+        self.project = Project.objects.create(
+            name="Test Project",
+            description="This is a test project",
+            start_date=date(2024, 1, 1),
+            end_date=date(2024, 4, 30),
+            created_by=self.user
+        )
+        self.template = Task.objects.create(
+            title="Weekly Report",
+            description="This is a test task",
+            assigned_to=self.user,
+            status="pending",
+            priority="medium",
+            start_date=date(2024, 1, 1),
+            due_date=date(2024, 1, 2),
+            project=self.project
+        )
+        self.client.login(username='testuser', password='password')
+
+    def test_task_form_saves_recurrence(self):
+        """Test that the task form attaches a recurrence and rejects one ending after the project"""
+        data = {
+            'title': "Standup Notes",
+            'description': "This is a test task",
+            'assigned_to': self.user.pk,
+            'status': 'pending',
+            'priority': 'medium',
+            'start_date': '2024-01-03',
+            'due_date': '2024-01-03',
+            'project': self.project.pk,
+            'repeat': 'daily',
+            'repeat_every': 2,
+            'repeat_until': '2024-05-31',
+        }
+        response = self.client.post(reverse('task-create'), data)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['form'].errors['repeat_until'])
+
+        data['repeat_until'] = '2024-01-31'
+        response = self.client.post(reverse('task-create'), data)
+        self.assertEqual(response.status_code, 302)
+        recurrence = TaskRecurrence.objects.get(template__title="Standup Notes")
+        self.assertEqual((recurrence.frequency, recurrence.interval, recurrence.until),
+                         ('daily', 2, date(2024, 1, 31)))
+        self.assertEqual(recurrence.generated_through, date(2024, 1, 3))
+
+    def test_generator_fills_rolling_window_once(self):
+        """Test that the generator creates the occurrences in its window and nothing more when run again"""
+        TaskRecurrence.objects.create(template=self.template, frequency='weekly')
+        self.assertEqual(generate_occurrences(today=date(2024, 1, 1), days=28), 4)
+        self.assertEqual(generate_occurrences(today=date(2024, 1, 1), days=28), 0)
+        self.assertEqual(generate_occurrences(today=date(2024, 1, 15), days=28), 2)
+        occurrences = Task.objects.filter(occurrence_of__template=self.template).order_by('start_date')
+        self.assertEqual([task.start_date for task in occurrences],
+                         [date(2024, 1, day) for day in (8, 15, 22, 29)] + [date(2024, 2, 5), date(2024, 2, 12)])
+        self.assertTrue(all(task.due_date - task.start_date == timedelta(days=1) for task in occurrences))
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.pending_count, 7)
+
+        out = StringIO()
+        call_command('generate_recurring_tasks', stdout=out)  # Today is past the project end
+        self.assertIn("Created 11 recurring task occurrences", out.getvalue())
+        self.assertEqual(occurrences.last().start_date, date(2024, 4, 29))
+
+    def test_monthly_series_stops_at_project_end(self):
+        """Test that monthly occurrences keep to the anchor day and stop at the project end date"""
+        self.template.start_date = self.template.due_date = date(2024, 1, 31)
+        self.template.save()
+        recurrence = TaskRecurrence.objects.create(template=self.template, frequency='monthly')
+        self.assertEqual(generate_occurrences(today=date(2024, 1, 1), days=365), 3)
+        self.assertEqual(sorted(Task.objects.filter(occurrence_of=recurrence).values_list('start_date', flat=True)),
+                         [date(2024, 2, 29), date(2024, 3, 31), date(2024, 4, 30)])
+        recurrence.refresh_from_db()
+        self.assertEqual(recurrence.generated_through, self.project.end_date)
+        with self.assertNumQueries(3):  # A finished series is not picked up again: one empty select
+            self.assertEqual(generate_occurrences(today=date(2024, 1, 1), days=365), 0)
+
+
+class ProjectArchiveTestCase(TestCase):
+    def setUp(self):
+        # A finished project shared with a member, with two completed tasks linked by a dependency, next to an
+        # ended project that still has an open task
+        self.user = User.objects.create_user(
+            username='testuser', password='password')
+        self.member = User.objects.create_user(username='member', password='password')
+        self.finished = Project.objects.create(
+            name="Test Project",
+            description="This is a test project",
+            start_date=date(2024, 1, 1),
+            end_date=date(2024, 12, 31),
+            created_by=self.user
+        )
+        ProjectMembership.objects.create(project=self.finished, user=self.member)
+        self.design, self.build = [Task.objects.create(
+            title=title,
+            description="This is a test task",
+            assigned_to=self.user,
+            status="completed",
+            priority="medium",
+            start_date=date(2024, 1, 1),
+            due_date=date(2024, 1, 10),
+            project=self.finished
+        ) for title in ("Design", "Build")]
+        TaskDependency.objects.create(task=self.build, depends_on=self.design)
+        self.open_project = Project.objects.create(
+            name="Open Project",
+            description="This is a test project",
+            start_date=date(2024, 1, 1),
+            end_date=date(2024, 12, 31),
+            created_by=self.user
+        )
+        Task.objects.create(title="Loose End", description="This is a test task", assigned_to=self.user,
+                            status="in_progress", priority="low", start_date=date(2024, 1, 1),
+                            due_date=date(2024, 1, 10), project=self.open_project)
+        self.design.refresh_from_db()
+
+    def test_archive_moves_finished_projects(self):
+        """Test that only ended projects with every task completed move to the archive tables, once"""
+        self.assertEqual(archive_projects(today=date(2025, 1, 15), days=30), 0)  # Not 30 days past its end yet
+        self.assertEqual(archive_projects(today=date(2025, 3, 1), days=30), 1)
+        self.assertEqual(archive_projects(today=date(2025, 3, 1), days=30), 0)
+
+        self.assertQuerySetEqual(Project.objects.all(), [self.open_project])
+        self.assertFalse(Task.objects.filter(pk__in=[self.design.pk, self.build.pk]).exists())
+        self.assertFalse(TaskDependency.objects.exists())
+        self.assertFalse(Task.objects.search("Design").exists())
+        archived = ArchivedProject.objects.get(pk=self.finished.pk)
+        self.assertEqual(list(archived.members.all()), [self.member])
+        design = ArchivedTask.objects.get(pk=self.design.pk)
+        self.assertEqual((design.project, design.status, design.created_at),
+                         (archived, 'completed', self.design.created_at))
+        self.assertEqual(list(ArchivedTask.objects.get(pk=self.build.pk).depends_on.all()), [design])
+
+    def test_archive_views_are_read_only_and_scoped(self):
+        """Test that members still see an archived project and its tasks, and other users do not"""
+        archive_projects(today=date(2025, 3, 1), days=30)
+        outsider = User.objects.create_user(username='outsider', password='password')
+        detail_url = reverse('archived-project-detail', args=[self.finished.pk])
+
+        self.client.login(username='member', password='password')
+        response = self.client.get(reverse('archived-project-list'))
+        self.assertContains(response, "Test Project")
+        response = self.client.get(detail_url)
+        self.assertContains(response, "Design")
+        self.assertContains(response, "Build")
+        self.assertEqual(self.client.post(detail_url).status_code, 405)
+
+        self.client.force_login(outsider)
+        self.assertNotContains(self.client.get(reverse('archived-project-list')), "Test Project")
+        self.assertEqual(self.client.get(detail_url).status_code, 404)
+
+    def test_restore_command_moves_project_back(self):
+        """Test that restore_projects brings back the project, tasks, links and members under their ids"""
+        archive_projects(today=date(2025, 3, 1), days=30)
+        out = StringIO()
+        call_command('restore_projects', str(self.finished.pk), stdout=out)
+        self.assertIn(f"Restored projects {self.finished.pk}", out.getvalue())
+
+        project = Project.objects.get(pk=self.finished.pk)
+        self.assertEqual(project.created_at, self.finished.created_at)
+        self.assertEqual((project.task_count, project.completed_count), (2, 2))
+        self.assertTrue(ProjectMembership.objects.filter(project=project, user=self.member).exists())
+        design = Task.objects.get(pk=self.design.pk)
+        self.assertEqual((design.title, design.created_at), ("Design", self.design.created_at))
+        self.assertTrue(TaskDependency.objects.filter(task_id=self.build.pk, depends_on_id=self.design.pk).exists())
+        self.assertTrue(Task.objects.search("Design").exists())
+        self.assertFalse(ArchivedProject.objects.exists())
+        self.assertFalse(ArchivedTask.objects.exists())
+
+        with self.assertRaises(CommandError):
+            call_command('restore_projects', str(self.finished.pk), stdout=StringIO())
+
+
+class TaskFormChoicesTestCase(TestCase):
+    def setUp(self):
+        # The cached choices live in the shared cache
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.user = User.objects.create_user(
+            username='testuser', password='password')
+        self.other = User.objects.create_user(username='otheruser', password='password')
+        self.project = Project.objects.create(
+            name="Test Project",
+            description="This is a test project",
+            start_date=date(2024, 1, 1),
+            end_date=date(2024, 12, 31),
+            created_by=self.user
+        )
+        self.other_project = Project.objects.create(
+            name="Other Project",
+            description="This is a test project",
+            start_date=date(2024, 1, 1),
+            end_date=date(2024, 12, 31),
+            created_by=self.other
+        )
+        self.client.login(username='testuser', password='password')
+
+    def test_task_form_offers_visible_projects_and_only_the_assignee(self):
+        """Test that the task form lists the user's projects and renders no other users"""
+        response = self.client.get(reverse('task-create'))
+        self.assertContains(response, "Test Project")
+        self.assertNotContains(response, "Other Project")
+        self.assertNotContains(response, "otheruser")
+        self.assertContains(response, f'data-autocomplete-url="{reverse("user-autocomplete")}"')
+        title = response.content.decode().split('<title>', 1)[1].split('</title>', 1)[0]
+        self.assertNotIn('<script', title)
+        self.assertContains(response, "select[data-autocomplete-url]", count=1)
+
+        response = self.client.post(reverse('task-create'), {
+            'title': "Sneaky Task", 'description': "This is a test task", 'assigned_to': self.other.pk,
+            'status': 'pending', 'priority': 'medium', 'start_date': '2024-01-01', 'due_date': '2024-01-10',
+            'project': self.other_project.pk,
+        })
+        self.assertTrue(response.context['form'].errors['project'])
+
+        # A task assigned to the user in a project they cannot see keeps its project selectable
+        task = Task.objects.create(title="Outside Task", description="This is a test task", assigned_to=self.user,
+                                   start_date=date(2024, 1, 1), due_date=date(2024, 1, 10),
+                                   project=self.other_project)
+        response = self.client.get(reverse('task-update', args=[task.pk]))
+        self.assertContains(response, f'<option value="{self.other_project.pk}" selected>Other Project</option>',
+                            html=True)
+        self.assertContains(response, f'<option value="{self.user.pk}" selected>testuser</option>', html=True)
+
+    def test_project_choices_are_cached_until_projects_change(self):
+        """Test that the project select is rendered from the cache until a project or membership changes"""
+        self.client.get(reverse('task-create'))
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('task-create'))
+        self.assertFalse([query for query in queries if 'FROM "task_app_project"' in query['sql']])
+
+        self.project.name = "Renamed Project"
+        self.project.save()
+        self.assertContains(self.client.get(reverse('task-create')), "Renamed Project")
+        ProjectMembership.objects.create(project=self.other_project, user=self.user)
+        self.assertContains(self.client.get(reverse('task-create')), "Other Project")
+
+    def test_user_autocomplete_pages_and_refreshes(self):
+        """Test that the user autocomplete pages through matching active users and notices new ones"""
+        User.objects.bulk_create([User(username=f'dev{number:02}') for number in range(25)]
+                                 + [User(username='devinactive', is_active=False)])
+        url = reverse('user-autocomplete')
+        page = self.client.get(url, {'q': 'DEV'}).json()
+        self.assertEqual([user['text'] for user in page['results']], [f'dev{number:02}' for number in range(20)])
+        page = self.client.get(url, {'q': 'dev', 'cursor': page['next']}).json()
+        self.assertEqual([user['text'] for user in page['results']], [f'dev{number:02}' for number in range(20, 25)])
+        self.assertIsNone(page['next'])
+
+        User.objects.create_user(username='dev99', password='password')
+        page = self.client.get(url, {'q': 'dev99'}).json()
+        self.assertEqual(page['results'], [{'id': User.objects.get(username='dev99').pk, 'text': 'dev99'}])
+        self.assertEqual(self.client.get(url, {'cursor': 'nonsense'}).status_code, 400)
@@ -0,0 +1,103 @@
+import csv
+import json
+from datetime import date, datetime
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+
+# Columns written by the task exports and read by the task import (which ignores id, created_at and updated_at)
+TASK_COLUMNS = [
+    'id', 'title', 'description', 'status', 'priority', 'start_date', 'due_date',
+    'project', 'assigned_to', 'created_at', 'updated_at',
+]
+TASK_COLUMN_FIELDS = {'project': 'project_id', 'assigned_to': 'assigned_to_id'}
+FORMATS = ('csv', 'jsonl')
+
+
+# Pick the format from an explicit option or the file extension, defaulting to CSV
+def detect_format(path, fmt=None):
+    if fmt:
+        return fmt
+    return 'jsonl' if str(path).endswith(('.jsonl', '.ndjson')) else 'csv'
+
+
+def _plain(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+# Yield (line_number, row_dict) pairs from a CSV or JSONL text stream without reading it all in
+def read_rows(stream, fmt):
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+    else:
+        for line_number, line in enumerate(stream, start=1):
+            if line.strip():
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    row = None
+                yield line_number, row if isinstance(row, dict) else None
+
+
+# Header line (None for JSONL) and row encoder turning a task value tuple (in TASK_COLUMNS order) into a line
+def _line_encoder(fmt):
+    if fmt == 'csv':
+        buffer = _LineBuffer()
+        writer = csv.writer(buffer)
+
+        def encode(values):
+            writer.writerow(values)
+            return buffer.pop()
+        return encode(TASK_COLUMNS), lambda row: encode([_plain(value) for value in row])
+    return None, lambda row: json.dumps(dict(zip(TASK_COLUMNS, map(_plain, row)))) + '\n'
+
+
+# Turn task value tuples (in TASK_COLUMNS order) into encoded CSV or JSONL lines, one per row
+def encode_rows(rows, fmt, header=True):
+    header_line, encode = _line_encoder(fmt)
+    if header and header_line:
+        yield header_line
+    for row in rows:
+        yield encode(row)
+
+
+# Async counterpart of encode_rows over an async iterator such as arows(), so an ASGI response streams
+# without Django first collecting a sync iterator into a list
+async def aencode_rows(rows, fmt, header=True):
+    header_line, encode = _line_encoder(fmt)
+    if header and header_line:
+        yield header_line
+    async for row in rows:
+        yield encode(row)
+
+
+# File-like sink that hands back whatever csv.writer wrote for the last row
+class _LineBuffer:
+    def __init__(self):
+        self.value = ''
+
+    def write(self, value):
+        self.value += value
+
+    def pop(self):
+        value, self.value = self.value, ''
+        return value
+
+
+# The task value tuples in TASK_COLUMNS order, for encode_rows
+def task_values(queryset):
+    return queryset.values_list(*(TASK_COLUMN_FIELDS.get(name, name) for name in TASK_COLUMNS))
+
+
+# The rows of a queryset as an async iterator, `chunk_size` at a time from one database cursor. Stands in for
+# QuerySet.aiterator(), which in Django 5.1 runs the values_list() query in the event loop and is refused.
+async def arows(queryset, chunk_size=2000):
+    rows = queryset.iterator(chunk_size=chunk_size)  # A generator: the query runs on the first next_chunk()
+    next_chunk = sync_to_async(lambda: list(islice(rows, chunk_size)))
+    while chunk := await next_chunk():
+        for row in chunk:
+            yield row
@@ -1,15 +1,40 @@
+from django.conf import settings
 from django.urls import path
-from task_app import views
+from task_app import views, api
+
+# The async dashboard and list views under ASGI (settings.ASYNC_VIEWS), the sync ones everywhere else
+if settings.ASYNC_VIEWS:
+    dashboard, project_list, task_list = views.async_dashboard, views.AsyncProjectListView, views.AsyncTaskListView
+else:
+    dashboard, project_list, task_list = views.dashboard, views.ProjectListView, views.TaskListView
 
 urlpatterns = [
-    path('', views.dashboard, name='dashboard'),
-    path('projects/', views.ProjectListView.as_view(), name='project-list'),
+    path('', dashboard, name='dashboard'),
+    path('dashboard/cache-stats/', views.dashboard_cache_stats_view, name='dashboard-cache-stats'),
+    path('profiling/', views.profiling_stats_view, name='profiling-stats'),
+    path('projects/', project_list.as_view(), name='project-list'),
     path('projects/<int:pk>/', views.ProjectDetailView.as_view(), name='project-detail'),
+    path('projects/<int:pk>/burndown/', views.ProjectBurndownView.as_view(), name='project-burndown'),
+    path('projects/<int:pk>/board/', views.ProjectBoardView.as_view(), name='project-board'),
+    path('projects/<int:pk>/schedule/', views.ProjectScheduleView.as_view(), name='project-schedule'),
+    path('projects/<int:pk>/members/', views.ProjectMembersView.as_view(), name='project-members'),
     path('projects/<int:pk>/edit/', views.ProjectUpdateView.as_view(), name='project-update'),
     path('projects/new/', views.ProjectCreateView.as_view(), name='project-create'),
+    path('archive/', views.ArchivedProjectListView.as_view(), name='archived-project-list'),
+    path('archive/<int:pk>/', views.ArchivedProjectDetailView.as_view(), name='archived-project-detail'),
     
-    path('tasks/', views.TaskListView.as_view(), name='task-list'),
+    path('tasks/', task_list.as_view(), name='task-list'),
+    path('tasks/events/', views.TaskEventsView.as_view(), name='task-events'),
+    path('tasks/export/', views.TaskExportView.as_view(), name='task-export'),
+    path('tasks/bulk/', views.TaskBulkUpdateView.as_view(), name='task-bulk-update'),
     path('tasks/new/', views.TaskCreateView.as_view(), name='task-create'),
     path('tasks/<int:pk>/', views.TaskDetailView.as_view(), name='task-detail'),
     path('tasks/<int:pk>/edit/', views.TaskUpdateView.as_view(), name='task-update'),
+    path('tasks/<int:pk>/move/', views.TaskMoveView.as_view(), name='task-move'),
+    path('users/autocomplete/', views.UserAutocompleteView.as_view(), name='user-autocomplete'),
+
+    path('api/projects/', api.ProjectApiListView.as_view(), name='api-project-list'),
+    path('api/projects/<int:pk>/', api.ProjectApiDetailView.as_view(), name='api-project-detail'),
+    path('api/tasks/', api.TaskApiListView.as_view(), name='api-task-list'),
+    path('api/tasks/<int:pk>/', api.TaskApiDetailView.as_view(), name='api-task-detail'),
 ]
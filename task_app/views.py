@@ -1,29 +1,222 @@
+import asyncio
+import hashlib
+from datetime import date
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.views import View
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
-from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
-from django.shortcuts import render, redirect
-from django.urls import reverse_lazy
+from django.contrib.auth.models import User
+from django.contrib.auth.mixins import AccessMixin, LoginRequiredMixin, UserPassesTestMixin
+from django.shortcuts import get_object_or_404, render, redirect
+from django.template.loader import render_to_string
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, JsonResponse, QueryDict, StreamingHttpResponse
+from django.contrib.admin.views.decorators import staff_member_required
+from django.urls import reverse, reverse_lazy
+from django.template.defaultfilters import pluralize
 from django.utils import timezone
 from django.contrib import messages
-from .models import Project, Task
-from .forms import ProjectForm, TaskForm
+from django.core.exceptions import ValidationError
+from django.db.models import Prefetch
+from .models import ArchivedProject, ArchivedTask, Project, ProjectMembership, Task, aproject_access
+from .forms import ProjectForm, ProjectMemberForm, TaskBulkUpdateForm, TaskForm, TaskMoveForm
+from .pagination import AsyncKeysetListMixin, InvalidCursor, KeysetPaginationMixin, paginate_by_cursor
+from .caching import acached_dashboard_panel, cached_choices, cached_dashboard_panel, dashboard_cache_stats
+from .transfer import aencode_rows, arows, encode_rows, task_values
+from .burndown import burndown_series, chart_points, velocity_series
+from .profiling import profiling_stats
+from .board import board_columns, move_task
+from .scheduling import compute_schedule
+from .live import Subscriber, encode_message, hub, release_connections
+
+# Async counterpart of LoginRequiredMixin for views with async handlers
+class AsyncLoginRequiredMixin(AccessMixin):
+    async def dispatch(self, request, *args, **kwargs):
+        # Load the session user without blocking the event loop; templates and the view read it from request.user
+        request.user = await request.auser()
+        if not request.user.is_authenticated:
+            return self.handle_no_permission()
+        if not request.user.is_staff:
+            await aproject_access(request.user)  # So visible_to() can build the querysets without a query
+        return await super().dispatch(request, *args, **kwargs)
 
 # View for displaying a list of projects for a logged-in user
-class ProjectListView(LoginRequiredMixin, ListView):
+class ProjectListView(LoginRequiredMixin, KeysetPaginationMixin, ListView):
     model = Project
     template_name = 'tasks/project_list.html'  # Template to render the project list
     context_object_name = 'projects'  # Context variable for the template
+    keyset_ordering = ('-created_at', '-id')  # Newest projects first, paginated by cursor
 
-    # Custom queryset to filter projects based on the user's role (staff or not)
+    # Staff see every project, users the ones they own or are a member of
     def get_queryset(self):
-        if self.request.user.is_staff:
-            return Project.objects.all()  # Staff can see all projects
-        return Project.objects.filter(created_by=self.request.user)  # Users can only see their own projects
+        return Project.objects.visible_to(self.request.user)
+
+# ProjectListView served natively under ASGI
+class AsyncProjectListView(AsyncLoginRequiredMixin, AsyncKeysetListMixin, ProjectListView):
+    pass
 
 # View for displaying the details of a specific project
 class ProjectDetailView(LoginRequiredMixin, DetailView):
     model = Project
     template_name = 'tasks/project_detail.html'  # Template to render project details
 
+    # Load the project's tasks, members and their users up front instead of one query per row
+    def get_queryset(self):
+        return Project.objects.visible_to(self.request.user).select_related('created_by').prefetch_related(
+            Prefetch('task_set', queryset=Task.objects.select_related('assigned_to')),
+            Prefetch('memberships', queryset=ProjectMembership.objects.select_related('user').order_by('user__username')))
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['can_share'] = self.request.user.is_staff or self.object.created_by_id == self.request.user.pk
+        context['member_form'] = ProjectMemberForm()
+        return context
+
+# Add a member to a project, or remove one, for the project owner and staff
+class ProjectMembersView(LoginRequiredMixin, View):
+    def post(self, request, pk):
+        project = get_object_or_404(Project.objects.editable_by(request.user), pk=pk)
+        remove = request.POST.get('remove')
+        if remove:
+            ProjectMembership.objects.filter(project=project, user_id=remove).delete()
+            messages.success(request, "Member removed.")
+            return redirect(project)
+        form = ProjectMemberForm(request.POST)
+        if form.is_valid():
+            member = form.cleaned_data['user']
+            if member == project.created_by:
+                messages.error(request, f"{member} owns this project.")
+            else:
+                ProjectMembership.objects.get_or_create(project=project, user=member)
+                messages.success(request, f"Shared with {member}.")
+        else:
+            messages.error(request, ' '.join(form.errors.get('user', [])) or "Invalid member.")
+        return redirect(project)
+
+# View for a project's burndown chart and weekly velocity, drawn from the daily status snapshots
+class ProjectBurndownView(LoginRequiredMixin, DetailView):
+    model = Project
+    template_name = 'tasks/project_burndown.html'  # Template to render the charts
+    chart_width, chart_height = 800, 200
+
+    # Same visibility as the project list
+    def get_queryset(self):
+        return Project.objects.visible_to(self.request.user)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        series = burndown_series(self.object)
+        velocity = velocity_series(self.object)
+        context['burndown'] = series
+        context['remaining_points'] = chart_points([point[1] for point in series], self.chart_width, self.chart_height)
+        context['completed_points'] = chart_points([point[2] for point in series], self.chart_width, self.chart_height)
+        top = max((completed for _week, completed in velocity), default=0) or 1
+        bar_width = self.chart_width / max(len(velocity), 1)
+        context['velocity_bars'] = [
+            {'week': week, 'completed': completed, 'x': index * bar_width, 'width': max(bar_width - 1, 1),
+             'height': completed / top * self.chart_height, 'y': self.chart_height - completed / top * self.chart_height}
+            for index, (week, completed) in enumerate(velocity)
+        ]
+        context['recent_velocity'] = velocity[-12:][::-1]  # Latest weeks first in the table
+        context['chart_width'], context['chart_height'] = self.chart_width, self.chart_height
+        return context
+
+# Kanban board of a project's tasks, one column per status
+class ProjectBoardView(LoginRequiredMixin, DetailView):
+    model = Project
+    template_name = 'tasks/project_board.html'  # Template to render the board
+
+    # Same visibility as the project list
+    def get_queryset(self):
+        return Project.objects.visible_to(self.request.user)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['columns'] = board_columns(self.object)  # All cards in one query, grouped by status
+        return context
+
+# Critical path and slack of a project's tasks, following their dependencies
+class ProjectScheduleView(LoginRequiredMixin, DetailView):
+    model = Project
+    template_name = 'tasks/project_schedule.html'  # Template to render the schedule
+    slack_rows = 50  # Only the tightest tasks are listed; a large project has too many to show
+
+    # Same visibility as the project list
+    def get_queryset(self):
+        return Project.objects.visible_to(self.request.user)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        try:
+            schedule = compute_schedule(self.object)
+        except ValidationError as error:
+            context['schedule_error'] = error.messages[0]
+            return context
+        tightest = sorted(schedule.order, key=lambda pk: (schedule.slack[pk], schedule.earliest_start[pk]))
+        tightest = tightest[:self.slack_rows]
+        # Titles and assignees only for the tasks on the page
+        tasks = Task.objects.select_related('assigned_to').only(
+            'title', 'status', 'assigned_to__username').in_bulk(set(schedule.critical_path) | set(tightest))
+
+        def rows(pks):
+            return [{
+                'task': tasks[pk],
+                'earliest_start': date.fromordinal(schedule.earliest_start[pk]),
+                'earliest_finish': date.fromordinal(schedule.earliest_finish[pk]),
+                'slack': schedule.slack[pk],
+            } for pk in pks]
+
+        context['critical_path'] = rows(schedule.critical_path)
+        context['tightest'] = rows(tightest)
+        context['finish'] = date.fromordinal(schedule.finish) if schedule.finish else None
+        return context
+
+# Read-only list of the archived projects the user could see before they were archived
+class ArchivedProjectListView(LoginRequiredMixin, KeysetPaginationMixin, ListView):
+    model = ArchivedProject
+    template_name = 'tasks/archived_project_list.html'  # Template to render the archive
+    context_object_name = 'projects'  # Context variable for the template
+    keyset_ordering = ('-archived_at', '-id')  # Most recently archived first, paginated by cursor
+
+    def get_queryset(self):
+        return ArchivedProject.objects.visible_to(self.request.user).select_related('created_by')
+
+# Read-only view of an archived project and its tasks
+class ArchivedProjectDetailView(LoginRequiredMixin, DetailView):
+    model = ArchivedProject
+    template_name = 'tasks/archived_project_detail.html'  # Template to render the archived project
+    context_object_name = 'project'
+
+    # Load the tasks, members and their users up front instead of one query per row
+    def get_queryset(self):
+        return ArchivedProject.objects.visible_to(self.request.user).select_related('created_by').prefetch_related(
+            Prefetch('tasks', queryset=ArchivedTask.objects.select_related('assigned_to').order_by('due_date', 'id')),
+            Prefetch('members', queryset=User.objects.order_by('username')))
+
+# Endpoint the board posts a dropped card to; saves only the card's status and position
+class TaskMoveView(LoginRequiredMixin, View):
+    # Moving a card edits the task, so the same rule as TaskUpdateView applies
+    def get_queryset(self):
+        return Task.objects.editable_by(self.request.user).only(
+            # Fields read by the move itself, the due date check in Task.save and the live update it publishes
+            'title', 'status', 'priority', 'due_date', 'board_position', 'project_id', 'assigned_to_id')
+
+    def post(self, request, pk):
+        task = get_object_or_404(self.get_queryset(), pk=pk)
+        form = TaskMoveForm(request.POST)
+        if not form.is_valid():
+            return JsonResponse({'errors': form.errors}, status=400)
+        move_task(task, form.cleaned_data['status'], form.cleaned_data['previous'], form.cleaned_data['next'])
+        # Column totals for the board headers, read from the project counters
+        counts = Project.objects.filter(pk=task.project_id).values(*Project.STATUS_COUNTER_FIELDS.values()).get()
+        return JsonResponse({
+            'id': task.pk,
+            'status': task.status,
+            'board_position': task.board_position,
+            'counts': {status: counts[field] for status, field in Project.STATUS_COUNTER_FIELDS.items()},
+        })
+
 # View for creating a new project
 class ProjectCreateView(LoginRequiredMixin, CreateView):
     model = Project
@@ -47,12 +240,9 @@ class ProjectUpdateView(LoginRequiredMixin, UpdateView):
     form_class = ProjectForm  # Form to update a project
     template_name = 'tasks/project_form.html'  # Template for the form
 
-    # Restrict updating projects only to the creator of the project (if not staff)
+    # Restrict updating projects to their owner (unless staff); members can only view them
     def get_queryset(self):
-        queryset = super().get_queryset()
-        if not self.request.user.is_staff:
-            queryset = queryset.filter(created_by=self.request.user)  # User can only update their own projects
-        return queryset
+        return Project.objects.editable_by(self.request.user)
 
     # Handle form submission if valid
     def form_valid(self, form):
@@ -64,35 +254,209 @@ class ProjectUpdateView(LoginRequiredMixin, UpdateView):
             self.request, "There was an error with your submission. Please correct the errors below.")
         return self.render_to_response(self.get_context_data(form=form))
 
-# View for listing tasks assigned to the logged-in user
-class TaskListView(LoginRequiredMixin, ListView):
+# View for listing the tasks the logged-in user can see
+class TaskListView(LoginRequiredMixin, KeysetPaginationMixin, ListView):
     model = Task
     template_name = 'tasks/task_list.html'  # Template to render the task list
     context_object_name = 'tasks'  # Context variable for the template
+    keyset_ordering = ('due_date', 'id')  # Soonest due first, paginated by cursor
 
     # Custom queryset to filter tasks based on the user's role and filter options (status, priority)
     def get_queryset(self):
-        queryset = Task.objects.all()  # Start with all tasks
-        if not self.request.user.is_staff:
-            queryset = queryset.filter(assigned_to=self.request.user)  # Users can only see tasks assigned to them
+        # Users see their tasks and those of their projects, staff every task; join the columns the table shows
+        queryset = Task.objects.visible_to(self.request.user).select_related('project', 'assigned_to')
 
         # Filter tasks based on URL query parameters (status and priority)
-        status = self.request.GET.get('status')
-        priority = self.request.GET.get('priority')
+        params = self.get_filter_params()
+        status = params.get('status')
+        priority = params.get('priority')
 
         if status:
             queryset = queryset.filter(status=status)  # Filter by task status
         if priority:
             queryset = queryset.filter(priority=priority)  # Filter by task priority
 
+        # Full-text search over title, description and project name
+        query = params.get('q')
+        if query:
+            queryset = queryset.search(query)
+
         return queryset
 
+    # Query parameters holding the list filters
+    def get_filter_params(self):
+        return self.request.GET
+
+    # Order search results by relevance, everything else by due date
+    def get_keyset_ordering(self):
+        if self.get_filter_params().get('q'):
+            return ('search_rank', 'id')
+        return self.keyset_ordering
+
+    # Choices for the filter dropdowns and the bulk update form
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['task_status_choices'] = Task.STATUS_CHOICES
+        context['task_priority_choices'] = Task.PRIORITY_CHOICES
+        context['bulk_form'] = TaskBulkUpdateForm()
+        return context
+
+# TaskListView served natively under ASGI
+class AsyncTaskListView(AsyncLoginRequiredMixin, AsyncKeysetListMixin, TaskListView):
+    pass
+
+# Live task changes for the task list and the dashboard: a server-sent event stream, or with ?poll=1 a long
+# poll answered in JSON. Only changes to tasks the user can see are sent, see task_app.live. Clients resume
+# with the Last-Event-ID header or ?after=<id>, and reload their view on a 'reset' or 'refresh' event.
+class TaskEventsView(AsyncLoginRequiredMixin, View):
+    async def get(self, request):
+        user = request.user
+        project_ids = () if user.is_staff else (await aproject_access(user)).visible
+        subscriber = Subscriber(user, project_ids)
+        try:
+            after = int(request.headers.get('Last-Event-ID') or request.GET.get('after', ''))
+        except ValueError:
+            after = None
+        if not isinstance(request, ASGIRequest):
+            # Streams and long polls wait on the event loop; under WSGI each would park a worker thread, and the
+            # in-process hub would only see the events of that worker. 204 stops EventSource and the poller alike,
+            # so the pages stay as loaded.
+            return HttpResponse(status=204)
+        await sync_to_async(release_connections)()  # Nothing below needs the database
+        if request.GET.get('poll'):
+            return await self.poll(subscriber, after)
+        response = StreamingHttpResponse(self.stream(subscriber, after), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'  # Keep proxies such as nginx from holding back events
+        return response
+
+    # Subscribed before reading the backlog so nothing published in between is lost; the queue may repeat
+    # backlog events, which are skipped by id
+    async def stream(self, subscriber, after):
+        hub.subscribe(subscriber)
+        try:
+            yield 'retry: 5000\n\n'  # Reconnect delay for the browser, in milliseconds
+            seen = 0
+            if after is not None:
+                backlog = hub.since(after, subscriber)
+                for message in backlog if backlog is not None else [(hub.last_id, 'reset', {})]:
+                    yield encode_message(message)
+                    seen = message[0]
+            while True:
+                try:
+                    message = await asyncio.wait_for(subscriber.queue.get(), settings.LIVE_EVENTS_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    yield ': keepalive\n\n'  # Comment line, so proxies do not close an idle connection
+                    continue
+                if message[0] > seen:
+                    yield encode_message(message)
+        finally:
+            hub.unsubscribe(subscriber)
+
+    # Answer at once with buffered events after `after`, otherwise wait for the next one or the timeout
+    async def poll(self, subscriber, after):
+        if after is None:
+            return JsonResponse({'events': [], 'last_event_id': hub.last_id})  # Where to start polling from
+        hub.subscribe(subscriber)
+        try:
+            messages = hub.since(after, subscriber)
+            if messages is None:
+                messages = [(hub.last_id, 'reset', {})]
+            elif not messages:
+                try:
+                    messages = [await asyncio.wait_for(subscriber.queue.get(), settings.LIVE_EVENTS_KEEPALIVE)]
+                except asyncio.TimeoutError:
+                    pass
+            covered = hub.last_id
+        finally:
+            hub.unsubscribe(subscriber)
+        # Events published while the answer was prepared
+        seen = messages[-1][0] if messages else after
+        while not subscriber.queue.empty():
+            message = subscriber.queue.get_nowait()
+            if message[0] > seen:
+                messages.append(message)
+                seen = message[0]
+        return JsonResponse({
+            'events': [{'id': event_id, 'event': name, 'data': data} for event_id, name, data in messages],
+            'last_event_id': max(covered, seen),
+        })
+
+# View for changing the status, priority or assignee of many tasks at once with set-based UPDATEs
+class TaskBulkUpdateView(TaskListView):
+    http_method_names = ['post']
+    batch_size = 500  # Selected ids per UPDATE, well under SQLite's bound parameter limit
+
+    def post(self, request, *args, **kwargs):
+        form = TaskBulkUpdateForm(request.POST)
+        filter_query = request.POST.get('filter_query', '')  # The list filters the form was submitted from
+        redirect_url = f"{reverse('task-list')}?{filter_query}" if filter_query else reverse('task-list')
+        if not form.is_valid():
+            messages.error(request, ' '.join(form.non_field_errors()) or "Invalid bulk update.")
+            return redirect(redirect_url)
+
+        changes = form.get_changes()
+        # The list's filters, narrowed to the tasks TaskUpdateView would let the user edit
+        self.filter_params = QueryDict(filter_query)
+        queryset = self.get_queryset().editable_by(request.user)
+        if form.cleaned_data['select_all']:
+            updated = queryset.update(**changes)  # One UPDATE for every task matching the filters
+        else:
+            task_ids = form.cleaned_data['task_ids']
+            updated = sum(queryset.filter(pk__in=task_ids[start:start + self.batch_size]).update(**changes)
+                          for start in range(0, len(task_ids), self.batch_size))
+        messages.success(request, f"Updated {updated} task{pluralize(updated)}.")
+        return redirect(redirect_url)
+
+    def get_filter_params(self):
+        return self.filter_params
+
+# View for downloading the filtered task list as CSV, streamed so memory stays flat for any number of rows
+class TaskExportView(TaskListView):
+    chunk_size = 2000  # Rows fetched from the database cursor at a time
+
+    def get(self, request, *args, **kwargs):
+        queryset = self.get_queryset().order_by(*self.get_keyset_ordering())  # Same visibility and filters as the list
+        if isinstance(request, ASGIRequest):
+            # An ASGI response reads a sync iterator into a list first, so hand it an async one
+            content = aencode_rows(arows(task_values(queryset), self.chunk_size), 'csv')
+        else:
+            content = encode_rows(task_values(queryset).iterator(chunk_size=self.chunk_size), 'csv')
+        response = StreamingHttpResponse(content, content_type='text/csv')
+        response['Content-Disposition'] = 'attachment; filename="tasks.csv"'
+        return response
+
+# Active users whose username starts with ?q=, a page at a time (?cursor= from the previous page), for the
+# assignee select of the task form. Pages are cached until a user changes.
+class UserAutocompleteView(LoginRequiredMixin, View):
+    page_size = 20
+    ordering = ('username', 'id')
+
+    def get(self, request):
+        query = request.GET.get('q', '').strip()
+        cursor = request.GET.get('cursor') or None
+
+        def load_page():
+            users = User.objects.filter(is_active=True, username__istartswith=query).only('username')
+            rows, next_cursor = paginate_by_cursor(users, self.ordering, cursor, self.page_size)
+            return {'results': [{'id': user.pk, 'text': str(user)} for user in rows], 'next': next_cursor}
+
+        key = hashlib.md5(repr((query, cursor)).encode(), usedforsecurity=False).hexdigest()
+        try:
+            return JsonResponse(cached_choices('users', key, load_page))
+        except InvalidCursor as error:
+            return JsonResponse({'error': str(error)}, status=400)
+
 # View for creating a new task
 class TaskCreateView(LoginRequiredMixin, CreateView):
     model = Task
     form_class = TaskForm  # Form to create a task
     template_name = 'tasks/task_form.html'  # Template for the form
 
+    # Offer only the projects the user can see
+    def get_form_kwargs(self):
+        return {**super().get_form_kwargs(), 'user': self.request.user}
+
     # Ensure the task's due date does not exceed the project's end date
     def form_valid(self, form):
         project = form.cleaned_data.get('project')  # Get the selected project from the form
@@ -114,12 +478,9 @@ class TaskDetailView(LoginRequiredMixin, DetailView):
     template_name = 'tasks/task_detail.html'  # Template to render task details
     context_object_name = 'task'  # Context variable for the template
 
-    # Restrict task visibility to the assigned user (unless the user is staff)
+    # Restrict task visibility to the assigned user and the project's owner and members (unless staff)
     def get_queryset(self):
-        queryset = super().get_queryset()
-        if not self.request.user.is_staff:
-            queryset = queryset.filter(assigned_to=self.request.user)  # User can only see their own tasks
-        return queryset
+        return Task.objects.visible_to(self.request.user).select_related('project')  # The project owner may edit
 
 # View for updating an existing task
 class TaskUpdateView(LoginRequiredMixin, UpdateView):
@@ -127,12 +488,13 @@ class TaskUpdateView(LoginRequiredMixin, UpdateView):
     form_class = TaskForm  # Form to update a task
     template_name = 'tasks/task_form.html'  # Template for the form
 
-    # Restrict task update to the assigned user (unless staff)
+    # Restrict task update to the assigned user and the project owner (unless staff)
     def get_queryset(self):
-        queryset = super().get_queryset()
-        if not self.request.user.is_staff:
-            queryset = queryset.filter(assigned_to=self.request.user)  # User can only update their own tasks
-        return queryset
+        return Task.objects.editable_by(self.request.user)
+
+    # Offer only the projects the user can see, besides the task's own
+    def get_form_kwargs(self):
+        return {**super().get_form_kwargs(), 'user': self.request.user}
 
     # Ensure the task's due date does not exceed the project's end date
     def form_valid(self, form):
@@ -141,7 +503,13 @@ class TaskUpdateView(LoginRequiredMixin, UpdateView):
             form.add_error(
                 'due_date', "Task due date cannot exceed the project end date.")  # Custom validation error
             return self.form_invalid(form)  # Return invalid form if validation fails
-        return super().form_valid(form)  # Proceed with the usual form submission
+        # A later due date pushes back the tasks waiting for this one (Task.save); Task.clean has already turned
+        # it into a form error if they no longer fit
+        response = super().form_valid(form)  # Proceed with the usual form submission
+        shifted = self.object.shifted_dependents
+        if shifted:
+            messages.info(self.request, f"Moved {len(shifted)} dependent task{pluralize(len(shifted))}.")
+        return response
 
     # Handle form invalidity with a custom error message
     def form_invalid(self, form):
@@ -149,17 +517,65 @@ class TaskUpdateView(LoginRequiredMixin, UpdateView):
             self.request, "There was an error with your submission. Please correct the errors below.")
         return self.render_to_response(self.get_context_data(form=form))
 
+# Projects listed on a user's dashboard: those created by the user
+def dashboard_projects(user):
+    return Project.objects.filter(created_by=user)
+
+# Tasks listed as overdue on a user's dashboard
+def overdue_tasks(user, today):
+    return Task.objects.filter(
+        assigned_to=user,
+        status__in=['pending', 'in_progress'],  # Filter tasks that are still pending or in progress
+        due_date__lt=today  # Filter overdue tasks
+    ).select_related('project')  # Project names are rendered next to each task
+
 # Dashboard view to display an overview of the user's projects and overdue tasks
 def dashboard(request):
     if not request.user.is_authenticated:  # Check if the user is logged in
         return redirect('login')  # Redirect to the login page if not authenticated
 
+    today = timezone.now().date()
     context = {
-        'projects': Project.objects.filter(created_by=request.user),  # Projects created by the logged-in user
-        'overdue_tasks': Task.objects.filter(
-            assigned_to=request.user,
-            status__in=['pending', 'in_progress'],  # Filter tasks that are still pending or in progress
-            due_date__lt=timezone.now().date()  # Filter overdue tasks
-        ),
+        # Both panels are cached per user and invalidated when their projects or tasks change
+        'projects_panel': cached_dashboard_panel(request.user.pk, 'projects', lambda: render_to_string(
+            'tasks/dashboard_projects.html', {'projects': dashboard_projects(request.user)})),
+        # The overdue panel is also keyed by date, since tasks become overdue without being saved
+        'overdue_panel': cached_dashboard_panel(request.user.pk, f'overdue:{today}', lambda: render_to_string(
+            'tasks/dashboard_overdue.html', {'overdue_tasks': overdue_tasks(request.user, today)})),
     }
     return render(request, 'tasks/dashboard.html', context)  # Render the dashboard template with the context data
+
+# Staff-only view exposing the dashboard cache hit and miss counts
+@staff_member_required
+def dashboard_cache_stats_view(request):
+    return JsonResponse(dashboard_cache_stats())
+
+# Staff-only page with per-view latency percentiles, query counts and repeated queries from the profiling middleware
+@staff_member_required
+def profiling_stats_view(request):
+    context = {'stats': profiling_stats(), 'enabled': settings.REQUEST_PROFILING}
+    return render(request, 'tasks/profiling_stats.html', context)
+
+# Dashboard served natively under ASGI; the two panels are fetched and rendered concurrently
+async def async_dashboard(request):
+    request.user = await request.auser()  # Load the session user without blocking the event loop
+    if not request.user.is_authenticated:  # Check if the user is logged in
+        return redirect('login')  # Redirect to the login page if not authenticated
+
+    today = timezone.now().date()
+
+    # Same querysets and templates as the sync dashboard, read with the async ORM
+    async def render_projects():
+        projects = [project async for project in dashboard_projects(request.user).aiterator()]
+        return render_to_string('tasks/dashboard_projects.html', {'projects': projects})
+
+    async def render_overdue():
+        tasks = [task async for task in overdue_tasks(request.user, today).aiterator()]
+        return render_to_string('tasks/dashboard_overdue.html', {'overdue_tasks': tasks})
+
+    projects_panel, overdue_panel = await asyncio.gather(
+        acached_dashboard_panel(request.user.pk, 'projects', render_projects),
+        acached_dashboard_panel(request.user.pk, f'overdue:{today}', render_overdue),
+    )
+    context = {'projects_panel': projects_panel, 'overdue_panel': overdue_panel}
+    return render(request, 'tasks/dashboard.html', context)